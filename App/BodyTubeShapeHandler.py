@@ -31,6 +31,9 @@ from App.Utilities import _err
 from DraftTools import translate
 
 class BodyTubeShapeHandler():
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["InnerDiameter", "OuterDiameter", "Length"]
+
     def __init__(self, obj):
 
         # This gets changed when redrawn so it's very important to save a copy
@@ -32,6 +32,10 @@ from App.Utilities import _err
 from DraftTools import translate
 
 class BulkheadShapeHandler():
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["Diameter", "Thickness", "Step", "StepDiameter", "StepThickness", "Holes", "HoleDiameter", "HoleCenter",
+                       "HoleCount", "HoleOffset"]
+
     def __init__(self, obj):
 
         # This gets changed when redrawn so it's very important to save a copy
@@ -33,6 +33,9 @@ from App.BulkheadShapeHandler import BulkheadShapeHandler
 from App.Utilities import _err
 
 class CenteringRingShapeHandler(BulkheadShapeHandler):
+    # Shape properties in addition to those of the base handler
+    shapeProperties = ["CenterDiameter", "Notched", "NotchWidth", "NotchHeight"]
+
     def __init__(self, obj):
         super().__init__(obj)
 
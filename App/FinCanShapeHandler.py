@@ -43,6 +43,12 @@ TOLERANCE_OFFSET = 0.5     # Distance to offset a vertex
 
 class FinCanShapeHandler(FinShapeHandler):
 
+    # Shape properties in addition to those of the base handler
+    shapeProperties = ["Thickness", "Length", "InnerDiameter", "LeadingEdge", "LeadingLength", "LeadingEdgeOffset",
+                       "TrailingEdge", "TrailingLength", "Coupler", "CouplerStyle", "CouplerLength", "CouplerInnerDiameter",
+                       "CouplerOuterDiameter", "LaunchLug", "LugInnerDiameter", "LugThickness", "LugLength", "LugFilletRadius",
+                       "LaunchLugForwardSweep", "LaunchLugForwardSweepAngle", "LaunchLugAftSweep", "LaunchLugAftSweepAngle"]
+
     def __init__(self, obj):
         super().__init__(obj)
 
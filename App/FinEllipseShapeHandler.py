@@ -37,6 +37,9 @@ CROSS_SECTIONS = 100  # Number of cross sections for the ellipse
 
 class FinEllipseShapeHandler(FinShapeHandler):
 
+    # Shape properties in addition to those of the base handler
+    shapeProperties = ["Height", "RootCrossSection", "RootThickness", "RootPerCent", "RootLength1", "RootLength2"]
+
     def __init__(self, obj):
         super().__init__(obj)
 
@@ -38,6 +38,10 @@ from App.Utilities import _err
 
 class FinShapeHandler:
 
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["FinSet", "FinCount", "FinSpacing", "ParentRadius", "RootChord", "Ttw", "TtwOffset", "TtwLength",
+                       "TtwHeight", "TtwThickness", "DebugSketch"]
+
     def __init__(self, obj):
         self._obj = obj
 
@@ -329,13 +333,19 @@ class FinShapeHandler:
         fin.translate(FreeCAD.Vector(0,0,float(self._obj.ParentRadius)))
         return Part.makeCompound([fin])
 
+    def _finPlacement(self, index):
+        # Raise the fin to the body tube surface, then rotate it into position
+        offset = FreeCAD.Placement(FreeCAD.Vector(0, 0, float(self._obj.ParentRadius)), FreeCAD.Rotation())
+        rotation = FreeCAD.Placement(FreeCAD.Vector(0, 0, 0), FreeCAD.Rotation(FreeCAD.Vector(1, 0, 0), index * float(self._obj.FinSpacing)))
+        return rotation.multiply(offset)
+
     def _drawFinSet(self):
         fins = []
         base = self._drawSingleFin()
         for i in range(self._obj.FinCount):
-            fin = Part.Shape(base) # Create a copy
-            fin.translate(FreeCAD.Vector(0,0,float(self._obj.ParentRadius)))
-            fin.rotate(FreeCAD.Vector(0, 0, 0), FreeCAD.Vector(1,0,0), i * float(self._obj.FinSpacing))
+            # Each fin references the same geometry and only has its own placement
+            fin = Part.Shape(base)
+            fin.Placement = self._finPlacement(i).multiply(base.Placement)
             fins.append(fin)
 
         return Part.makeCompound(fins)
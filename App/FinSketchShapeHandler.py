@@ -37,6 +37,9 @@ from App.Utilities import _err
 
 class FinSketchShapeHandler(FinShapeHandler):
 
+    # Shape properties in addition to those of the base handler
+    shapeProperties = ["Profile", "RootCrossSection", "RootThickness", "RootPerCent", "RootLength1", "RootLength2"]
+
     def __init__(self, obj):
         super().__init__(obj)
 
@@ -30,6 +30,10 @@ from App.FinShapeHandler import FinShapeHandler
 
 class FinTrapezoidShapeHandler(FinShapeHandler):
 
+    # Shape properties in addition to those of the base handler
+    shapeProperties = ["Height", "SweepLength", "RootCrossSection", "RootThickness", "RootPerCent", "RootLength1", "RootLength2",
+                       "TipChord", "TipCrossSection", "TipThickness", "TipPerCent", "TipLength1", "TipLength2"]
+
     def __init__(self, obj):
         super().__init__(obj)
 
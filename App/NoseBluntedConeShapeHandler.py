@@ -29,6 +29,7 @@ import Part
 import math
 
 from App.NoseShapeHandler import NoseShapeHandler
+from App.RootFinder import findRoot
     
     
 class NoseBluntedConeShapeHandler(NoseShapeHandler):
@@ -51,27 +52,21 @@ class NoseBluntedConeShapeHandler(NoseShapeHandler):
     def getXa(self, Xo, noseRadius):
         return Xo - noseRadius
             
-    def getLength(self, length, radius, noseRadius):
+    def getTip(self, vLength, radius, noseRadius):
+        # Where the nose radius meets a pointed cone of length vLength
+        Xt = self.getXt(vLength, radius, noseRadius)
+        Yt = self.getYt(Xt, vLength, radius)
+        Xo = self.getXo(Xt, Yt, noseRadius)
+        Xa = self.getXa(Xo, noseRadius)
+        return (Xt, Yt, Xo, Xa)
 
+    def getLength(self, length, radius, noseRadius):
+        # Length of the pointed cone that is the requested length once blunted
         min = length - noseRadius
         max = (-radius * length) / (noseRadius - radius)
-        counter = 0
-
-        # Do a binary search to 0.0001 mm
-        precision = 0.0001
-        while (max - min) > precision:
-            mid = (max + min) / 2.0
-            counter += 1
-            Xt = self.getXt(mid, radius, noseRadius)
-            Yt = self.getYt(Xt, mid, radius)
-            Xo = self.getXo(Xt, Yt, noseRadius)
-            Xa = self.getXa(Xo, noseRadius)
-            if (length + Xa) > mid:
-                min = mid
-            else:
-                max = mid
-
-        return (mid, Xt, Yt, Xo, Xa)
+        vLength = findRoot(lambda mid: length + self.getTip(mid, radius, noseRadius)[3] - mid, min, max)
+
+        return (vLength,) + self.getTip(vLength, radius, noseRadius)
 
     def getMidArc(self, Xo, Xt, radius):
         x = math.fabs(Xt + radius - Xo) / 2.0
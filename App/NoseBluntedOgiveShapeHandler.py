@@ -29,6 +29,8 @@ import Part
 import math
 
 from App.NoseShapeHandler import NoseShapeHandler
+from App.ProfileKernels import ogiveY
+from App.RootFinder import findRoot
 
 class NoseBluntedOgiveShapeHandler(NoseShapeHandler):
 
@@ -59,37 +61,26 @@ class NoseBluntedOgiveShapeHandler(NoseShapeHandler):
         return Xo - noseRadius
 
     def getOgiveCurve(self, rho, length, vLength, radius, resolution, min = 0):
-        points = []
-        for i in range(0, resolution):
+        return self.makeProfile(lambda x: ogiveY(x + (vLength - length), vLength, radius, rho), length, radius, resolution, min)
             
-            x = float(i) * ((length - min) / float(resolution))
-            y = self.ogive_y(x + (vLength - length), vLength, radius, rho)
-            points.append(FreeCAD.Vector(length - x, y))
+    def getTip(self, vLength, radius, noseRadius):
+        # Where the nose radius meets a pointed ogive of length vLength
+        rho = self.getRho(radius, vLength)
+        Xo = self.getXo(rho, vLength, radius, noseRadius)
+        Yt = self.getYt(rho, radius, noseRadius)
+        Xt = self.getXt(Xo, Yt, noseRadius)
+        Xa = self.getXa(Xo, noseRadius)
+        return (rho, Xt, Yt, Xo, Xa)
 
-        points.append(FreeCAD.Vector(min, radius))
-        return points
-            
     def getLength(self, length, radius, noseRadius):
-
-        min = length - noseRadius
-        max = (-radius * length) / (noseRadius - radius)
-
-        # Do a binary search to 0.0001 mm
-        precision = 0.0001
-        while (max - min) > precision:
-            mid = (max + min) / 2.0
-            rho = self.getRho(radius, mid)
-            Xo = self.getXo(rho, mid, radius, noseRadius)
-            Yt = self.getYt(rho, radius, noseRadius)
-            Xt = self.getXt(Xo, Yt, noseRadius)
-            Xa = self.getXa(Xo, noseRadius)
-
-            if (length + Xa) > mid:
-                min = mid
-            else:
-                max = mid
-
-        return (rho, mid, Xt, Yt, Xo, Xa)
+        # Length of the pointed ogive that is the requested length once blunted. An ogive shorter
+        # than its radius bulges past the shoulder, so the nose radius can't meet it
+        min = max(length - noseRadius, radius)
+        vLength = findRoot(lambda mid: length + self.getTip(mid, radius, noseRadius)[4] - mid, min,
+                           (-radius * length) / (noseRadius - radius))
+
+        (rho, Xt, Yt, Xo, Xa) = self.getTip(vLength, radius, noseRadius)
+        return (rho, vLength, Xt, Yt, Xo, Xa)
 
     def getMidArc(self, Xo, Xt, radius):
         x = math.fabs(Xt + radius - Xo) / 2.0
@@ -24,12 +24,13 @@ __title__ = "FreeCAD Haack Nose Shape Handler"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
-import FreeCAD
 import math
 
 from DraftTools import translate
 
 from App.NoseShapeHandler import NoseShapeHandler
+from App.ProfileKernels import haackY
+from App.RootFinder import findRoot
 from App.Utilities import _err
     
 class NoseHaackShapeHandler(NoseShapeHandler):
@@ -56,33 +57,11 @@ class NoseHaackShapeHandler(NoseShapeHandler):
             + coefficient * math.pow(math.sin(theta), 3)) / math.sqrt(math.pi);
 
     def haack_curve(self, length, radius, resolution, coefficient, min = 0):
-        points = []
-        for i in range(0, resolution):
-            
-            x = float(i) * (length / float(resolution))
-            y = self.haack_y(x, length, radius, coefficient)
-            if length - x > min:
-                points.append(FreeCAD.Vector(length - x, y))
-
-        points.append(FreeCAD.Vector(min, radius))
-        return points
+        return self.makeProfile(lambda x: haackY(x, length, radius, coefficient), length, radius, resolution, min)
             
     def findHaackY(self, thickness, length, radius, coefficient):
-        min = 0
-        max = length
-        x = 0
-
-        # Do a binary search to see where f(x) = thickness, to 1 mm
-        while (max - min) > 0.1:
-            y = self.haack_y(length - x, length, radius, coefficient)
-            if (y == thickness):
-                return x
-            if (y > thickness):
-                min = x
-            else:
-                max = x
-            x = (max - min) / 2 + min
-        return x
+        # Find where the profile radius equals the thickness
+        return findRoot(lambda x: self.haack_y(length - x, length, radius, coefficient) - thickness, 0.0, length)
 
     def drawSolid(self):
         outer_curve = self.haack_curve(self._length, self._radius, self._resolution, self._coefficient)
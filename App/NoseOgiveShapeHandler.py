@@ -24,10 +24,11 @@ __title__ = "FreeCAD Ogive Nose Shape Handler"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
-import FreeCAD
 import math
 
 from App.NoseShapeHandler import NoseShapeHandler
+from App.ProfileKernels import ogiveY
+from App.RootFinder import findRoot
 
 class NoseOgiveShapeHandler(NoseShapeHandler):
             
@@ -45,34 +46,13 @@ class NoseOgiveShapeHandler(NoseShapeHandler):
 
     def ogive_curve(self, length, radius, resolution, min = 0):
         rho = (radius * radius + length * length) / (2.0 * radius)
-        points = []
-        for i in range(0, resolution):
-            
-            x = float(i) * ((length - min) / float(resolution))
-            y = self.ogive_y(x, length, radius, rho)
-            points.append(FreeCAD.Vector(length - x, y))
-
-        points.append(FreeCAD.Vector(min, radius))
-        return points
+        return self.makeProfile(lambda x: ogiveY(x, length, radius, rho), length, radius, resolution, min)
             
     def findOgiveY(self, thickness, length, radius):
         rho = (radius * radius + length * length) / (2.0 * radius)
 
-        min = 0
-        max = length
-        x = 0
-
-        # Do a binary search to see where f(x) = thickness, to 1 mm
-        while (max - min) > 0.1:
-            y = self.ogive_y(length - x, length, radius, rho)
-            if (y == thickness):
-                return x
-            if (y > thickness):
-                min = x
-            else:
-                max = x
-            x = (max - min) / 2 + min
-        return x
+        # Find where the profile radius equals the thickness
+        return findRoot(lambda x: self.ogive_y(length - x, length, radius, rho) - thickness, 0.0, length)
 
     def drawSolid(self):
         outer_curve = self.ogive_curve(self._length, self._radius, self._resolution)
@@ -24,12 +24,13 @@ __title__ = "FreeCAD Power Series Nose Shape Handler"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
-import FreeCAD
 import math
 
 from DraftTools import translate
 
 from App.NoseShapeHandler import NoseShapeHandler
+from App.ProfileKernels import powerY
+from App.RootFinder import findRoot
 from App.Utilities import _err
     
 class NosePowerShapeHandler(NoseShapeHandler):
@@ -52,32 +53,11 @@ class NosePowerShapeHandler(NoseShapeHandler):
         return inner_minor
 
     def power_curve(self, length, radius, resolution, k, min = 0):
-        points = []
-        for i in range(0, resolution):
-            
-            x = float(i) * ((length - min) / float(resolution))
-            y = self.power_y(x, length, radius, k)
-            points.append(FreeCAD.Vector(length - x, y))
-
-        points.append(FreeCAD.Vector(min, radius))
-        return points
+        return self.makeProfile(lambda x: powerY(x, length, radius, k), length, radius, resolution, min)
             
     def findPowerY(self, thickness, length, radius, k):
-        min = 0
-        max = length
-        x = 0
-
-        # Do a binary search to see where f(x) = thickness, to 1 mm
-        while (max - min) > 0.1:
-            y = self.power_y(length - x, length, radius, k)
-            if (y == thickness):
-                return x
-            if (y > thickness):
-                min = x
-            else:
-                max = x
-            x = (max - min) / 2 + min
-        return x
+        # Find where the profile radius equals the thickness
+        return findRoot(lambda x: self.power_y(length - x, length, radius, k) - thickness, 0.0, length)
 
 
     def drawSolid(self):
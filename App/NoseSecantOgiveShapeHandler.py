@@ -24,10 +24,11 @@ __title__ = "FreeCAD Ogive Nose Shape Handler"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
-import FreeCAD
 import math
 
 from App.NoseShapeHandler import NoseShapeHandler
+from App.ProfileKernels import secantOgiveY
+from App.RootFinder import findRoot
 
 class NoseSecantOgiveShapeHandler(NoseShapeHandler):
 
@@ -57,34 +58,18 @@ class NoseSecantOgiveShapeHandler(NoseShapeHandler):
         rho = self.getRho()
         alpha = self.getAlpha(length, radius)
 
-        points = []
-        for i in range(0, resolution):
-            
-            x = float(i) * ((length - min) / float(resolution))
-            y = self.ogive_y(length - x, length, rho, alpha)
-            points.append(FreeCAD.Vector(length - x, y))
-
-        points.append(FreeCAD.Vector(min, radius))
-        return points
+        return self.makeProfile(lambda x: secantOgiveY(length - x, length, rho, alpha), length, radius, resolution, min)
             
     def findOgiveY(self, thickness, length, radius):
         rho = self.getRho()
 
-        min = 0
-        max = length
-        x = (max - min) / 2 + min
-
-        # Do a binary search to see where f(x) = thickness, to 1 mm
-        while (max - min) > 0.0001:
-            x = (max - min) / 2 + min
+        def thicknessError(x):
             alpha = self.getAlpha(length - x, radius)
-            y = self.ogive_y(length - x, length, rho, alpha)
-            if (y == thickness):
-                return length - x
-            if (y < thickness):
-                min = x
-            else:
-                max = x
+            return self.ogive_y(length - x, length, rho, alpha) - thickness
+
+        # The radius is zero at x = 0 and equal to the base radius at x = length / 2, which brackets
+        # the thickness. Past the middle the profile isn't monotonic, and is undefined at x = length
+        x = findRoot(thicknessError, 0.0, length / 2.0)
         return length - x
 
     def drawSolid(self):
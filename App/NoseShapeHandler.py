@@ -35,9 +35,15 @@ from App.Constants import STYLE_CAPPED, STYLE_HOLLOW, STYLE_SOLID
 from App.Constants import STYLE_CAP_BAR, STYLE_CAP_CROSS
 from App.Constants import TYPE_BLUNTED_CONE, TYPE_BLUNTED_OGIVE, TYPE_SECANT_OGIVE
 
+from App.ProfileSpline import ProfileCurve
 from App.Utilities import _err
 
 class NoseShapeHandler():
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["NoseType", "NoseStyle", "Length", "Diameter", "Thickness", "BluntedDiameter", "OgiveDiameter",
+                       "Coefficient", "Resolution", "Shoulder", "ShoulderDiameter", "ShoulderLength", "ShoulderThickness",
+                       "CapStyle", "CapBarWidth"]
+
     def __init__(self, obj):
 
         # This gets changed when redrawn so it's very important to save a copy
@@ -63,10 +69,12 @@ class NoseShapeHandler():
         self._resolution = int(obj.Resolution)
         self._obj = obj
 
-    def makeSpline(self, points):
-        spline = Part.BSplineCurve()
-        spline.buildFromPoles(points)
-        return spline
+    def makeProfile(self, function, length, radius, resolution, min = 0):
+        """ The profile function(x) at distance x from the tip, running from the tip to (min, radius) """
+        return ProfileCurve(function, length - min, lambda x, y: FreeCAD.Vector(length - x, y), resolution, last=radius)
+
+    def makeSpline(self, profile):
+        return profile.toSpline()
 
     def isValidShape(self):
         # Perform some general validations
@@ -156,7 +164,7 @@ class NoseShapeHandler():
                     edges = self.drawCappedShoulder()
                 else:
                     edges = self.drawCapped()
-        except (ZeroDivisionError, Part.OCCError):
+        except (ValueError, ZeroDivisionError, Part.OCCError):
             _err(translate('Rocket', "Nose cone parameters produce an invalid shape"))
             return
 
@@ -24,11 +24,23 @@ __title__ = "FreeCAD Open Rocket Part Body Tube"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
-from App.Parts.Component import Component
+from App.Parts.Component import Component, _searchClause, _pageClause
 from App.Parts.Exceptions import MultipleEntryError, NotFoundError
+from App.Parts.Utilities import _toMillimeters
+from App.Parts.Volume import tubeVolume
 from App.Constants import COMPONENT_TYPE_ANY, COMPONENT_TYPE_BODYTUBE, COMPONENT_TYPE_COUPLER, \
     COMPONENT_TYPE_LAUNCHLUG, COMPONENT_TYPE_ENGINEBLOCK, COMPONENT_TYPE_CENTERINGRING, COMPONENT_TYPE_BULKHEAD
 
+# Tube type names used by the models, and in the database
+_tubeTypes = {
+    'body tube': COMPONENT_TYPE_BODYTUBE,
+    'coupler': COMPONENT_TYPE_COUPLER,
+    'launch lug': COMPONENT_TYPE_LAUNCHLUG,
+    'engine block': COMPONENT_TYPE_ENGINEBLOCK,
+    'centering ring': COMPONENT_TYPE_CENTERINGRING,
+    'bulkhead' : COMPONENT_TYPE_BULKHEAD
+}
+
 class BodyTube(Component):
 
     def __init__(self):
@@ -52,36 +64,34 @@ class BodyTube(Component):
         self.validateNonEmptyString(self._OD[1], "OD Units invalid '%s" % self._OD[1])
         self.validateNonEmptyString(self._length[1], "Length Units invalid '%s" % self._length[1])
 
-    def persist(self, connection):
-        component_id = super().persist(connection)
-
-        # May throw a NotFoundError
-        tube_id = getTubeType(connection, self._tubeType)
-
-        cursor = connection.cursor()
+    def componentType(self):
+        return _tubeTypes[self._tubeType]
 
-        cursor.execute("INSERT INTO body_tube (component_index, tube_type_index, inner_diameter, inner_diameter_units, outer_diameter, outer_diameter_units, length, length_units) VALUES (?,?,?,?,?,?,?,?)",
-                            (component_id, tube_id, self._ID[0], self._ID[1], self._OD[0], self._OD[1], self._length[0], self._length[1]))
-        id = cursor.lastrowid
+    def estimatedVolume(self):
+        return tubeVolume(_toMillimeters(*self._OD), _toMillimeters(*self._ID), _toMillimeters(*self._length))
 
-        connection.commit()
-
-        return id
+    def persist(self, loader):
+        component_id = super().persist(loader)
+        # May throw a NotFoundError
+        tube_id = loader.lookup("tube_type", getTubeType, self._tubeType)
+
+        return loader.insert("body_tube", {"component_index" : component_id,
+                                           "tube_type_index" : tube_id,
+                                           "inner_diameter" : self._ID[0],
+                                           "inner_diameter_units" : self._ID[1],
+                                           "outer_diameter" : self._OD[0],
+                                           "outer_diameter_units" : self._OD[1],
+                                           "length" : self._length[0],
+                                           "length_units" : self._length[1],
+                                           "inner_diameter_mm" : _toMillimeters(*self._ID),
+                                           "outer_diameter_mm" : _toMillimeters(*self._OD),
+                                           "length_mm" : _toMillimeters(*self._length)})
 
 def getTubeType(connection, tubeType):
     cursor = connection.cursor()
 
-    alias = {
-        'body tube': COMPONENT_TYPE_BODYTUBE,
-        'coupler': COMPONENT_TYPE_COUPLER,
-        'launch lug': COMPONENT_TYPE_LAUNCHLUG,
-        'engine block': COMPONENT_TYPE_ENGINEBLOCK,
-        'centering ring': COMPONENT_TYPE_CENTERINGRING,
-        'bulkhead' : COMPONENT_TYPE_BULKHEAD
-    }
-
     cursor.execute("SELECT tube_type_index FROM tube_type WHERE type=:type", {
-                        "type" : alias[tubeType]
+                        "type" : _tubeTypes[tubeType]
                     })
 
     rows = cursor.fetchall()
@@ -90,22 +100,22 @@ def getTubeType(connection, tubeType):
 
     return rows[0]['tube_type_index']
 
-def listBodyTubes(connection, tubeType=None):
+def listBodyTubes(connection, tubeType=None, search=None, order=None, descending=False, limit=-1, offset=0):
     cursor = connection.cursor()
 
+    parameters = {}
     if tubeType is None or tubeType == COMPONENT_TYPE_ANY:
-        cursor.execute("""SELECT body_tube_index, type, manufacturer, part_number, description, inner_diameter, inner_diameter_units, 
-                            outer_diameter, outer_diameter_units, length, length_units
-                        FROM component c, body_tube b, tube_type t
-                        WHERE b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index
-                            AND NOT t.type = 'Centering Ring' AND NOT t.type = 'Bulkhead'""")
+        where = " AND t.type IN ('Body Tube', 'Tube Coupler', 'Engine Block', 'Launch Lug')"
     else:
-        cursor.execute("""SELECT body_tube_index, type, manufacturer, part_number, description, inner_diameter, inner_diameter_units, 
-                            outer_diameter, outer_diameter_units, length, length_units
-                        FROM component c, body_tube b, tube_type t 
-                        WHERE b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index AND t.type = :type""", {
-                            "type" : tubeType
-                        })
+        where = " AND t.type = :type"
+        parameters["type"] = tubeType
+    where += _searchClause(connection, search, parameters)
+
+    cursor.execute("""SELECT body_tube_index, c.component_index, type, manufacturer, part_number, description, inner_diameter, inner_diameter_units, 
+                        outer_diameter, outer_diameter_units, length, length_units, inner_diameter_mm, outer_diameter_mm, length_mm, estimated_mass
+                    FROM component c, body_tube b, tube_type t
+                    WHERE b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index""" + where +
+                    _pageClause(order, descending, limit, offset, parameters), parameters)
 
     rows = cursor.fetchall()
     return rows
@@ -114,7 +124,8 @@ def getBodyTube(connection, index):
     cursor = connection.cursor()
 
     cursor.execute("""SELECT body_tube_index, c.manufacturer, part_number, description, material_name, mass, mass_units,
-                        inner_diameter, inner_diameter_units, outer_diameter, outer_diameter_units, length, length_units
+                        inner_diameter, inner_diameter_units, outer_diameter, outer_diameter_units, length, length_units,
+                        mass_kg, estimated_mass, estimated_volume, inner_diameter_mm, outer_diameter_mm, length_mm
                     FROM component c, body_tube b, material m WHERE b.component_index = c.component_index AND c.material_index = m.material_index AND b.body_tube_index = :index""", {
                         "index" : index
                     })
@@ -127,3 +138,34 @@ def getBodyTube(connection, index):
         raise MultipleEntryError()
 
     return rows[0]
+
+def listCompatibleTubes(connection, index, tolerance=0.5):
+    """
+    Parts of the other tube types that fit the selected part to within tolerance mm, closest first.
+    The fit is 'inside' for parts that fit within the selected part, such as couplers and bulkheads,
+    and 'outside' for parts that fit over it, such as centering rings on a motor tube
+    """
+    cursor = connection.cursor()
+
+    cursor.execute("""SELECT b.body_tube_index, c.component_index, t.type, manufacturer, part_number, description,
+                        b.inner_diameter, b.inner_diameter_units, b.outer_diameter, b.outer_diameter_units, b.length, b.length_units,
+                        b.inner_diameter_mm, b.outer_diameter_mm, b.length_mm, 'inside' AS fit, ABS(b.outer_diameter_mm - s.inner_diameter_mm) AS delta
+                    FROM body_tube s, body_tube b, component c, tube_type t
+                    WHERE s.body_tube_index = :index AND b.tube_type_index != s.tube_type_index
+                        AND b.outer_diameter_mm BETWEEN s.inner_diameter_mm - :tolerance AND s.inner_diameter_mm + :tolerance
+                        AND b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index
+                    UNION ALL
+                    SELECT b.body_tube_index, c.component_index, t.type, manufacturer, part_number, description,
+                        b.inner_diameter, b.inner_diameter_units, b.outer_diameter, b.outer_diameter_units, b.length, b.length_units,
+                        b.inner_diameter_mm, b.outer_diameter_mm, b.length_mm, 'outside' AS fit, ABS(b.inner_diameter_mm - s.outer_diameter_mm) AS delta
+                    FROM body_tube s, body_tube b, component c, tube_type t
+                    WHERE s.body_tube_index = :index AND b.tube_type_index != s.tube_type_index
+                        AND b.inner_diameter_mm BETWEEN s.outer_diameter_mm - :tolerance AND s.outer_diameter_mm + :tolerance
+                        AND b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index
+                    ORDER BY delta, fit, type""", {
+                        "index" : index,
+                        "tolerance" : tolerance
+                    })
+
+    rows = cursor.fetchall()
+    return rows
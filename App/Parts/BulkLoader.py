@@ -0,0 +1,255 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for bulk loading the parts database"""
+
+__title__ = "FreeCAD Open Rocket Part Bulk Loader"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import time
+
+from App.Parts.Material import MaterialResolver
+from App.Parts.Utilities import _msg, _err
+
+# Primary key for each table populated by the importer
+_primaryKeys = {
+    "material" : "material_index",
+    "component" : "component_index",
+    "body_tube" : "body_tube_index",
+    "nose" : "nose_index",
+    "transition" : "transition_index",
+    "parachute" : "parachute_index",
+    "streamer" : "streamer_index"
+}
+
+# Natural keys for the tables with UNIQUE constraints
+_uniqueKeys = {
+    "material" : ("manufacturer", "material_name", "type"),
+    "component" : ("manufacturer", "part_number", "component_type")
+}
+
+# Columns that should agree between a skipped duplicate and the row already written
+_conflictColumns = {
+    "material" : ("density", "units")
+}
+
+# Columns referencing the tables with UNIQUE keys, and whether rows referencing a duplicate
+# are dropped with it rather than pointed at the row already written
+_references = {
+    "material_index" : ("material", False),
+    "line_material_index" : ("material", False),
+    "component_index" : ("component", True)
+}
+
+class BulkLoader:
+    """
+    Batches inserts for the parts database into a single transaction.
+
+    Primary keys are allocated here rather than by SQLite so that dependent rows can
+    reference a parent before it has been written, allowing each table to be written
+    with executemany().
+
+    Rows of the tables with UNIQUE keys are written with ON CONFLICT DO NOTHING, so SQLite
+    decides what is a duplicate. The keys of the skipped rows are resolved afterwards, and
+    the rows referencing them are written before their own tables. A duplicate part's child
+    rows are dropped, while references to a duplicate material use the material already written.
+    """
+
+    def __init__(self, connection, batchSize=1000):
+        self._connection = connection
+        self._batchSize = batchSize
+
+        self._columns = {}
+        self._pending = {}
+        self._nextIndex = {}
+        self._lookups = {}
+        self._materials = None
+        self._duplicates = {}
+        self._existing = {table : {} for table in _uniqueKeys}
+
+        self._rowCount = {}
+        self._insertTime = {}
+        self._startTime = time.perf_counter()
+
+    def connection(self):
+        return self._connection
+
+    def materials(self):
+        """ The material resolver, including every material queued so far """
+        self.flush("material")
+        return self._resolver()
+
+    def _resolver(self):
+        if self._materials is None:
+            self._materials = MaterialResolver(self._connection)
+        return self._materials
+
+    def nextIndexes(self):
+        """ The next primary key to be allocated for each table """
+        if len(self._nextIndex) < len(_primaryKeys):
+            cursor = self._connection.cursor()
+            for table in _primaryKeys:
+                if table not in self._nextIndex:
+                    cursor.execute("SELECT MAX(%s) FROM %s" % (_primaryKeys[table], table))
+                    last = cursor.fetchone()[0]
+                    self._nextIndex[table] = (last or 0) + 1
+
+        return dict(self._nextIndex)
+
+    def _allocateIndex(self, table):
+        if table not in self._nextIndex:
+            self.nextIndexes()
+
+        index = self._nextIndex[table]
+        self._nextIndex[table] += 1
+        return index
+
+    def insert(self, table, values):
+        """
+        Queue a row for insertion, returning its primary key. A row with the same unique key
+        as an existing row is skipped when it's written
+        """
+        index = self._allocateIndex(table)
+
+        if table not in self._columns:
+            self._columns[table] = (_primaryKeys[table],) + tuple(values.keys())
+            self._pending[table] = []
+
+        self._pending[table].append((index,) + tuple(values[column] for column in self._columns[table][1:]))
+        self._lookups.pop(table, None)
+
+        if len(self._pending[table]) >= self._batchSize:
+            self.flush(table)
+
+        return index
+
+    def lookup(self, table, function, *args):
+        """
+        Memoized function(connection, *args) against the given table. The result is
+        discarded when new rows are inserted into that table.
+        """
+        cache = self._lookups.setdefault(table, {})
+        key = (function, args)
+        if key not in cache:
+            self.flush(table)
+            cache[key] = function(self._connection, *args)
+        return cache[key]
+
+    def flush(self, table=None):
+        if table is None:
+            for pending in list(self._pending.keys()):
+                self.flush(pending)
+            return
+
+        if not self._pending.get(table):
+            return
+
+        # Duplicates in the referenced tables have to be known before these rows are written
+        columns = self._columns[table]
+        for column in columns[1:]:
+            if column in _references and _references[column][0] != table:
+                self.flush(_references[column][0])
+
+        rows = self._resolveReferences(columns, self._pending[table])
+        self._pending[table] = []
+        if len(rows) < 1:
+            return
+
+        sql = "INSERT INTO %s (%s) VALUES (%s)" % (table, ", ".join(columns), ",".join("?" * len(columns)))
+        if table in _uniqueKeys:
+            sql += " ON CONFLICT (%s) DO NOTHING" % ", ".join(_uniqueKeys[table])
+        if table == "material":
+            # Created first so it doesn't load the new rows from the database as well
+            materials = self._resolver()
+
+        start = time.perf_counter()
+        cursor = self._connection.cursor()
+        cursor.executemany(sql, rows)
+        self._insertTime[table] = self._insertTime.get(table, 0.0) + time.perf_counter() - start
+        self._rowCount[table] = self._rowCount.get(table, 0) + cursor.rowcount
+
+        if cursor.rowcount < len(rows):
+            self._resolveDuplicates(table, rows)
+        if table == "material":
+            for row in rows:
+                if row[0] not in self._existing[table]:
+                    values = dict(zip(columns, row))
+                    materials.add(row[0], values["manufacturer"], values["material_name"], values["type"], values["density"],
+                                    values["units"], values["density_si"])
+
+    def _resolveReferences(self, columns, rows):
+        """ Rows with their references to duplicates resolved, dropping the rows of duplicate parts """
+        references = [(position, _references[column]) for position, column in enumerate(columns) if position > 0 and column in _references]
+        if len(references) < 1:
+            return rows
+
+        resolved = []
+        for row in rows:
+            for position, (table, drop) in references:
+                existing = self._existing[table].get(row[position])
+                if existing is not None:
+                    if drop:
+                        break
+                    row = row[:position] + (existing,) + row[position + 1:]
+            else:
+                resolved.append(row)
+        return resolved
+
+    def _resolveDuplicates(self, table, rows):
+        """ Find the rows the conflict clause skipped, and the existing rows they duplicate """
+        primaryKey = _primaryKeys[table]
+        columns = self._columns[table]
+        cursor = self._connection.cursor()
+        cursor.execute("SELECT %s FROM %s WHERE %s BETWEEN ? AND ?" % (primaryKey, table, primaryKey), (rows[0][0], rows[-1][0]))
+        written = {row[0] for row in cursor.fetchall()}
+
+        keys = [columns.index(column) for column in _uniqueKeys[table]]
+        conflicts = _conflictColumns.get(table, ())
+        for row in rows:
+            if row[0] in written:
+                continue
+
+            cursor.execute("SELECT %s FROM %s WHERE %s" % (", ".join((primaryKey,) + conflicts), table, " AND ".join(["%s = ?" % column for column in _uniqueKeys[table]])),
+                            tuple(row[position] for position in keys))
+            existing = cursor.fetchone()
+            self._existing[table][row[0]] = existing[0]
+            self._duplicates[table] = self._duplicates.get(table, 0) + 1
+
+            values = tuple(row[columns.index(column)] for column in conflicts)
+            if values != tuple(existing[1:]):
+                _err("Skipped duplicate %s %s: %s %s differs from %s" % (table, str(tuple(row[position] for position in keys)), ", ".join(conflicts),
+                        str(values), str(tuple(existing[1:]))))
+
+    def commit(self):
+        self.flush()
+        self._connection.commit()
+
+    def report(self):
+        elapsed = time.perf_counter() - self._startTime
+        total = 0
+        for table in self._rowCount:
+            count = self._rowCount[table]
+            seconds = self._insertTime[table]
+            total += count
+            _msg("%-12s %8d rows %8.3fs %12.0f rows/sec" % (table, count, seconds, count / max(seconds, 1e-9)))
+        for table in self._duplicates:
+            _msg("%-12s %8d duplicates skipped" % (table, self._duplicates[table]))
+        _msg("%-12s %8d rows %8.3fs %12.0f rows/sec" % ("total", total, elapsed, total / max(elapsed, 1e-9)))
@@ -26,10 +26,24 @@ __url__ = "https://www.davesrocketshop.com"
 
 from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_SURFACE, MATERIAL_TYPE_LINE
 from App.Parts.Exceptions import InvalidError, MaterialNotFoundError, NotFoundError
-from App.Parts.Material import getMaterial, getMaterialAnyType
+from App.Parts.Utilities import _toKilograms
+from App.Parts.Volume import estimateMass
+
+# Number of results returned by a fuzzy search
+FUZZY_LIMIT = 50
+
+# Fuzzy searches rank this many times the results requested from the trigram index by their similarity
+_FUZZY_CANDIDATES = 4
+
+# Weights of the part number and description similarity, as in the trigram index ranking
+_PART_NUMBER_WEIGHT = 4.0
+_DESCRIPTION_WEIGHT = 1.0
 
 class Component:
 
+    # Part numbers are unique for each manufacturer and component type, given by each part class
+    _componentType = None
+
     def __init__(self):
         self._manufacturer = ""
         self._partNumber = ""
@@ -71,27 +85,38 @@ class Component:
         if self._mass[0] > 0.0: # No units required for 0 mass
             self.validateNonEmptyString(self._mass[1], "_mass units invalid")
 
-    def persist(self, connection):
+    def componentType(self):
+        return self._componentType
+
+    def estimatedVolume(self):
+        # Volume in mm^3 from the catalog dimensions, where the shape is known
+        return None
+
+    def persist(self, loader):
+        materials = loader.materials()
         try:
-            # material_index = Material.getMaterial(connection, self._manufacturer, self._material[0], self._material[1])
-            material_index = getMaterial(connection, self._manufacturer, self._material[0], self._material[1])
+            material_index = materials.getMaterial(self._manufacturer, self._material[0], self._material[1])
         except MaterialNotFoundError:
             try:
                 print("Unable to find material for '%s':'%s' - setting to any type" % (self._manufacturer, self._partNumber))
-                material_index = getMaterialAnyType(connection, self._manufacturer, self._material[0])
+                material_index = materials.getMaterialAnyType(self._manufacturer, self._material[0])
             except MaterialNotFoundError:
                 print("Unable to find material for '%s':'%s' - setting to unspecified" % (self._manufacturer, self._partNumber))
-                material_index = getMaterial(connection, 'unspecified', 'unspecified', self._material[1])
-
-        cursor = connection.cursor()
+                material_index = materials.getMaterial('unspecified', 'unspecified', self._material[1])
 
-        cursor.execute("INSERT INTO component (manufacturer, part_number, description, material_index, mass, mass_units) VALUES (?,?,?,?,?,?)",
-                            (self._manufacturer, self._partNumber, self._description, material_index, self._mass[0], self._mass[1]))
-        id = cursor.lastrowid
+        volume = self.estimatedVolume()
 
-        connection.commit()
-
-        return id
+        # The loader drops a duplicate part along with its child row
+        return loader.insert("component", {"manufacturer" : self._manufacturer,
+                                           "part_number" : self._partNumber,
+                                           "component_type" : self.componentType(),
+                                           "description" : self._description,
+                                           "material_index" : material_index,
+                                           "mass" : self._mass[0],
+                                           "mass_units" : self._mass[1],
+                                           "mass_kg" : _toKilograms(*self._mass),
+                                           "estimated_volume" : volume,
+                                           "estimated_mass" : estimateMass(volume, materials.bulkDensity(material_index))})
 
 def getManufacturers(connection):
     cursor = connection.cursor()
@@ -104,3 +129,151 @@ def getManufacturers(connection):
 
     manufacturers = [row[0] for row in rows]
     return manufacturers
+
+def _searchQuery(text):
+    """ FTS5 query matching every word of the text as a prefix. Punctuation on its own is ignored """
+    return " ".join(['"%s"*' % word.replace('"', '""') for word in str(text).split() if any(c.isalnum() for c in word)])
+
+def _ftsMatches(connection, table, parameter):
+    """ Component indexes matching the full text query, including the negated indexes of any user overlay """
+    if getattr(connection, "overlay", False):
+        return "SELECT rowid FROM main.%s(:%s) UNION ALL SELECT -rowid FROM overlay.%s(:%s)" % (table, parameter, table, parameter)
+    return "SELECT rowid FROM %s(:%s)" % (table, parameter)
+
+def _searchMatches(connection):
+    """ Component indexes matching :search """
+    return _ftsMatches(connection, "component_search", "search")
+
+def _fuzzyText(text):
+    """
+    Text reduced to lower case letters and digits, so 'BT-50', 'BT50' and 'bt 50' are the same. An
+    'o' next to a digit is taken as a zero, so 'BT-5O' is the same again
+    """
+    characters = [c for c in str(text).casefold() if c.isalnum()]
+    for i, c in enumerate(characters):
+        if c == 'o' and ((i > 0 and characters[i - 1].isdigit()) or (i + 1 < len(characters) and characters[i + 1].isdigit())):
+            characters[i] = '0'
+    return "".join(characters)
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+def _similarity(normalized, partNumber, description):
+    """
+    How closely a part matches the normalized search text, by the share of the search trigrams found
+    in the part number and description. Ties go to the part number closest to the search text as a
+    whole, so 'BT-50' ranks above 'BT-50H'
+    """
+    search = _trigrams(normalized)
+    if len(search) < 1:
+        return 0.0
+
+    part = _trigrams(_fuzzyText(partNumber))
+    partContains = len(search & part) / len(search)
+    partSimilarity = 2.0 * len(search & part) / (len(search) + len(part))
+    descriptionContains = len(search & _trigrams(_fuzzyText(description))) / len(search)
+    return _PART_NUMBER_WEIGHT * partContains + _DESCRIPTION_WEIGHT * descriptionContains + partSimilarity
+
+def _fuzzyQuery(text):
+    """ FTS5 query matching any trigram of the normalized text. Empty when it's too short to have one """
+    normalized = _fuzzyText(text)
+    trigrams = dict.fromkeys([normalized[i:i + 3] for i in range(len(normalized) - 2)])
+    return " OR ".join(['"%s"' % trigram for trigram in trigrams])
+
+def _fuzzyMatches(connection):
+    """
+    The best :fuzzy_limit trigram matches for :fuzzy, as (component_index, score) rows. Scores
+    are bm25 ranks, where lower is better
+    """
+    query = "SELECT %s AS component_index, rank AS score FROM (SELECT rowid, rank FROM %s.component_trigram(:fuzzy) ORDER BY rank LIMIT :fuzzy_limit)"
+    if getattr(connection, "overlay", False):
+        return (query % ("rowid", "main")) + " UNION ALL " + (query % ("-rowid", "overlay"))
+    return query % ("rowid", "main")
+
+def _searchClause(connection, search, parameters):
+    """
+    Restricts a list query to components matching the search text, either with every word as a
+    prefix or as a substring of the normalized part number or description. When nothing matches,
+    the best fuzzy matches are used instead, and ranked first by _pageClause
+    """
+    if search is None or len(_searchQuery(search)) < 1:
+        return ""
+
+    parameters["search"] = _searchQuery(search)
+    matches = _searchMatches(connection)
+
+    fuzzy = _fuzzyQuery(search)
+    if len(fuzzy) < 1:
+        return " AND c.component_index IN (%s)" % matches
+
+    parameters["substring"] = '"%s"' % _fuzzyText(search)
+    matches += " UNION ALL " + _ftsMatches(connection, "component_trigram", "substring")
+
+    cursor = connection.cursor()
+    cursor.execute("SELECT EXISTS (%s)" % matches, parameters)
+    if cursor.fetchone()[0]:
+        return " AND c.component_index IN (%s)" % matches
+
+    # The best fuzzy matches, ranked for _pageClause
+    ranking = [index for index, score in fuzzySearchComponents(connection, search)]
+    if len(ranking) < 1:
+        return " AND 0"
+    parameters["fuzzy_ranking"] = ranking
+    return " AND c.component_index IN (%s)" % ", ".join(["%d" % index for index in ranking])
+
+def _pageClause(order, descending, limit, offset, parameters):
+    """
+    Orders a list query by a result column, with the component index keeping pages stable. Without
+    a column, fuzzy matches are ordered best first
+    """
+    parameters["limit"] = limit
+    parameters["offset"] = offset
+    ranking = parameters.pop("fuzzy_ranking", None)
+    if order is None:
+        if ranking is not None:
+            cases = " ".join(["WHEN %d THEN %d" % (index, rank) for rank, index in enumerate(ranking)])
+            return " ORDER BY CASE c.component_index %s END LIMIT :limit OFFSET :offset" % cases
+        return " ORDER BY c.component_index LIMIT :limit OFFSET :offset"
+    return ' ORDER BY "%s" %s, c.component_index LIMIT :limit OFFSET :offset' % (order.replace('"', '""'), "DESC" if descending else "ASC")
+
+def searchComponents(connection, text):
+    """
+    Component indexes matching every word of the search text. Each word is matched
+    as a prefix against the manufacturer, part number, description and material
+    """
+    query = _searchQuery(text)
+    if len(query) < 1:
+        return set()
+
+    cursor = connection.cursor()
+    cursor.execute(_searchMatches(connection), {
+                        "search" : query
+                    })
+
+    return {row[0] for row in cursor.fetchall()}
+
+def fuzzySearchComponents(connection, text, limit=FUZZY_LIMIT):
+    """
+    The components whose part number or description best match the search text, ignoring case,
+    spaces and punctuation. Returns up to limit (component_index, score) tuples, best first.
+    Higher scores are better matches.
+
+    The trigram index finds the candidates, which are ranked by the trigrams they share with the
+    search text. A short part number matching the text outright ranks above a longer one that
+    only contains it, which the index ranking can't tell apart
+    """
+    query = _fuzzyQuery(text)
+    if len(query) < 1:
+        return []
+
+    cursor = connection.cursor()
+    cursor.execute("""SELECT m.component_index, part_number, description, score FROM (%s) m, component c
+                        WHERE c.component_index = m.component_index""" % _fuzzyMatches(connection), {
+                        "fuzzy" : query,
+                        "fuzzy_limit" : limit * _FUZZY_CANDIDATES
+                    })
+
+    normalized = _fuzzyText(text)
+    results = [(_similarity(normalized, row[1], row[2]), row[3], row[0]) for row in cursor.fetchall()]
+    results.sort(key=lambda result: (-result[0], result[1], result[2]))
+    return [(result[2], result[0]) for result in results[:limit]]
@@ -0,0 +1,282 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Shared read only connections to the parts database"""
+
+__title__ = "FreeCAD Open Rocket Part Database Connections"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from os import path, stat
+from pathlib import Path
+
+from App.Parts.PartSchema import checkDatabase, upgradeDatabase
+from App.Parts.Utilities import _err
+
+# The workbench folder, containing Resources/parts/Parts.db
+_workbenchFolder = path.dirname(path.dirname(path.dirname(path.abspath(__file__))))
+
+_managers = {}
+_managersLock = threading.Lock()
+
+# Tables shown through the overlay views, with the key columns negated for overlay rows
+_overlayKeys = {
+    "material" : ["material_index"],
+    "component" : ["component_index", "material_index"],
+    "body_tube" : ["body_tube_index", "component_index"],
+    "nose" : ["nose_index", "component_index"],
+    "transition" : ["transition_index", "component_index"],
+    "parachute" : ["parachute_index", "component_index", "line_material_index"],
+    "streamer" : ["streamer_index", "component_index"],
+    "body_tube_rtree" : ["body_tube_index"],
+    "nose_rtree" : ["nose_index"],
+    "transition_rtree" : ["transition_index"]
+}
+
+# Key columns referring to a material, which may be a copy of a catalog material
+_materialKeys = ["material_index", "line_material_index"]
+
+class PartConnection(sqlite3.Connection):
+    """ Connection to the parts database, noting whether a user overlay is attached """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.overlay = False
+
+def databasePath(rootFolder=None):
+    """ The parts database below rootFolder, defaulting to the installed workbench """
+    if rootFolder is None:
+        rootFolder = _workbenchFolder
+    return path.abspath(path.join(rootFolder, "Resources", "parts", "Parts.db"))
+
+class ConnectionManager:
+    """
+    Pool of read only connections to a parts database, with a cache of query results.
+
+    The database is opened as immutable, so the pool should be closed before the file is
+    rebuilt. Changes made by another process are detected from the file modification time
+    and size, discarding the idle connections and the cached results. The catalog is never
+    written, so a catalog with an earlier schema raises SchemaVersionError, while an overlay
+    written by an earlier version of the workbench is upgraded before it is opened.
+
+    When an overlay database of user parts exists it is attached, and temporary views with the
+    same names as the catalog tables show the rows of both. Overlay rows have their keys negated
+    so they can't collide with catalog rows, except for references to the catalog materials
+    """
+
+    def __init__(self, filename, overlay=None, poolSize=4, cachedStatements=256, mmapSize=64 * 1024 * 1024, cacheSize=128):
+        self._filename = filename
+        self._overlay = overlay
+        self._poolSize = poolSize
+        self._cachedStatements = cachedStatements
+        self._mmapSize = mmapSize
+        self._cacheSize = cacheSize
+
+        self._lock = threading.Lock()
+        self._idle = []
+        self._active = {}
+        self._generation = 0
+        self._upgrade()
+        self._fileStamp = self._stamp()
+        self._cache = OrderedDict()
+
+    def filename(self):
+        return self._filename
+
+    def connect(self):
+        """ A new read only connection outside of the pool, which the caller must close """
+        connection = sqlite3.connect(Path(self._filename).as_uri() + "?mode=ro&immutable=1", uri=True, factory=PartConnection,
+                                        cached_statements=self._cachedStatements, check_same_thread=False)
+        connection.row_factory = sqlite3.Row
+        if self._overlay is not None and path.isfile(self._overlay):
+            self._attachOverlay(connection)
+        connection.execute("PRAGMA query_only = ON")
+        connection.execute("PRAGMA mmap_size = %d" % self._mmapSize)
+        return connection
+
+    def _attachOverlay(self, connection):
+        connection.execute("ATTACH DATABASE ? AS overlay", (Path(path.abspath(self._overlay)).as_uri() + "?mode=ro",))
+
+        # Catalog materials used by the overlay parts are copied into the overlay. The copies keep their
+        # catalog keys, and are shown as the catalog rows
+        copies = connection.execute("SELECT COUNT(*) FROM overlay.sqlite_master WHERE type = 'table' AND name = 'catalog_material'").fetchone()[0] > 0
+        catalogMaterials = "SELECT material_index FROM overlay.catalog_material"
+
+        for table, keys in _overlayKeys.items():
+            columns = [row["name"] for row in connection.execute("PRAGMA main.table_info(%s)" % table)]
+            overlayColumns = []
+            for column in columns:
+                if copies and table != "material" and column in _materialKeys:
+                    overlayColumns.append("CASE WHEN %s IN (%s) THEN %s ELSE -%s END AS %s" % (column, catalogMaterials, column, column, column))
+                elif column in keys:
+                    overlayColumns.append("-%s AS %s" % (column, column))
+                else:
+                    overlayColumns.append(column)
+
+            where = ""
+            if copies and table == "material":
+                where = " WHERE material_index NOT IN (%s)" % catalogMaterials
+            connection.execute("CREATE TEMP VIEW %s AS SELECT %s FROM main.%s UNION ALL SELECT %s FROM overlay.%s%s" % (
+                                    table, ", ".join(columns), table, ", ".join(overlayColumns), table, where))
+        connection.overlay = True
+
+    def _upgrade(self):
+        # The catalog may be in a read only install folder, so only the user's overlay is upgraded
+        if self._overlay is not None and path.isfile(self._overlay):
+            try:
+                upgradeDatabase(self._overlay)
+            except sqlite3.Error as ex:
+                _err("Unable to upgrade the parts database '%s': %s" % (self._overlay, str(ex)))
+
+        # Querying a database with an earlier schema would fail on missing columns
+        for filename in [self._filename, self._overlay]:
+            if filename is not None and path.isfile(filename):
+                checkDatabase(filename)
+
+    def _stamp(self):
+        stamp = []
+        for filename in [self._filename, self._overlay]:
+            try:
+                info = stat(filename)
+                stamp.append((info.st_mtime_ns, info.st_size))
+            except (OSError, TypeError):
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _checkStamp(self):
+        """ Discard anything read from an earlier version of the database file """
+        stamp = self._stamp()
+        with self._lock:
+            if stamp == self._fileStamp:
+                return
+
+        # Upgrading changes the file again, so it is stamped afterwards
+        self._upgrade()
+        stamp = self._stamp()
+        with self._lock:
+            self._fileStamp = stamp
+            self._generation += 1
+            self._cache.clear()
+            stale = self._idle
+            self._idle = []
+
+        for connection in stale:
+            connection.close()
+
+    def acquire(self):
+        """ A connection from the pool, to be returned with release() """
+        self._checkStamp()
+        with self._lock:
+            if len(self._idle) > 0:
+                connection = self._idle.pop()
+            else:
+                connection = None
+            generation = self._generation
+
+        if connection is None:
+            connection = self.connect()
+
+        with self._lock:
+            self._active[connection] = generation
+        return connection
+
+    def release(self, connection):
+        with self._lock:
+            if connection not in self._active:
+                return
+            generation = self._active.pop(connection)
+
+            if generation == self._generation and len(self._idle) < self._poolSize:
+                self._idle.append(connection)
+                return
+
+        connection.close()
+
+    @contextmanager
+    def connection(self):
+        """ Use a pooled connection in a with statement """
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def query(self, function, *args, **kwargs):
+        """
+        Memoized function(connection, *args, **kwargs) for queries such as listBodyTubes(). Lists
+        of rows are returned as tuples, as the results are shared
+        """
+        self._checkStamp()
+        key = (function, args, tuple(sorted(kwargs.items())))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            generation = self._generation
+
+        with self.connection() as connection:
+            result = function(connection, *args, **kwargs)
+        if isinstance(result, list):
+            result = tuple(result)
+
+        with self._lock:
+            # Don't keep results from a file that has since changed
+            if generation == self._generation:
+                self._cache[key] = result
+                while len(self._cache) > self._cacheSize:
+                    self._cache.popitem(last=False)
+
+        return result
+
+    def close(self):
+        """ Close every connection, including any still in use """
+        with self._lock:
+            connections = self._idle + list(self._active)
+            self._idle = []
+            self._active = {}
+            self._cache.clear()
+
+        for connection in connections:
+            connection.close()
+
+def getConnectionManager(rootFolder=None, overlay=None):
+    """ The shared connection manager for the database below rootFolder, with an optional user overlay """
+    key = (databasePath(rootFolder), overlay)
+    with _managersLock:
+        if key not in _managers:
+            _managers[key] = ConnectionManager(key[0], overlay)
+        return _managers[key]
+
+def closeConnections(rootFolder=None):
+    """ Close the pooled connections to one database, or to all of them when no folder is given """
+    with _managersLock:
+        if rootFolder is None:
+            managers = list(_managers.values())
+            _managers.clear()
+        else:
+            filename = databasePath(rootFolder)
+            managers = [_managers.pop(key) for key in list(_managers) if key[0] == filename]
+
+    for manager in managers:
+        manager.close()
@@ -50,3 +50,9 @@ class NotFoundError(Exception):
 
     def __init__(self, message="Unknown material"):
         self._message = message
+
+class SchemaVersionError(Exception):
+
+    def __init__(self, message="Parts database schema is out of date"):
+        super().__init__(message)
+        self._message = message
@@ -24,9 +24,11 @@ __title__ = "FreeCAD Open Rocket Part Material"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
+import bisect
+
 # from App.OpenRocket import _msg, _err, _trace
 from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_SURFACE, MATERIAL_TYPE_LINE
-from App.Parts.Exceptions import InvalidError, MultipleEntryError, MaterialNotFoundError
+from App.Parts.Exceptions import InvalidError, MaterialNotFoundError
 
 class Material:
 
@@ -65,34 +67,123 @@ class Material:
             self.raiseInvalid("Invalid material tyle '%s'" % self._type)
         self.validateNonNegative(self._density, "Material type invalid")
 
-    def persist(self, connection):
-        cursor = connection.cursor()
-
-        # Check to see if an entry exists
-        cursor.execute("SELECT * FROM material WHERE manufacturer=:manufacturer AND material_name=:name AND  type=:type", 
-                            {
-                                "manufacturer" : self._manufacturer,
-                                "name" : self._name, 
-                                "type" :self._type
-                            })
-        row = cursor.fetchone()
-        if row is not None:
-            # See if this is a complete duplicate
-            if row['density'] == self._density and row['units'] == self._units:
-                return row['material_index']
-
-            raise MultipleEntryError("Material database contains multiple entries for material_name:'%s', type:'%s'" % (self._name, self._type))
-
-        cursor.execute("INSERT INTO material(manufacturer, material_name, type, density, units) VALUES (:manufacturer,:name,:type,:density,:units)",
-                            {"manufacturer" : self._manufacturer,
-                             "name" : self._name, 
-                             "type" : self._type,
-                             "density" : self._density,
-                             "units" : self._units})
-        id = cursor.lastrowid
-
-        connection.commit()
-        return id
+    def densitySI(self):
+        # Open Rocket stores densities in kg/m3, kg/m2 or kg/m by type, whatever the units say
+        return self._density
+
+    def persist(self, loader):
+        # The loader skips a material that is already defined, and adds the rest to its resolver
+        return loader.insert("material", {"manufacturer" : self._manufacturer,
+                                          "material_name" : self._name, 
+                                          "type" : self._type,
+                                          "density" : self._density,
+                                          "units" : self._units,
+                                          "density_si" : self.densitySI()})
+
+class MaterialResolver:
+    """
+    In memory index of the material table.
+
+    Lookups follow the same fallback rules as getMaterial() and getMaterialAnyType(),
+    with the first material added winning where the database would return several rows.
+
+    Materials are ordered by the position of their source file in the import order. When a
+    position is set, materials from later files are hidden, so an incremental update resolves
+    the materials of a file the same way as a complete rebuild.
+    """
+
+    def __init__(self, connection=None):
+        self._byManufacturer = {}
+        self._byType = {}
+        self._byName = {}
+        self._anyType = {}
+        self._byIndex = {}
+        self._position = None
+
+        if connection is not None:
+            cursor = connection.cursor()
+            cursor.execute("""SELECT m.material_index, manufacturer, material_name, type, density, units, density_si, f.position
+                            FROM material m LEFT JOIN source_range r ON r.table_name = 'material' AND m.material_index BETWEEN r.first_index AND r.last_index
+                                LEFT JOIN source_file f ON r.source_file_index = f.source_file_index""")
+            for row in cursor.fetchall():
+                self.add(*row)
+
+    def setPosition(self, position):
+        """ Position in the import order of the file being imported, or None to see every material """
+        self._position = position
+
+    def add(self, index, manufacturer, name, type, density, units, densitySI=None, position=None):
+        """ Add a material, by default at the current position """
+        row = {
+            "material_index" : index,
+            "manufacturer" : manufacturer,
+            "material_name" : name,
+            "type" : type,
+            "density" : density,
+            "units" : units,
+            "density_si" : densitySI
+        }
+
+        if position is None:
+            position = self._position
+        # Materials without a source file come first
+        entry = (-1 if position is None else position, index)
+
+        _manufacturer = str(manufacturer).casefold()
+        _name = str(name).casefold()
+
+        bisect.insort(self._byManufacturer.setdefault((_manufacturer, _name, type), []), entry)
+        bisect.insort(self._byType.setdefault((_name, type), []), entry)
+        bisect.insort(self._byName.setdefault(_name, []), entry)
+        bisect.insort(self._anyType.setdefault((manufacturer, name), []), entry)
+        self._byIndex[index] = row
+
+    def _visible(self, entries):
+        """ Indexes of the visible entries, first added first """
+        if entries is None:
+            return []
+        return [index for position, index in entries if self._position is None or position <= self._position]
+
+    def _first(self, entries):
+        indexes = self._visible(entries)
+        if len(indexes) < 1:
+            return None
+        return indexes[0]
+
+    def findByName(self, name, type):
+        """ Material of any manufacturer matching the name and type, or None """
+        return self._first(self._byType.get((str(name).casefold(), type)))
+
+    def bulkDensity(self, index):
+        """ Density in kg/m^3 of a bulk material, or None for surface and line materials """
+        row = self._byIndex.get(index)
+        if row is None or row["type"] != MATERIAL_TYPE_BULK:
+            return None
+        return row["density_si"]
+
+    def getMaterial(self, manufacturer, name, type):
+        _name = str(name).casefold()
+
+        index = self._first(self._byManufacturer.get((str(manufacturer).casefold(), _name, type)))
+        if index is None:
+            index = self._first(self._byType.get((_name, type)))
+            if index is None:
+                index = self._first(self._byName.get(_name))
+                if index is None:
+                    print("Not found getMaterial('%s', '%s', '%s')" % (manufacturer, name, type))
+                    raise MaterialNotFoundError()
+
+        return index
+
+    def getMaterialAnyType(self, manufacturer, name):
+        indexes = self._visible(self._anyType.get((manufacturer, name)))
+        if len(indexes) < 1:
+            raise MaterialNotFoundError()
+
+        if len(indexes) > 1:
+            print("%d rows found!" % len(indexes))
+
+        return indexes[0]
 
 def getMaterial(connection, manufacturer, name, type):
     cursor = connection.cursor()
@@ -136,8 +227,8 @@ def getMaterialAnyType(connection, manufacturer, name):
 
     if len(rows) > 1:
         print("%d rows found!" % len(rows))        
-        cursor.execute("SELECT * FROM material WHERE material_name=:name",
-                        {"name" : name})
+        cursor.execute("SELECT * FROM material WHERE manufacturer=:manufacturer AND material_name=:name",
+                        {"manufacturer" : manufacturer, "name" : name})
         rows = cursor.fetchall()
         i = 0
         for row in rows:
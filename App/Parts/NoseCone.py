@@ -24,14 +24,17 @@ __title__ = "FreeCAD Open Rocket Part Body Tube"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
-from App.Parts.Component import Component
+from App.Parts.Component import Component, _searchClause, _pageClause
 from App.Constants import TYPE_CONE, TYPE_ELLIPTICAL, TYPE_HAACK, TYPE_OGIVE, TYPE_VON_KARMAN, TYPE_PARABOLA, TYPE_PARABOLIC, TYPE_POWER
-from App.Constants import STYLE_SOLID, STYLE_CAPPED
-from App.Parts.Utilities import _err
+from App.Constants import STYLE_SOLID, STYLE_CAPPED, COMPONENT_TYPE_NOSECONE
+from App.Parts.Utilities import _err, _toMillimeters
+from App.Parts.Volume import noseVolume
 from App.Parts.Exceptions import MultipleEntryError, NotFoundError
 
 class NoseCone(Component):
 
+    _componentType = COMPONENT_TYPE_NOSECONE
+
     def __init__(self):
         super().__init__()
 
@@ -71,32 +74,44 @@ class NoseCone(Component):
             return STYLE_SOLID
         return STYLE_CAPPED
 
-    def persist(self, connection):
-        style = self._noseStyle()
-
-        component_id = super().persist(connection)
-
-        cursor = connection.cursor()
+    def estimatedVolume(self):
+        return noseVolume(self._noseType, self._noseStyle(), _toMillimeters(*self._outsideDiameter), _toMillimeters(*self._length),
+                          _toMillimeters(*self._thickness), _toMillimeters(*self._shoulderDiameter), _toMillimeters(*self._shoulderLength))
 
-        cursor.execute("""INSERT INTO nose (component_index, shape, style, diameter, diameter_units,
-                length, length_units, thickness, thickness_units, shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units)
-            VALUES
-                (?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                            (component_id, self._noseType, style, self._outsideDiameter[0], self._outsideDiameter[1], 
-                            self._length[0], self._length[1], self._thickness[0], self._thickness[1],
-                            self._shoulderDiameter[0], self._shoulderDiameter[1], self._shoulderLength[0], self._shoulderLength[1]))
-        id = cursor.lastrowid
-
-        connection.commit()
-
-        return id
+    def persist(self, loader):
+        style = self._noseStyle()
 
-def listNoseCones(connection):
+        component_id = super().persist(loader)
+        return loader.insert("nose", {"component_index" : component_id,
+                                      "shape" : self._noseType,
+                                      "style" : style,
+                                      "diameter" : self._outsideDiameter[0],
+                                      "diameter_units" : self._outsideDiameter[1],
+                                      "length" : self._length[0],
+                                      "length_units" : self._length[1],
+                                      "thickness" : self._thickness[0],
+                                      "thickness_units" : self._thickness[1],
+                                      "shoulder_diameter" : self._shoulderDiameter[0],
+                                      "shoulder_diameter_units" : self._shoulderDiameter[1],
+                                      "shoulder_length" : self._shoulderLength[0],
+                                      "shoulder_length_units" : self._shoulderLength[1],
+                                      "diameter_mm" : _toMillimeters(*self._outsideDiameter),
+                                      "length_mm" : _toMillimeters(*self._length),
+                                      "thickness_mm" : _toMillimeters(*self._thickness),
+                                      "shoulder_diameter_mm" : _toMillimeters(*self._shoulderDiameter),
+                                      "shoulder_length_mm" : _toMillimeters(*self._shoulderLength)})
+
+def listNoseCones(connection, search=None, order=None, descending=False, limit=-1, offset=0):
     cursor = connection.cursor()
 
-    cursor.execute("""SELECT nose_index, manufacturer, part_number, description, shape, diameter, diameter_units, length, length_units, 
-                        shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units
-                    FROM component c, nose n WHERE n.component_index = c.component_index""")
+    parameters = {}
+    where = _searchClause(connection, search, parameters)
+
+    cursor.execute("""SELECT nose_index, c.component_index, manufacturer, part_number, description, shape, diameter, diameter_units, length, length_units, 
+                        shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units,
+                        diameter_mm, length_mm, shoulder_diameter_mm, shoulder_length_mm, estimated_mass
+                    FROM component c, nose n WHERE n.component_index = c.component_index""" + where +
+                    _pageClause(order, descending, limit, offset, parameters), parameters)
 
     rows = cursor.fetchall()
     return rows
@@ -106,7 +121,8 @@ def getNoseCone(connection, index):
 
     cursor.execute("""SELECT nose_index, c.manufacturer, part_number, description, material_name, mass, mass_units,
                         shape, style, diameter, diameter_units, length, length_units, thickness, thickness_units,
-                        shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units
+                        shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units,
+                        mass_kg, estimated_mass, estimated_volume, diameter_mm, length_mm, thickness_mm, shoulder_diameter_mm, shoulder_length_mm
                     FROM component c, nose n, material m WHERE n.component_index = c.component_index AND c.material_index = m.material_index AND n.nose_index = :index""", {
                         "index" : index
                     })
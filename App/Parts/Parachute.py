@@ -24,14 +24,26 @@ __title__ = "FreeCAD Open Rocket Part Parachute"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
-from App.Parts.Component import Component
-from App.Parts.Material import getMaterial, getMaterialAnyType
-from App.Parts.Exceptions import MaterialNotFoundError
+import math
 
-from App.Constants import MATERIAL_TYPE_LINE
+from App.Parts.Component import Component, _searchClause, _pageClause
+from App.Parts.Exceptions import MaterialNotFoundError, MultipleEntryError, NotFoundError
+from App.Parts.Utilities import _toMillimeters
+
+from App.Constants import MATERIAL_TYPE_LINE, COMPONENT_TYPE_PARACHUTE
+
+def canopyArea(diameter, sides):
+    """ Canopy area in mm^2. Circular canopies have no sides. Polygonal canopies are measured across the corners """
+    if diameter is None:
+        return None
+    if sides is None or sides < 3:
+        return math.pi * diameter * diameter / 4.0
+    return sides * diameter * diameter * math.sin(2.0 * math.pi / sides) / 8.0
 
 class Parachute(Component):
 
+    _componentType = COMPONENT_TYPE_PARACHUTE
+
     def __init__(self):
         super().__init__()
 
@@ -55,29 +67,70 @@ class Parachute(Component):
         if self._lineMaterial[1].lower() != MATERIAL_TYPE_LINE.lower():
             self.raiseInvalid("Line Material Units invalid '%s" % self._lineMaterial[1])
 
-    def _getLineMaterial(self, connection):
+    def _getLineMaterial(self, loader):
+        materials = loader.materials()
         try:
-            material_index = getMaterial(connection, self._manufacturer, self._lineMaterial[0], self._lineMaterial[1])
+            material_index = materials.getMaterial(self._manufacturer, self._lineMaterial[0], self._lineMaterial[1])
         except MaterialNotFoundError:
             try:
                 print("Unable to find material for '%s':'%s' - setting to any type" % (self._manufacturer, self._lineMaterial[0]))
-                material_index = getMaterialAnyType(connection, self._manufacturer, self._lineMaterial[0])
+                material_index = materials.getMaterialAnyType(self._manufacturer, self._lineMaterial[0])
             except MaterialNotFoundError:
                 print("Unable to find material for '%s':'%s' - setting to unspecified" % (self._manufacturer, self._lineMaterial[0]))
-                material_index = getMaterial(connection, 'unspecified', 'unspecified', self._lineMaterial[1])
+                material_index = materials.getMaterial('unspecified', 'unspecified', self._lineMaterial[1])
 
         return material_index
 
-    def persist(self, connection):
-        component_id = super().persist(connection)
-        material_id = self._getLineMaterial(connection)
-
-        cursor = connection.cursor()
-
-        cursor.execute("INSERT INTO parachute (component_index, line_material_index, sides, lines, diameter, diameter_units, line_length, line_length_units) VALUES (?,?,?,?,?,?,?,?)",
-                            (component_id, material_id, self._sides, self._lineCount, self._diameter[0], self._diameter[1], self._lineLength[0], self._lineLength[1]))
-        id = cursor.lastrowid
-
-        connection.commit()
-
-        return id
+    def canopyArea(self):
+        return canopyArea(_toMillimeters(*self._diameter), self._sides)
+
+    def persist(self, loader):
+        component_id = super().persist(loader)
+        material_id = self._getLineMaterial(loader)
+
+        return loader.insert("parachute", {"component_index" : component_id,
+                                           "line_material_index" : material_id,
+                                           "sides" : self._sides,
+                                           "lines" : self._lineCount,
+                                           "diameter" : self._diameter[0],
+                                           "diameter_units" : self._diameter[1],
+                                           "line_length" : self._lineLength[0],
+                                           "line_length_units" : self._lineLength[1],
+                                           "diameter_mm" : _toMillimeters(*self._diameter),
+                                           "line_length_mm" : _toMillimeters(*self._lineLength),
+                                           "area_mm2" : self.canopyArea()})
+
+def listParachutes(connection, search=None, order=None, descending=False, limit=-1, offset=0):
+    cursor = connection.cursor()
+
+    parameters = {}
+    where = _searchClause(connection, search, parameters)
+
+    cursor.execute("""SELECT parachute_index, c.component_index, manufacturer, part_number, description, sides, lines, diameter, diameter_units,
+                        line_length, line_length_units, diameter_mm, line_length_mm, area_mm2
+                    FROM component c, parachute p WHERE p.component_index = c.component_index""" + where +
+                    _pageClause(order, descending, limit, offset, parameters), parameters)
+
+    rows = cursor.fetchall()
+    return rows
+
+def getParachute(connection, index):
+    cursor = connection.cursor()
+
+    cursor.execute("""SELECT parachute_index, c.manufacturer, part_number, description, m.material_name, mass, mass_units,
+                        sides, lines, diameter, diameter_units, line_length, line_length_units, l.material_name AS line_material_name,
+                        mass_kg, diameter_mm, line_length_mm, area_mm2
+                    FROM component c, parachute p, material m, material l
+                    WHERE p.component_index = c.component_index AND c.material_index = m.material_index AND p.line_material_index = l.material_index
+                        AND p.parachute_index = :index""", {
+                        "index" : index
+                    })
+
+    rows = cursor.fetchall()
+    if len(rows) < 1:
+        raise NotFoundError()
+
+    if len(rows) > 1:
+        raise MultipleEntryError()
+
+    return rows[0]
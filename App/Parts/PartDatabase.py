@@ -24,46 +24,79 @@ __title__ = "FreeCAD Open Rocket Part Component Database"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
+import hashlib
+import multiprocessing
 import sqlite3
-from os import walk
+from os import listdir, path
 
-import xml.sax
-
-from App.Parts.PartDatabaseOrcImporter import PartDatabaseOrcImporter
-from App.Parts.Component import Component
-from App.Parts.Exceptions import NotFoundError
+from App.Parts.BulkLoader import BulkLoader, _primaryKeys
+from App.Parts.ConnectionManager import databasePath, getConnectionManager, closeConnections, _workbenchFolder
+from App.Parts.PartDatabaseOrcImporter import parseOrcFile
+from App.Parts.PartDatabaseRktImporter import parseRktFolder
+from App.Parts.PartSchema import buildIndexes, checkDatabase, setSchemaVersion, upgradeDatabase, upgradeSchema
+from App.Parts.Component import Component, getManufacturers
+from App.Parts.Exceptions import MultipleEntryError, NotFoundError
+from App.Parts.Material import Material
 from App.Parts.Utilities import _msg
 
+def _parseSource(filename):
+    # RockSim catalogs are folders of CSV files
+    if path.isdir(filename):
+        return parseRktFolder(filename)
+    return parseOrcFile(filename)
+
 class PartDatabase:
 
-    def __init__(self, rootFolder):
+    def __init__(self, rootFolder=None):
+        if rootFolder is None:
+            rootFolder = _workbenchFolder
         self._rootFolder = rootFolder
 
     def getConnection(self, ro=True):
-        # By default get a read only connection
+        # By default get a read only connection. These must be closed by the caller
         if ro:
-            connection = sqlite3.connect("file:" + self._rootFolder + "/Resources/parts/Parts.db?mode=ro", uri=True)
+            connection = getConnectionManager(self._rootFolder).connect()
         else:
-            connection = sqlite3.connect(self._rootFolder + "/Resources/parts/Parts.db")
+            connection = sqlite3.connect(databasePath(self._rootFolder))
+            connection.row_factory = sqlite3.Row
         return connection
 
     def getManufacturers(self):
-        connection = self.getConnection()
-        
-        try:
-            manufacturers = Component.getManufacturers(connection)
-        except NotFoundError:
-            manufacturers = []
+        with getConnectionManager(self._rootFolder).connection() as connection:
+            try:
+                manufacturers = getManufacturers(connection)
+            except NotFoundError:
+                manufacturers = []
 
-        connection.close()
         return manufacturers
 
-    def updateDatabase(self):
-        connection = sqlite3.connect(self._rootFolder + "/Resources/parts/Parts.db")
-        connection.row_factory = sqlite3.Row
+    def exportSnapshot(self, filename):
+        """ Write a columnar snapshot of the part dimensions, for loading with PartSnapshot.loadSnapshot() """
+        # Imported here so numpy is only needed for snapshots
+        from App.Parts.PartSnapshot import writeSnapshot
 
-        self._createTables(connection)
-        self._importFiles(connection)
+        with getConnectionManager(self._rootFolder).connection() as connection:
+            writeSnapshot(connection, filename)
+
+    def updateDatabase(self, incremental=False, workers=None):
+        # Pooled connections treat the database as immutable, so can't be open during the update
+        closeConnections(self._rootFolder)
+
+        connection = self.getConnection(ro=False)
+
+        # The database can always be rebuilt from source, so durability during the load isn't required
+        connection.execute("PRAGMA synchronous = OFF")
+
+        # Rows are added to the existing tables by an incremental update
+        upgradeSchema(connection)
+
+        if incremental and self._hasManifest(connection):
+            loader = self._update(connection, workers)
+        else:
+            if incremental:
+                _msg("The parts database has no import manifest, so it will be rebuilt")
+            loader = self.rebuild(connection, workers)
+        loader.report()
 
         with open('dump.sql', 'w') as f:
             for line in connection.iterdump():
@@ -71,19 +104,87 @@ class PartDatabase:
 
         connection.close()
 
+    def upgrade(self):
+        """ Upgrade a database written by an earlier version of the workbench, without importing any files """
+        closeConnections(self._rootFolder)
+        return upgradeDatabase(databasePath(self._rootFolder))
+
+    def updateOverlay(self, overlay, files, workers=None):
+        """
+        Rebuild a user overlay database from the given part files. The overlay is shown alongside the
+        catalog by the connection manager. It starts with a copy of the catalog materials, so its
+        parts can use them. The copies its parts use are kept with their catalog keys and listed in
+        catalog_material, so the connection manager shows the catalog rows in their place
+        """
+        closeConnections(self._rootFolder)
+
+        # The catalog is only read, and may be in a read only install folder
+        catalog = databasePath(self._rootFolder)
+        checkDatabase(catalog)
+
+        connection = sqlite3.connect(overlay)
+        connection.row_factory = sqlite3.Row
+        self._createTables(connection)
+
+        connection.execute("ATTACH DATABASE ? AS catalog", (catalog,))
+        connection.execute("""INSERT INTO material (material_index, manufacturer, material_name, type, density, units, density_si)
+                                SELECT material_index, manufacturer, material_name, type, density, units, density_si FROM catalog.material""")
+        copied = connection.execute("SELECT COALESCE(MAX(material_index), 0) FROM material").fetchone()[0]
+        connection.commit()
+        connection.execute("DETACH DATABASE catalog")
+
+        loader = BulkLoader(connection)
+        self._importFiles(loader, files, workers)
+        loader.flush()
+
+        # Materials added by the overlay files come after the copies
+        connection.execute("""DELETE FROM material WHERE material_index <= ? AND material_index NOT IN
+                                (SELECT material_index FROM component WHERE material_index IS NOT NULL
+                                    UNION SELECT line_material_index FROM parachute WHERE line_material_index IS NOT NULL)""", (copied,))
+        connection.execute("DROP TABLE IF EXISTS catalog_material")
+        connection.execute("CREATE TABLE catalog_material (material_index INTEGER PRIMARY KEY ASC)")
+        connection.execute("INSERT INTO catalog_material SELECT material_index FROM material WHERE material_index <= ?", (copied,))
+        self._buildIndexes(connection)
+        loader.commit()
+        loader.report()
+
+        connection.close()
+
+    def rebuild(self, connection, workers=None):
+        """
+        Create the tables and import every source file into the connection. Files are parsed
+        by a pool of worker processes, while this process writes the results in import order.
+        Returns the loader used to write the database
+        """
+        self._createTables(connection)
+
+        loader = BulkLoader(connection)
+        self._importFiles(loader, self._sourceFiles(), workers)
+        loader.flush()
+        self._buildIndexes(connection)
+        loader.commit()
+
+        return loader
+
     def _createTables(self, connection):
+        # Keys are declared INTEGER so their indexes can be used when joining on the integer primary keys
         cursor = connection.cursor()
 
         cursor.execute("DROP TABLE IF EXISTS alias")
         cursor.execute("CREATE TABLE alias (alias_index INTEGER PRIMARY KEY ASC, alias_type, name, alias_name)")
 
         cursor.execute("DROP TABLE IF EXISTS material")
-        cursor.execute("CREATE TABLE material (material_index INTEGER PRIMARY KEY ASC, manufacturer, material_name, type, density, units)")
-        cursor.execute("CREATE INDEX idx_material ON material(manufacturer, material_name, type)")
+        cursor.execute("""CREATE TABLE material (material_index INTEGER PRIMARY KEY ASC, manufacturer, material_name, type, density, units, density_si,
+            UNIQUE (manufacturer, material_name, type))""")
+        cursor.execute("CREATE INDEX idx_material_name ON material(material_name COLLATE NOCASE, type, manufacturer COLLATE NOCASE)")
 
         cursor.execute("DROP TABLE IF EXISTS component")
-        cursor.execute("CREATE TABLE component (component_index INTEGER PRIMARY KEY ASC, manufacturer, part_number, description, material_index, mass, mass_units)")
+        cursor.execute("""CREATE TABLE component (component_index INTEGER PRIMARY KEY ASC, manufacturer, part_number, component_type, description, material_index INTEGER, mass, mass_units, mass_kg,
+            estimated_volume, estimated_mass,
+            UNIQUE (manufacturer, part_number, component_type))""")
         cursor.execute("CREATE INDEX idx_component_manufacturer ON component(manufacturer)")
+        cursor.execute("CREATE INDEX idx_component_mass ON component(mass_kg)")
+        cursor.execute("CREATE INDEX idx_component_estimated_mass ON component(estimated_mass)")
 
         cursor.execute("DROP TABLE IF EXISTS tube_type")
         cursor.execute("CREATE TABLE tube_type (tube_type_index INTEGER PRIMARY KEY ASC, type)")
@@ -91,51 +192,287 @@ class PartDatabase:
         cursor.execute("INSERT INTO tube_type(type) VALUES ('Body Tube'), ('Centering Ring'), ('Tube Coupler'), ('Engine Block'), ('Launch Lug'), ('Bulkhead')")
 
         cursor.execute("DROP TABLE IF EXISTS body_tube")
-        cursor.execute("CREATE TABLE body_tube (body_tube_index INTEGER PRIMARY KEY ASC, component_index, tube_type_index, inner_diameter, inner_diameter_units, outer_diameter, outer_diameter_units, length, length_units)")
+        cursor.execute("""CREATE TABLE body_tube (body_tube_index INTEGER PRIMARY KEY ASC, component_index INTEGER, tube_type_index INTEGER, inner_diameter, inner_diameter_units, outer_diameter, outer_diameter_units, length, length_units,
+            inner_diameter_mm, outer_diameter_mm, length_mm)""")
         cursor.execute("CREATE INDEX idx_body_tube ON body_tube(component_index, tube_type_index)")
+        cursor.execute("CREATE INDEX idx_body_tube_type ON body_tube(tube_type_index, component_index)")
+        cursor.execute("CREATE INDEX idx_body_tube_inner_diameter ON body_tube(inner_diameter_mm)")
+        cursor.execute("CREATE INDEX idx_body_tube_outer_diameter ON body_tube(outer_diameter_mm)")
  
         cursor.execute("DROP TABLE IF EXISTS nose")
-        cursor.execute("""CREATE TABLE nose (nose_index INTEGER PRIMARY KEY ASC, component_index, shape, style, diameter, diameter_units,
-            length, length_units, thickness, thickness_units, shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units)""")
+        cursor.execute("""CREATE TABLE nose (nose_index INTEGER PRIMARY KEY ASC, component_index INTEGER, shape, style, diameter, diameter_units,
+            length, length_units, thickness, thickness_units, shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units,
+            diameter_mm, length_mm, thickness_mm, shoulder_diameter_mm, shoulder_length_mm)""")
+        cursor.execute("CREATE INDEX idx_nose ON nose(component_index)")
+        cursor.execute("CREATE INDEX idx_nose_diameter ON nose(diameter_mm)")
 
         cursor.execute("DROP TABLE IF EXISTS transition")
-        cursor.execute("""CREATE TABLE transition (transition_index INTEGER PRIMARY KEY ASC, component_index, shape, style, 
+        cursor.execute("""CREATE TABLE transition (transition_index INTEGER PRIMARY KEY ASC, component_index INTEGER, shape, style, 
             fore_outside_diameter, fore_outside_diameter_units, fore_shoulder_diameter, fore_shoulder_diameter_units, fore_shoulder_length, fore_shoulder_length_units,
             aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units,
-            length, length_units, thickness, thickness_units)""")
+            length, length_units, thickness, thickness_units,
+            fore_outside_diameter_mm, fore_shoulder_diameter_mm, fore_shoulder_length_mm,
+            aft_outside_diameter_mm, aft_shoulder_diameter_mm, aft_shoulder_length_mm, length_mm, thickness_mm)""")
+        cursor.execute("CREATE INDEX idx_transition ON transition(component_index)")
+        cursor.execute("CREATE INDEX idx_transition_fore_diameter ON transition(fore_outside_diameter_mm)")
+        cursor.execute("CREATE INDEX idx_transition_aft_diameter ON transition(aft_outside_diameter_mm)")
 
         cursor.execute("DROP TABLE IF EXISTS parachute")
-        cursor.execute("CREATE TABLE parachute (parachute_index INTEGER PRIMARY KEY ASC, component_index, line_material_index, sides, lines, diameter, diameter_units, line_length, line_length_units)")
+        cursor.execute("""CREATE TABLE parachute (parachute_index INTEGER PRIMARY KEY ASC, component_index INTEGER, line_material_index INTEGER, sides, lines, diameter, diameter_units, line_length, line_length_units,
+            diameter_mm, line_length_mm, area_mm2)""")
+        cursor.execute("CREATE INDEX idx_parachute ON parachute(component_index)")
+        cursor.execute("CREATE INDEX idx_parachute_diameter ON parachute(diameter_mm)")
+        cursor.execute("CREATE INDEX idx_parachute_area ON parachute(area_mm2)")
             
         cursor.execute("DROP TABLE IF EXISTS streamer")
-        cursor.execute("CREATE TABLE streamer (streamer_index INTEGER PRIMARY KEY ASC, component_index, length, length_units, width, width_units, thickness, thickness_units)")
+        cursor.execute("""CREATE TABLE streamer (streamer_index INTEGER PRIMARY KEY ASC, component_index INTEGER, length, length_units, width, width_units, thickness, thickness_units,
+            length_mm, width_mm, thickness_mm, area_mm2)""")
+        cursor.execute("CREATE INDEX idx_streamer ON streamer(component_index)")
+        cursor.execute("CREATE INDEX idx_streamer_width ON streamer(width_mm)")
+        cursor.execute("CREATE INDEX idx_streamer_area ON streamer(area_mm2)")
+
+        # Manifest of the source files and the rows each one produced, used for incremental updates
+        cursor.execute("DROP TABLE IF EXISTS source_file")
+        cursor.execute("CREATE TABLE source_file (source_file_index INTEGER PRIMARY KEY ASC, filename, hash, position, material_hash)")
+        cursor.execute("CREATE INDEX idx_source_file ON source_file(filename)")
 
+        cursor.execute("DROP TABLE IF EXISTS source_range")
+        cursor.execute("CREATE TABLE source_range (source_file_index, table_name, first_index, last_index)")
+        cursor.execute("CREATE INDEX idx_source_range ON source_range(source_file_index)")
+
+        # Every part key a file tried to insert, including the duplicates that were skipped
+        cursor.execute("DROP TABLE IF EXISTS source_part")
+        cursor.execute("CREATE TABLE source_part (source_file_index, manufacturer, part_number, component_type)")
+        cursor.execute("CREATE INDEX idx_source_part ON source_part(source_file_index)")
+        cursor.execute("CREATE INDEX idx_source_part_key ON source_part(manufacturer, part_number, component_type)")
+
+        setSchemaVersion(connection)
         connection.commit()
 
-    def _importFiles(self, connection):
+    def _buildIndexes(self, connection):
+        """ Indexes derived from the imported rows, rebuilt after every import """
+        buildIndexes(connection)
+
+    def _sourceFiles(self):
+        """ Part files in import order """
+        files = []
+
         # Import files with initial definitions, or corrections to incomplete definitions
-        for (dirpath, dirnames, filenames) in walk(self._rootFolder + "/Resources/parts/workbench/"):
-            for file in filenames:
-                self._importOrcPartFile(connection, dirpath + file)
+        workbench = self._rootFolder + "/Resources/parts/workbench/"
+        if path.isdir(workbench):
+            files += [workbench + file for file in sorted(listdir(workbench)) if file.endswith(".orc")]
 
-        for (dirpath, dirnames, filenames) in walk(self._rootFolder + "/Resources/parts/openrocket-database/orc/"):
-            self._importOrcPartFile(connection, dirpath + 'generic_materials.orc')
-            for file in filenames:
-                self._importOrcPartFile(connection, dirpath + file)
+        # Generic materials are referenced by the other files, so must be imported first
+        orc = self._rootFolder + "/Resources/parts/openrocket-database/orc/"
+        if path.isdir(orc):
+            if path.isfile(orc + 'generic_materials.orc'):
+                files.append(orc + 'generic_materials.orc')
+            files += [orc + file for file in sorted(listdir(orc)) if file.endswith(".orc") and file != 'generic_materials.orc']
+        else:
+            # A rebuild without the submodule would leave out most of the catalog
+            _msg("The openrocket-database submodule isn't checked out, so its parts won't be imported")
+
+        # RockSim catalogs come last so their materials can be matched to those already imported
+        rocksim = self._rootFolder + "/Resources/parts/rocksim_components/"
+        if path.isdir(rocksim):
+            files += [rocksim + folder for folder in sorted(listdir(rocksim)) if path.isdir(rocksim + folder)]
+
+        return files
+
+    def _sourceName(self, filename):
+        return path.relpath(filename, self._rootFolder).replace("\\", "/")
+
+    def _hash(self, filename):
+        sha = hashlib.sha256()
+        if path.isdir(filename):
+            for file in sorted(listdir(filename)):
+                # Only the files are read, so subdirectories and the like don't change the hash
+                if not path.isfile(path.join(filename, file)):
+                    continue
+                sha.update(file.encode())
+                with open(path.join(filename, file), "rb") as f:
+                    sha.update(f.read())
+        else:
+            with open(filename, "rb") as f:
+                sha.update(f.read())
+        return sha.hexdigest()
+
+    def _hasManifest(self, connection):
+        cursor = connection.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='source_part'")
+        return cursor.fetchone() is not None
+
+    def _materialHash(self, records):
+        """ Digest of the material definitions in a file, in the order they're defined """
+        sha = hashlib.sha256()
+        for obj, line in records:
+            if isinstance(obj, Material):
+                sha.update(repr((obj._manufacturer, obj._name, obj._type, obj._density, obj._units)).encode())
+        return sha.hexdigest()
+
+    def _partKeys(self, records):
+        """ The unique keys of the parts in a file """
+        return {(obj._manufacturer, obj._partNumber, obj.componentType()) for obj, line in records if isinstance(obj, Component)}
+
+    def _update(self, connection, workers=None):
+        """
+        Import the source files that have changed since the last update, along with the files
+        their changes affect, so the result matches a complete rebuild. Returns the loader used
+        to write the database.
+
+        The first file to define a material or part number wins, and materials are resolved
+        by name across vendors. So when the material definitions of a file change, every later
+        file is imported again. When its part numbers change, only the later files with the
+        same part numbers are. Otherwise only the changed file is imported again, keeping its
+        materials so the rows of other files still refer to them
+        """
+        files = self._sourceFiles()
+        positions = {filename : position for position, filename in enumerate(files)}
+        names = {self._sourceName(filename) : filename for filename in files}
+
+        cursor = connection.cursor()
+        cursor.execute("SELECT source_file_index, filename, hash, position, material_hash FROM source_file")
+        manifest = {row['filename'] : row for row in cursor.fetchall()}
+
+        changed = [filename for name, filename in names.items() if name not in manifest or manifest[name]['hash'] != self._hash(filename)]
+        removed = [row for name, row in manifest.items() if name not in names]
+        parsed = dict(self._parseFiles(changed, workers))
+
+        def later(row):
+            """ Files imported after a file in the manifest """
+            return [names[name] for name, other in manifest.items() if name in names and other['position'] > row['position']]
 
-    def _importOrcPartFile(self, connection, filename):
-        _msg("Importing %s..." % filename)
+        # Files to import along with their materials, and those whose materials are kept
+        complete = set()
+        partial = set()
+        noMaterials = self._materialHash([])
+        for filename in changed:
+            row = manifest.get(self._sourceName(filename))
+            following = [other for other in files if positions[other] > positions[filename]]
+            if self._materialHash(parsed[filename]) != (noMaterials if row is None else row['material_hash']):
+                complete.update([filename] + following)
+            else:
+                partial.add(filename)
+                previous = set() if row is None else self._sourceKeys(cursor, row['source_file_index'])
+                partial.update(self._attempted(cursor, previous ^ self._partKeys(parsed[filename]), following))
+        for row in removed:
+            if row['material_hash'] != noMaterials:
+                complete.update(later(row))
+            else:
+                partial.update(self._attempted(cursor, self._sourceKeys(cursor, row['source_file_index']), later(row)))
+        partial -= complete
 
-        # create an XMLReader
-        parser = xml.sax.make_parser()
+        for row in removed:
+            self._removeSource(cursor, row['source_file_index'])
+        for filename in complete:
+            row = manifest.get(self._sourceName(filename))
+            if row is not None:
+                self._removeSource(cursor, row['source_file_index'])
+        sources = {}
+        for filename in partial:
+            row = manifest.get(self._sourceName(filename))
+            if row is not None:
+                self._removeSource(cursor, row['source_file_index'], keepMaterials=True)
+                sources[filename] = row['source_file_index']
 
-        # turn off namespaces
-        parser.setFeature(xml.sax.handler.feature_namespaces, 0)
+        # Materials are ordered by the position of the file that defined them
+        cursor.executemany("UPDATE source_file SET position=? WHERE filename=?",
+                            [(positions[filename], name) for name, filename in names.items()])
+
+        imports = sorted(complete | partial, key=lambda filename: positions[filename])
+        _msg("%d of %d source files changed, importing %d" % (len(changed), len(files), len(imports)))
+
+        def results():
+            unparsed = iter(self._parseFiles([filename for filename in imports if filename not in parsed], workers))
+            for filename in imports:
+                if filename in parsed:
+                    yield filename, parsed.pop(filename)
+                else:
+                    yield next(unparsed)
+
+        loader = BulkLoader(connection)
+        self._writeFiles(loader, results(), positions, sources)
+        loader.flush()
+        self._buildIndexes(connection)
+        loader.commit()
+
+        return loader
+
+    def _sourceKeys(self, cursor, source):
+        cursor.execute("SELECT manufacturer, part_number, component_type FROM source_part WHERE source_file_index=:source", {"source" : source})
+        return {tuple(row) for row in cursor.fetchall()}
+
+    def _attempted(self, cursor, keys, files):
+        """ The files that tried to insert any of the part keys """
+        names = {self._sourceName(filename) : filename for filename in files}
+        found = set()
+        for key in keys:
+            cursor.execute("""SELECT DISTINCT filename FROM source_part p, source_file f WHERE p.source_file_index = f.source_file_index
+                                AND p.manufacturer = ? AND p.part_number = ? AND p.component_type = ?""", key)
+            found.update([names[row[0]] for row in cursor.fetchall() if row[0] in names])
+        return found
+
+    def _removeSource(self, cursor, source, keepMaterials=False):
+        """ Delete the rows imported from a source file, and its manifest entry unless its materials are kept """
+        cursor.execute("SELECT table_name, first_index, last_index FROM source_range WHERE source_file_index=:source", {
+                            "source" : source
+                        })
+        for row in cursor.fetchall():
+            if keepMaterials and row['table_name'] == "material":
+                continue
+            cursor.execute("DELETE FROM %s WHERE %s BETWEEN ? AND ?" % (row['table_name'], _primaryKeys[row['table_name']]),
+                                (row['first_index'], row['last_index']))
+            cursor.execute("DELETE FROM source_range WHERE source_file_index=? AND table_name=? AND first_index=?",
+                                (source, row['table_name'], row['first_index']))
+
+        cursor.execute("DELETE FROM source_part WHERE source_file_index=:source", {"source" : source})
+        if not keepMaterials:
+            cursor.execute("DELETE FROM source_file WHERE source_file_index=:source", {"source" : source})
+
+    def _parseFiles(self, files, workers=None):
+        """ (filename, records) for each file in order, parsed by a pool of worker processes """
+        if workers is None:
+            workers = multiprocessing.cpu_count()
+
+        if workers <= 1 or len(files) <= 1:
+            yield from map(_parseSource, files)
+        else:
+            with multiprocessing.Pool(min(workers, len(files))) as pool:
+                # imap returns the results in file order, regardless of which parse completes first
+                yield from pool.imap(_parseSource, files)
+
+    def _importFiles(self, loader, files, workers=None):
+        positions = {filename : position for position, filename in enumerate(files)}
+        self._writeFiles(loader, self._parseFiles(files, workers), positions)
+
+    def _writeFiles(self, loader, results, positions, sources={}):
+        for filename, records in results:
+            _msg("Importing %s..." % filename)
+
+            # Materials from later files can't be seen, as in a complete rebuild
+            loader.materials().setPosition(positions[filename])
+            start = loader.nextIndexes()
+            for obj, line in records:
+                try:
+                    obj.persist(loader)
+                except MultipleEntryError:
+                    print("Error in %s at line %s" % (filename, str(line)))
+            self._recordSource(loader, filename, records, positions[filename], start, sources.get(filename))
+
+    def _recordSource(self, loader, filename, records, position, start, source=None):
+        cursor = loader.connection().cursor()
+        if source is None:
+            cursor.execute("INSERT INTO source_file (filename, hash, position, material_hash) VALUES (?,?,?,?)",
+                                (self._sourceName(filename), self._hash(filename), position, self._materialHash(records)))
+            source = cursor.lastrowid
+        else:
+            cursor.execute("UPDATE source_file SET hash=?, position=? WHERE source_file_index=?", (self._hash(filename), position, source))
 
-        # override the default ContextHandler
-        handler = PartDatabaseOrcImporter(connection, filename)
-        parser.setContentHandler(handler)
-        parser.parse(filename)
+        end = loader.nextIndexes()
+        for table in start:
+            if end[table] > start[table]:
+                cursor.execute("INSERT INTO source_range (source_file_index, table_name, first_index, last_index) VALUES (?,?,?,?)",
+                                    (source, table, start[table], end[table] - 1))
 
-    def _importRktPartFile(self, connection, filename):
-        pass
+        cursor.executemany("INSERT INTO source_part (source_file_index, manufacturer, part_number, component_type) VALUES (?,?,?,?)",
+                                [(source,) + key for key in self._partKeys(records)])
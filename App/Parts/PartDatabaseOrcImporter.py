@@ -24,6 +24,7 @@ __title__ = "FreeCAD Open Rocket Importer"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
+from functools import lru_cache
 from pathlib import PurePath
 
 import xml.sax
@@ -41,45 +42,129 @@ from App.Parts.Parachute import Parachute
 from App.Parts.Streamer import Streamer
 from App.Parts.Transition import Transition
 
-from App.Parts.Exceptions import InvalidError, MultipleEntryError, UnknownManufacturerError
+from App.Parts.Exceptions import InvalidError, UnknownManufacturerError
 
 from App.Constants import TYPE_CONE, TYPE_ELLIPTICAL, TYPE_HAACK, TYPE_OGIVE, TYPE_PARABOLA, TYPE_POWER
 from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_LINE
 
+# The default manufacturer is based on the filename
+_manufacturers = {
+    "preseed.orc" : "unspecified",
+    "apogee.orc" : "Apogee",
+    "competition_chutes.orc" : "Generic competition",
+    "bluetube.orc" : "Always Ready Rocketry",
+    "bms.orc" : "BalsaMachining.com",
+    "estes_classic.orc" : "Estes",
+    "estes_ps2.orc" : "Estes",
+    "generic_materials.orc" : "unspecified",
+    "giantleaprocketry.orc" : "Giant Leap",
+    "loc_precision.orc" : "LOC Precision",
+    "madcow.orc" : "Madcow",
+    "mpc.orc" : "MPC",
+    "publicmissiles.orc" : "Public Missiles",
+    "quest.orc" : "Quest",
+    "semroc.orc" : "SEMROC",
+    "top_flight.orc" : "Top Flight Recovery"
+}
+
+# Ensure manufacturer names are consistent
+_manufacturerAliases = {
+    "loc" : "LOC/Precision"
+}
+
+@lru_cache(maxsize=None)
+def _defaultManufacturer(filename):
+    name = PurePath(filename).name.lower()
+    if name not in _manufacturers:
+        print("Unknown manufacturer for '%s'" % name)
+        raise UnknownManufacturerError("Unknown manufacturer for '%s'" % name)
+    return _manufacturers[name]
+
+def _unaliasManufacturer(content):
+    name = content.strip().lower()
+    if name in _manufacturerAliases:
+        return _manufacturerAliases[name]
+
+    return content
+
+def _sanitizeMaterialName(content):
+    # LOCPrecision data has [material:name...] format
+    content = content.strip()
+    while str(content).startswith('[material:'):
+        content = content[10:].rstrip(']').strip()
+    return content
+
+def _sanitizeName(content):
+    # LOCPrecision data has [material:name...] format
+    while str(content).startswith('[material:'):
+        content = content[10:len(content) - 1]
+    return content
+
+# Dispatch table entries. Start tag handlers are called as handler(element, attributes) and
+# end tag handlers as handler(element, content), where content has been stripped
+
+def _units(name, attribute='Unit'):
+    """ Start tag handler setting the units of a (value, units) tuple """
+    def handler(element, attributes):
+        setattr(element, name, (getattr(element, name)[0], attributes[attribute]))
+    return handler
+
+def _value(name, convert=_toFloat):
+    """ End tag handler setting the value of a (value, units) tuple """
+    def handler(element, content):
+        setattr(element, name, (convert(content), getattr(element, name)[1]))
+    return handler
+
+def _setter(name, convert=None):
+    """ End tag handler setting an attribute """
+    if convert is None:
+        def handler(element, content):
+            setattr(element, name, content)
+    else:
+        def handler(element, content):
+            setattr(element, name, convert(content))
+    return handler
+
 class Element:
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
+    # Tables mapping normalized tags to handlers, shared by all instances of a class
+    _validChildren = {}
+    _startTags = {}
+    _endTags = {}
+    _knownTags = frozenset()
+
+    def __init__(self, parent, tag, attributes, records, filename, line):
         self._tag = tag
+        self._normalizedTag = tag.lower().strip()
         self._parent = parent
-        self._connection = connection
+        self._records = records
         self._filename = filename
         self._line = line
-        
-        self._validChildren = {}
-        self._knownTags = []
         # print("Start %s" % tag)
 
     def end(self):
         return self._parent
 
+    # Tags passed to the following methods have been normalized with lower().strip()
+
     def isChildElement(self, tag):
-        return str(tag).lower().strip() in self._validChildren
+        return tag in self._validChildren
 
     def isTag(self, tag):
-        return str(tag).lower() == self._tag.lower()
+        return tag == self._normalizedTag
 
     def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag in self._knownTags:
-            return
-        else:
+        handler = self._startTags.get(tag)
+        if handler is not None:
+            handler(self, attributes)
+        elif tag not in self._knownTags:
             _msg('\tUnknown tag %s' % tag)
 
     def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag in self._knownTags:
-            return
-        else:
+        handler = self._endTags.get(tag)
+        if handler is not None:
+            handler(self, content)
+        elif tag not in self._knownTags:
             _msg('\tUnknown tag /%s' % tag)
 
     def createChild(self, tag, attributes, filename, line):
@@ -87,40 +172,38 @@ class Element:
         if not _tag in self._validChildren:
             print("Invalid element %s" % tag)
             return None
-        return self._validChildren[_tag](self, tag, attributes, self._connection, filename, line)
+        return self._validChildren[_tag](self, tag, attributes, self._records, filename, line)
 
 class RootElement(Element):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._validChildren = {'openrocketcomponent' : OpenRocketComponentElement}
 
 class OpenRocketComponentElement(Element):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    _supportedVersions = ["0.1"]
+
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._validChildren = { 'materials' : MaterialsElement,
                                 'components' : ComponentsElement
                               }
-        self._knownTags = ["version", "creator"]
-        self._supportedVersions = ["0.1"]
 
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "version":
-            if content.strip() not in self._supportedVersions:
-                _err("unsupported version '%s'" % content)
-                # throw exception
-            return
-        else:
-            super().handleEndTag(tag, content)
+    def _checkVersion(self, content):
+        if content not in self._supportedVersions:
+            _err("unsupported version '%s'" % content)
+            # throw exception
+
+    _endTags = { "version" : _checkVersion }
+    _knownTags = frozenset(["version", "creator"])
 
 class MaterialsElement(Element):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._validChildren = { 'material' : MaterialElement,
                                 'components' : ComponentsElement
@@ -131,64 +214,21 @@ class MaterialsElement(Element):
 
 class MaterialElement(Element):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    _endTags = { "name" : _setter("_name", _sanitizeMaterialName),
+                 "type" : _setter("_type"),
+                 "density" : _setter("_density", _toFloat)
+               }
+    _knownTags = frozenset(_endTags)
 
-        self._validChildren = {}
-        self._knownTags = ["name", "type", "density"]
-        self._supportedVersions = ["0.1"]
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
-        self._manufacturer = self._defaultManufacturer()
+        self._manufacturer = _defaultManufacturer(filename)
         self._name = ""
         self._type = None
         self._density = 0.0
         self._units = attributes["UnitsOfMeasure"]
 
-    def _defaultManufacturer(self):
-        # The default manufacturer is based on the filename
-        manufacturers = {
-            "preseed.orc" : "unspecified",
-            "apogee.orc" : "Apogee",
-            "competition_chutes.orc" : "Generic competition",
-            "bluetube.orc" : "Always Ready Rocketry",
-            "bms.orc" : "BalsaMachining.com",
-            "estes_classic.orc" : "Estes",
-            "estes_ps2.orc" : "Estes",
-            "generic_materials.orc" : "unspecified",
-            "giantleaprocketry.orc" : "Giant Leap",
-            "loc_precision.orc" : "LOC Precision",
-            "madcow.orc" : "Madcow",
-            "mpc.orc" : "MPC",
-            "publicmissiles.orc" : "Public Missiles",
-            "quest.orc" : "Quest",
-            "semroc.orc" : "SEMROC",
-            "top_flight.orc" : "Top Flight Recovery"
-        }
-
-        name = PurePath(self._filename).name.lower()
-        if name not in manufacturers:
-            print("Unknown manufacturer for '%s'" % name)
-            raise UnknownManufacturerError("Unknown manufacturer for '%s'" % name)
-        return manufacturers[name]
-
-    def _sanitizeName(self, content):
-        # LOCPrecision data has [material:name...] format
-        content = content.strip()
-        while str(content).startswith('[material:'):
-            content = content[10:].rstrip(']').strip()
-        return content
-
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "name":
-            self._name = self._sanitizeName(content)
-        elif _tag == "type":
-            self._type = content
-        elif _tag == "density":
-            self._density = _toFloat(content.strip())
-        else:
-            super().handleEndTag(tag, content)
-
     def setValues(self, obj):
         # super().setValues(obj)
 
@@ -198,11 +238,11 @@ class MaterialElement(Element):
         obj._density = self._density
         obj._units = self._units
 
-    def persist(self, obj):
+    def addRecord(self, obj):
         try:
             obj.validate()
-            obj.persist(self._connection)
-        except (InvalidError, MultipleEntryError) as e:
+            self._records.append((obj, self._line))
+        except InvalidError as e:
             print("Error in %s at line %s" % (self._filename, str(self._line)))
             #print ("Invalid %s: name %s %s" % (self.__class__.__name__, e._name, e._message))
 
@@ -210,110 +250,36 @@ class MaterialElement(Element):
         obj = Material()
 
         self.setValues(obj)
-        self.persist(obj)
+        self.addRecord(obj)
 
         return super().end()
 
 class ComponentsElement(Element):
-
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
-
-        self._validChildren = { 'bodytube' : BodyTubeElement,
-                                'tubecoupler' : BodyTubeElement,
-                                'transition' : TransitionElement,
-                                'engineblock' : BodyTubeElement,
-                                'parachute' : ParachuteElement,
-                                'streamer' : StreamerElement,
-                                'nosecone' : NoseConeElement,
-                                'centeringring' : BodyTubeElement,
-                                'bulkhead' : BulkheadElement,
-                                'launchlug' : BodyTubeElement
-                              }
+    # _validChildren is set once the component element classes have been defined
+    pass
 
 class ComponentElement(Element):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
-
-        self._validChildren = {}
-        self._knownTags = ["manufacturer", "partnumber", "description", "material", "mass"]
-
-        self._manufacturer = self._defaultManufacturer()
+    _startTags = { "material" : _units("_material", "Type"),
+                   "mass" : _units("_mass")
+                 }
+    _endTags = { "manufacturer" : _setter("_manufacturer", _unaliasManufacturer),
+                 "partnumber" : _setter("_partNumber"),
+                 "description" : _setter("_description"),
+                 "material" : _value("_material", _sanitizeName),
+                 "mass" : _value("_mass")
+               }
+    _knownTags = frozenset(["manufacturer", "partnumber", "description", "material", "mass"])
+
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
+
+        self._manufacturer = _defaultManufacturer(filename)
         self._partNumber = ""
         self._description = ""
         self._material = ("", MATERIAL_TYPE_BULK)
         self._mass = (0.0, "")
 
-    def _defaultManufacturer(self):
-        # The default manufacturer is based on the filename
-        manufacturers = {
-            "preseed.orc" : "unspecified",
-            "apogee.orc" : "Apogee",
-            "competition_chutes.orc" : "Generic competition",
-            "bluetube.orc" : "Always Ready Rocketry",
-            "bms.orc" : "BalsaMachining.com",
-            "estes_classic.orc" : "Estes",
-            "estes_ps2.orc" : "Estes",
-            "generic_materials.orc" : "unspecified",
-            "giantleaprocketry.orc" : "Giant Leap",
-            "loc_precision.orc" : "LOC Precision",
-            "madcow.orc" : "Madcow",
-            "mpc.orc" : "MPC",
-            "publicmissiles.orc" : "Public Missiles",
-            "quest.orc" : "Quest",
-            "semroc.orc" : "SEMROC",
-            "top_flight.orc" : "Top Flight Recovery"
-        }
-
-        name = PurePath(self._filename).name.lower()
-        if name not in manufacturers:
-            print("Unknown manufacturer for '%s'" % name)
-            raise UnknownManufacturerError("Unknown manufacturer for '%s'" % name)
-        return manufacturers[name]
-
-    def _unaliasManufacturer(self, content):
-        # Ensure manufacturer names are consistent
-        manufacturers = {
-            "loc" : "LOC/Precision"
-        }
-
-        name = content.strip().lower()
-        if name in manufacturers:
-            return manufacturers[name]
-
-        return content
-
-    def _sanitizeName(self, content):
-        # LOCPrecision data has [material:name...] format
-        while str(content).startswith('[material:'):
-            content = content[10:len(content) - 1]
-        return content
-
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "material":
-            self._material = (self._material[0], attributes['Type'])
-        elif _tag == "mass":
-            self._mass = (self._mass[0], attributes['Unit'])
-        else:
-            super().handleTag(tag, attributes)
-
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "manufacturer":
-            self._manufacturer = self._unaliasManufacturer(content)
-        elif _tag == "partnumber":
-            self._partNumber = content
-        elif _tag == "description":
-            self._description = content
-        elif _tag == "material":
-            self._material = (self._sanitizeName(content), self._material[1])
-        elif _tag == "mass":
-            self._mass = (_toFloat(content.strip()), self._mass[1])
-        else:
-            super().handleEndTag(tag, content)
-
     def setValues(self, obj):
         obj._manufacturer = self._manufacturer
         obj._partNumber = self._partNumber
@@ -330,42 +296,29 @@ class ComponentElement(Element):
     def end(self):
         return super().end()
 
-    def persist(self, obj, connection):
-        obj.persist(connection)
+    def addRecord(self, obj):
+        self._records.append((obj, self._line))
 
 class BodyTubeElement(ComponentElement):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    _startTags = dict(ComponentElement._startTags, insidediameter=_units("_ID"), outsidediameter=_units("_OD"), length=_units("_length"))
+    _endTags = dict(ComponentElement._endTags, insidediameter=_value("_ID"), outsidediameter=_value("_OD"), length=_value("_length"))
+    _knownTags = ComponentElement._knownTags | frozenset(["insidediameter", "outsidediameter", "length"])
 
-        self._knownTags = self._knownTags + ["insidediameter", "outsidediameter", "length"]
+    _classes = { "bodytube" : BodyTube,
+                 "tubecoupler" : Coupler,
+                 "engineblock" : EngineBlock,
+                 "launchlug" : LaunchLug,
+                 "centeringring" : CenteringRing
+               }
+
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._ID = (0.0, "")
         self._OD = (0.0, "")
         self._length = (0.0, "")
 
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "insidediameter":
-            self._ID = (self._ID[0], attributes['Unit'])
-        elif _tag == "outsidediameter":
-            self._OD = (self._OD[0], attributes['Unit'])
-        elif _tag == "length":
-            self._length = (self._length[0], attributes['Unit'])
-        else:
-            super().handleTag(tag, attributes)
-
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "insidediameter":
-            self._ID = (_toFloat(content), self._ID[1])
-        elif _tag == "outsidediameter":
-            self._OD = (_toFloat(content), self._OD[1])
-        elif _tag == "length":
-            self._length = (_toFloat(content), self._length[1])
-        else:
-            super().handleEndTag(tag, content)
-
     def setValues(self, obj):
         super().setValues(obj)
 
@@ -374,55 +327,31 @@ class BodyTubeElement(ComponentElement):
         obj._length = self._length
 
     def end(self):
-        if self._tag.lower() == "bodytube":
-            obj = BodyTube()
-        elif self._tag.lower() == "tubecoupler":
-            obj = Coupler()
-        elif self._tag.lower() == "engineblock":
-            obj = EngineBlock()
-        elif self._tag.lower() == "launchlug":
-            obj = LaunchLug()
-        elif self._tag.lower() == "centeringring":
-            obj = CenteringRing()
-        else:
+        if self._normalizedTag not in self._classes:
             _err("Unable to close body tube object for %s" % self._tag)
             return super().end()
 
+        obj = self._classes[self._normalizedTag]()
+
         self.setValues(obj)
         self.validate(obj)
-        self.persist(obj, self._connection)
+        self.addRecord(obj)
 
         return super().end()
 
 class BulkheadElement(ComponentElement):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    _startTags = dict(ComponentElement._startTags, outsidediameter=_units("_OD"), length=_units("_length"))
+    _endTags = dict(ComponentElement._endTags, outsidediameter=_value("_OD"), length=_value("_length"))
+    # The 'filled' tag is recognized but not used
+    _knownTags = ComponentElement._knownTags | frozenset(["filled", "outsidediameter", "length"])
 
-        # The 'filled' tag is recognized but not used
-        self._knownTags = self._knownTags + ["filled", "outsidediameter", "length"]
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._OD = (0.0, "")
         self._length = (0.0, "")
 
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "outsidediameter":
-            self._OD = (self._OD[0], attributes['Unit'])
-        elif _tag == "length":
-            self._length = (self._length[0], attributes['Unit'])
-        else:
-            super().handleTag(tag, attributes)
-
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "outsidediameter":
-            self._OD = (_toFloat(content), self._OD[1])
-        elif _tag == "length":
-            self._length = (_toFloat(content), self._length[1])
-        else:
-            super().handleEndTag(tag, content)
-
     def setValues(self, obj):
         super().setValues(obj)
 
@@ -434,24 +363,21 @@ class BulkheadElement(ComponentElement):
 
         self.setValues(obj)
         self.validate(obj)
-        self.persist(obj, self._connection)
+        self.addRecord(obj)
 
         return super().end()
 
 class TransitionElement(ComponentElement):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    # Map import shape names to internal names. There may be multiple entries for the same type
+    _shapeMap = { "conical" : TYPE_CONE.lower(),
+                  "ellipsoid" : TYPE_ELLIPTICAL.lower(),
+                  "ogive" : TYPE_OGIVE.lower()
+                }
 
-        self._knownTags = self._knownTags + ["filled", "shape", "foreoutsidediameter", "foreshoulderdiameter", "foreshoulderlength", 
-            "aftoutsidediameter", "aftshoulderdiameter", "aftshoulderlength", "length", "thickness"]
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
-        # Map import shape names to internal names. There may be multiple entries for the same type
-        self._shapeMap = { "conical" : TYPE_CONE.lower(),
-                           "ellipsoid" : TYPE_ELLIPTICAL.lower(),
-                           "ogive" : TYPE_OGIVE.lower()
-                         }
-        
         self._noseType = "" # Shape
         self._filled = False
 
@@ -464,53 +390,35 @@ class TransitionElement(ComponentElement):
         self._length = (0.0, "")
         self._thickness = (0.0, "")
 
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "foreoutsidediameter":
-            self._foreOutsideDiameter = (self._foreOutsideDiameter[0], attributes['Unit'])
-        elif _tag == "foreshoulderdiameter":
-            self._foreShoulderDiameter = (self._foreShoulderDiameter[0], attributes['Unit'])
-        elif _tag == "foreshoulderlength":
-            self._foreShoulderLength = (self._foreShoulderLength[0], attributes['Unit'])
-        elif _tag == "aftoutsidediameter":
-            self._aftOutsideDiameter = (self._aftOutsideDiameter[0], attributes['Unit'])
-        elif _tag == "aftshoulderdiameter":
-            self._aftShoulderDiameter = (self._aftShoulderDiameter[0], attributes['Unit'])
-        elif _tag == "aftshoulderlength":
-            self._aftShoulderLength = (self._aftShoulderLength[0], attributes['Unit'])
-        elif _tag == "length":
-            self._length = (self._length[0], attributes['Unit'])
-        else:
-            super().handleTag(tag, attributes)
-
     def _mapShape(self, shape):
         _shape = shape.lower()
         if _shape in self._shapeMap:
             return self._shapeMap[_shape]
         return shape
 
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "filled":
-            self._filled = _toBoolean(content)
-        elif _tag == "shape":
-            self._noseType = self._mapShape(content)
-        elif _tag == "foreoutsidediameter":
-            self._foreOutsideDiameter = (_toFloat(content), self._foreOutsideDiameter[1])
-        elif _tag == "foreshoulderdiameter":
-            self._foreShoulderDiameter = (_toFloat(content), self._foreShoulderDiameter[1])
-        elif _tag == "foreshoulderlength":
-            self._foreShoulderLength = (_toFloat(content), self._foreShoulderLength[1])
-        elif _tag == "aftoutsidediameter":
-            self._aftOutsideDiameter = (_toFloat(content), self._aftOutsideDiameter[1])
-        elif _tag == "aftshoulderdiameter":
-            self._aftShoulderDiameter = (_toFloat(content), self._aftShoulderDiameter[1])
-        elif _tag == "aftshoulderlength":
-            self._aftShoulderLength = (_toFloat(content), self._aftShoulderLength[1])
-        elif _tag == "length":
-            self._length = (_toFloat(content), self._length[1])
-        else:
-            super().handleEndTag(tag, content)
+    def _setShape(self, content):
+        self._noseType = self._mapShape(content)
+
+    _startTags = dict(ComponentElement._startTags,
+                      foreoutsidediameter=_units("_foreOutsideDiameter"),
+                      foreshoulderdiameter=_units("_foreShoulderDiameter"),
+                      foreshoulderlength=_units("_foreShoulderLength"),
+                      aftoutsidediameter=_units("_aftOutsideDiameter"),
+                      aftshoulderdiameter=_units("_aftShoulderDiameter"),
+                      aftshoulderlength=_units("_aftShoulderLength"),
+                      length=_units("_length"))
+    _endTags = dict(ComponentElement._endTags,
+                    filled=_setter("_filled", _toBoolean),
+                    shape=_setShape,
+                    foreoutsidediameter=_value("_foreOutsideDiameter"),
+                    foreshoulderdiameter=_value("_foreShoulderDiameter"),
+                    foreshoulderlength=_value("_foreShoulderLength"),
+                    aftoutsidediameter=_value("_aftOutsideDiameter"),
+                    aftshoulderdiameter=_value("_aftShoulderDiameter"),
+                    aftshoulderlength=_value("_aftShoulderLength"),
+                    length=_value("_length"))
+    _knownTags = ComponentElement._knownTags | frozenset(["filled", "shape", "foreoutsidediameter", "foreshoulderdiameter", "foreshoulderlength",
+        "aftoutsidediameter", "aftshoulderdiameter", "aftshoulderlength", "length", "thickness"])
 
     def setValues(self, obj):
         super().setValues(obj)
@@ -532,16 +440,26 @@ class TransitionElement(ComponentElement):
 
         self.setValues(obj)
         self.validate(obj)
-        self.persist(obj, self._connection)
+        self.addRecord(obj)
 
         return super().end()
 
 class ParachuteElement(ComponentElement):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
-
-        self._knownTags = self._knownTags + ["diameter", "sides", "linecount", "linelength", "linematerial"]
+    _startTags = dict(ComponentElement._startTags,
+                      diameter=_units("_diameter"),
+                      linelength=_units("_lineLength"),
+                      linematerial=_units("_lineMaterial", "Type"))
+    _endTags = dict(ComponentElement._endTags,
+                    diameter=_value("_diameter"),
+                    sides=_setter("_sides", _toInt),
+                    linecount=_setter("_lineCount", _toInt),
+                    linelength=_value("_lineLength"),
+                    linematerial=_value("_lineMaterial", _sanitizeName))
+    _knownTags = ComponentElement._knownTags | frozenset(["diameter", "sides", "linecount", "linelength", "linematerial"])
+
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._diameter = (0.0, "")
         self._sides = 0
@@ -549,32 +467,6 @@ class ParachuteElement(ComponentElement):
         self._lineLength = (0.0, "")
         self._lineMaterial = ("unspecified", MATERIAL_TYPE_LINE)
 
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "diameter":
-            self._diameter = (self._diameter[0], attributes['Unit'])
-        elif _tag == "linelength":
-            self._lineLength = (self._lineLength[0], attributes['Unit'])
-        elif _tag == "linematerial":
-            self._lineMaterial = (self._lineMaterial[0], attributes['Type'])
-        else:
-            super().handleTag(tag, attributes)
-
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "diameter":
-            self._diameter = (_toFloat(content), self._diameter[1])
-        elif _tag == "sides":
-            self._sides = _toInt(content)
-        elif _tag == "linecount":
-            self._lineCount = _toInt(content)
-        elif _tag == "linelength":
-            self._lineLength = (_toFloat(content), self._lineLength[1])
-        elif _tag == "linematerial":
-            self._lineMaterial = (self._sanitizeName(content), self._lineMaterial[1])
-        else:
-            super().handleEndTag(tag, content)
-
     def setValues(self, obj):
         super().setValues(obj)
 
@@ -589,43 +481,23 @@ class ParachuteElement(ComponentElement):
 
         self.setValues(obj)
         self.validate(obj)
-        self.persist(obj, self._connection)
+        self.addRecord(obj)
 
         return super().end()
 
 class StreamerElement(ComponentElement):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    _startTags = dict(ComponentElement._startTags, length=_units("_length"), width=_units("_width"), thickness=_units("_thickness"))
+    _endTags = dict(ComponentElement._endTags, length=_value("_length"), width=_value("_width"), thickness=_value("_thickness"))
+    _knownTags = ComponentElement._knownTags | frozenset(["length", "width", "thickness"])
 
-        self._knownTags = self._knownTags + ["length", "width", "thickness"]
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
         self._length = (0.0, "")
         self._width = (0.0, "")
         self._thickness = (0.0, "")
 
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "length":
-            self._length = (self._length[0], attributes['Unit'])
-        elif _tag == "width":
-            self._width = (self._width[0], attributes['Unit'])
-        elif _tag == "thickness":
-            self._thickness = (self._thickness[0], attributes['Unit'])
-        else:
-            super().handleTag(tag, attributes)
-
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "length":
-            self._length = (_toFloat(content), self._length[1])
-        elif _tag == "width":
-            self._width = (_toFloat(content), self._width[1])
-        elif _tag == "thickness":
-            self._thickness = (_toFloat(content), self._thickness[1])
-        else:
-            super().handleEndTag(tag, content)
-
     def setValues(self, obj):
         super().setValues(obj)
 
@@ -638,27 +510,24 @@ class StreamerElement(ComponentElement):
 
         self.setValues(obj)
         self.validate(obj)
-        self.persist(obj, self._connection)
+        self.addRecord(obj)
 
         return super().end()
 
 class NoseConeElement(ComponentElement):
 
-    def __init__(self, parent, tag, attributes, connection, filename, line):
-        super().__init__(parent, tag, attributes, connection, filename, line)
+    # Map import shape names to internal names. There may be multiple entries for the same type
+    _shapeMap = { "conical" : TYPE_CONE.lower(),
+                  "ellipsoid" : TYPE_ELLIPTICAL.lower(),
+                  "ogive" : TYPE_OGIVE.lower(),
+                  "parabolic" : TYPE_PARABOLA.lower(),
+                  "haack" : TYPE_HAACK.lower(),
+                  "power" : TYPE_POWER.lower()
+                }
 
-        self._knownTags = self._knownTags + ["filled", "shape", "foreoutsidediameter", "foreshoulderdiameter", "foreshoulderlength", 
-            "aftoutsidediameter", "aftshoulderdiameter", "aftshoulderlength", "length", "thickness"]
+    def __init__(self, parent, tag, attributes, records, filename, line):
+        super().__init__(parent, tag, attributes, records, filename, line)
 
-        # Map import shape names to internal names. There may be multiple entries for the same type
-        self._shapeMap = { "conical" : TYPE_CONE.lower(),
-                           "ellipsoid" : TYPE_ELLIPTICAL.lower(),
-                           "ogive" : TYPE_OGIVE.lower(),
-                           "parabolic" : TYPE_PARABOLA.lower(),
-                           "haack" : TYPE_HAACK.lower(),
-                           "power" : TYPE_POWER.lower()
-                         }
-        
         self._noseType = "" # Shape
         self._filled = False
 
@@ -668,23 +537,11 @@ class NoseConeElement(ComponentElement):
         self._length = (0.0, "")
         self._thickness = (0.0, "")
 
-    def handleTag(self, tag, attributes):
-        _tag = tag.lower().strip()
-        if _tag == "outsidediameter":
-            self._outsideDiameter = (self._outsideDiameter[0], attributes['Unit'])
-        elif _tag == "shoulderdiameter":
-            self._shoulderDiameter = (self._shoulderDiameter[0], attributes['Unit'])
-        elif _tag == "shoulderlength":
-            self._shoulderLength = (self._shoulderLength[0], attributes['Unit'])
-        elif _tag == "length":
-            self._length = (self._length[0], attributes['Unit'])
-        elif _tag == "thickness":
-            try:
-                self._thickness = (self._thickness[0], attributes['Unit'])
-            except KeyError:
-                self._thickness = (self._thickness[0], "in")
-        else:
-            super().handleTag(tag, attributes)
+    def _thicknessUnits(self, attributes):
+        try:
+            self._thickness = (self._thickness[0], attributes['Unit'])
+        except KeyError:
+            self._thickness = (self._thickness[0], "in")
 
     def _mapShape(self, shape):
         _shape = shape.lower()
@@ -692,24 +549,25 @@ class NoseConeElement(ComponentElement):
             return self._shapeMap[_shape]
         return shape
 
-    def handleEndTag(self, tag, content):
-        _tag = tag.lower().strip()
-        if _tag == "filled":
-            self._filled = _toBoolean(content)
-        elif _tag == "shape":
-            self._noseType = self._mapShape(content)
-        elif _tag == "outsidediameter":
-            self._outsideDiameter = (_toFloat(content), self._outsideDiameter[1])
-        elif _tag == "shoulderdiameter":
-            self._shoulderDiameter = (_toFloat(content), self._shoulderDiameter[1])
-        elif _tag == "shoulderlength":
-            self._shoulderLength = (_toFloat(content), self._shoulderLength[1])
-        elif _tag == "length":
-            self._length = (_toFloat(content), self._length[1])
-        elif _tag == "thickness":
-            self._thickness = (_toFloat(content), self._thickness[1])
-        else:
-            super().handleEndTag(tag, content)
+    def _setShape(self, content):
+        self._noseType = self._mapShape(content)
+
+    _startTags = dict(ComponentElement._startTags,
+                      outsidediameter=_units("_outsideDiameter"),
+                      shoulderdiameter=_units("_shoulderDiameter"),
+                      shoulderlength=_units("_shoulderLength"),
+                      length=_units("_length"),
+                      thickness=_thicknessUnits)
+    _endTags = dict(ComponentElement._endTags,
+                    filled=_setter("_filled", _toBoolean),
+                    shape=_setShape,
+                    outsidediameter=_value("_outsideDiameter"),
+                    shoulderdiameter=_value("_shoulderDiameter"),
+                    shoulderlength=_value("_shoulderLength"),
+                    length=_value("_length"),
+                    thickness=_value("_thickness"))
+    _knownTags = ComponentElement._knownTags | frozenset(["filled", "shape", "foreoutsidediameter", "foreshoulderdiameter", "foreshoulderlength",
+        "aftoutsidediameter", "aftshoulderdiameter", "aftshoulderlength", "length", "thickness"])
 
     def setValues(self, obj):
         super().setValues(obj)
@@ -728,39 +586,81 @@ class NoseConeElement(ComponentElement):
 
         self.setValues(obj)
         self.validate(obj)
-        self.persist(obj, self._connection)
+        self.addRecord(obj)
 
         return super().end()
 
+ComponentsElement._validChildren = { 'bodytube' : BodyTubeElement,
+                                     'tubecoupler' : BodyTubeElement,
+                                     'transition' : TransitionElement,
+                                     'engineblock' : BodyTubeElement,
+                                     'parachute' : ParachuteElement,
+                                     'streamer' : StreamerElement,
+                                     'nosecone' : NoseConeElement,
+                                     'centeringring' : BodyTubeElement,
+                                     'bulkhead' : BulkheadElement,
+                                     'launchlug' : BodyTubeElement
+                                   }
+
 class PartDatabaseOrcImporter(xml.sax.ContentHandler):
-    def __init__(self, connection, filename):
+    def __init__(self, filename):
         super().__init__()
         
-        self._connection = connection
+        self._records = []
         self._filename = filename
-        self._current = RootElement(None, "root", None, self._connection, filename, 0)
-        self._content = ''
+        self._current = RootElement(None, "root", None, self._records, filename, 0)
+        self._content = []
+        self._tags = {}
+
+    def records(self):
+        """ Parsed parts as (object, line) tuples, in file order """
+        return self._records
+
+    def _normalize(self, tag):
+        # Tags repeat throughout the file, so only normalize each one once
+        normalized = self._tags.get(tag)
+        if normalized is None:
+            normalized = tag.lower().strip()
+            self._tags[tag] = normalized
+        return normalized
 
     # Call when an element starts
     def startElement(self, tag, attributes):
-        loc = self._locator
-        if loc is not None:
-            line = loc.getLineNumber()
-        if self._current.isChildElement(tag):
+        _tag = self._normalize(tag)
+        if self._current.isChildElement(_tag):
+            line = self._locator.getLineNumber()
             self._current = self._current.createChild(tag, attributes, self._filename, line)
-            self._content = ''
+            self._content = []
         else:
-            self._current.handleTag(tag, attributes)
+            self._current.handleTag(_tag, attributes)
 
     # Call when an elements ends
     def endElement(self, tag):
-        if self._current.isTag(tag):
+        _tag = self._normalize(tag)
+        if self._current.isTag(_tag):
             self._current = self._current.end()
         else:
-            self._current.handleEndTag(tag, self._content.strip())
-        self._content = ''
-
+            self._current.handleEndTag(_tag, "".join(self._content).strip())
+        self._content = []
 
     # Call when a character is read
     def characters(self, content):
-        self._content += content
+        self._content.append(content)
+
+def parseOrcFile(filename):
+    """
+    Parse a part file without touching the database, so it can be run in a worker process.
+    Returns the filename and its records
+    """
+    # create an XMLReader
+    parser = xml.sax.make_parser()
+
+    # turn off namespaces
+    parser.setFeature(xml.sax.handler.feature_namespaces, 0)
+
+    # override the default ContextHandler
+    handler = PartDatabaseOrcImporter(filename)
+    parser.setContentHandler(handler)
+    parser.parse(filename)
+
+    return filename, handler.records()
@@ -0,0 +1,352 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Provides support for importing RockSim component catalogs."""
+
+__title__ = "FreeCAD RockSim Catalog Importer"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import csv
+from os import listdir, path
+
+from App.Parts.Utilities import _toFloat, _toInt, _toSIDensity
+from App.Parts.BodyTube import BodyTube
+from App.Parts.Bulkhead import Bulkhead
+from App.Parts.CenteringRing import CenteringRing
+from App.Parts.Coupler import Coupler
+from App.Parts.EngineBlock import EngineBlock
+from App.Parts.LaunchLug import LaunchLug
+from App.Parts.Material import Material
+from App.Parts.NoseCone import NoseCone
+from App.Parts.Parachute import Parachute
+from App.Parts.Streamer import Streamer
+from App.Parts.Transition import Transition
+
+from App.Parts.Exceptions import InvalidError, UnknownManufacturerError
+
+from App.Constants import TYPE_CONE, TYPE_ELLIPTICAL, TYPE_HAACK, TYPE_OGIVE, TYPE_PARABOLA, TYPE_PARABOLIC, TYPE_POWER
+from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_SURFACE, MATERIAL_TYPE_LINE
+
+# The default manufacturer is based on the catalog folder
+_manufacturers = {
+    "bluetube" : "Always Ready Rocketry",
+    "bms" : "BalsaMachining.com",
+    "estes" : "Estes",
+    "giantleaprocketry" : "Giant Leap",
+    "publicmissiles" : "Public Missiles",
+    "quest" : "Quest",
+    "semroc" : "SEMROC"
+}
+
+# RockSim shapes are given by name or by index
+_shapes = {
+    "0" : TYPE_CONE.lower(),
+    "1" : TYPE_OGIVE.lower(),
+    "2" : TYPE_PARABOLA.lower(),
+    "3" : TYPE_ELLIPTICAL.lower(),
+    "4" : TYPE_POWER.lower(),
+    "5" : TYPE_PARABOLIC.lower(),
+    "6" : TYPE_HAACK.lower(),
+    "cone" : TYPE_CONE.lower(),
+    "conical" : TYPE_CONE.lower(),
+    "ogive" : TYPE_OGIVE.lower(),
+    "parabolic" : TYPE_PARABOLA.lower(),
+    "elliptical" : TYPE_ELLIPTICAL.lower(),
+    "power-series" : TYPE_POWER.lower(),
+    "parabolic-series" : TYPE_PARABOLIC.lower(),
+    "sears-haack" : TYPE_HAACK.lower()
+}
+
+_massUnits = ["g", "kg", "oz", "lb"]
+
+class RktMaterial(Material):
+    """ RockSim materials are shared with any existing material of the same name and type """
+
+    def densitySI(self):
+        # RockSim densities are in the units given
+        return _toSIDensity(self._density, self._units)
+
+    def persist(self, loader):
+        index = loader.materials().findByName(self._name, self._type)
+        if index is not None:
+            return index
+
+        return super().persist(loader)
+
+class RktCatalogFile:
+
+    def __init__(self, filename, manufacturer, records):
+        self._filename = filename
+        self._manufacturer = manufacturer
+        self._records = records
+
+        # Column headers aren't reliable in these files, so only the mass columns are located by name
+        self._massUnitsColumn = 9
+        self._massColumn = 10
+
+    def _units(self, value):
+        # Units are written as 'in', 'in.', 'In.' etc
+        return value.strip().lower().rstrip('.')
+
+    def _column(self, row, index):
+        if index < len(row):
+            return row[index].strip()
+        return ''
+
+    def _value(self, row, index):
+        return _toFloat(self._column(row, index))
+
+    def _dimension(self, row, index):
+        return (self._value(row, index), self._units(row[3]))
+
+    def _mass(self, row):
+        units = self._units(self._column(row, self._massUnitsColumn))
+        if units not in _massUnits:
+            return (0.0, "")
+        return (self._value(row, self._massColumn), units)
+
+    def _findMassColumns(self, header):
+        columns = [column.strip().lower() for column in header]
+        if "mass units" in columns:
+            self._massUnitsColumn = columns.index("mass units")
+            if "mass" in columns:
+                self._massColumn = columns.index("mass")
+
+    def createObject(self, row):
+        return None
+
+    def setComponentValues(self, obj, row, materialType=MATERIAL_TYPE_BULK):
+        obj._manufacturer = self._column(row, 0) or self._manufacturer
+        obj._partNumber = self._column(row, 1)
+        obj._description = self._column(row, 2)
+        obj._mass = self._mass(row)
+        obj._material = (obj._material[0], materialType)
+
+    def addRecord(self, obj, line):
+        try:
+            obj.validate()
+            self._records.append((obj, line))
+        except InvalidError as e:
+            print("Invalid %s: manufacturer %s, part number %s %s" % (self.__class__.__name__, e._manufacturer, e._name, e._message))
+
+    def read(self):
+        # Older catalogs are not UTF-8
+        with open(self._filename, newline='', encoding='latin-1') as f:
+            reader = csv.reader(f)
+            self._findMassColumns(next(reader, []))
+            for row in reader:
+                if len(row) < 4 or len(self._column(row, 1)) == 0:
+                    continue
+                try:
+                    obj = self.createObject(row)
+                except (ValueError, IndexError):
+                    print("Error in %s at line %d" % (self._filename, reader.line_num))
+                    continue
+                if obj is not None:
+                    self.addRecord(obj, reader.line_num)
+
+class RktMaterialFile(RktCatalogFile):
+
+    def _materialType(self, units):
+        # The density units give the material type, eg lb/ft3, oz/in2 or g/cm
+        per = units.split('/')[-1]
+        if per.endswith('3'):
+            return MATERIAL_TYPE_BULK
+        if per.endswith('2'):
+            return MATERIAL_TYPE_SURFACE
+        return MATERIAL_TYPE_LINE
+
+    def _findMassColumns(self, header):
+        pass
+
+    def createObject(self, row):
+        name = self._column(row, 0)
+        if len(name) == 0:
+            return None
+
+        obj = RktMaterial()
+        obj._manufacturer = self._manufacturer
+        obj._name = name
+        obj._units = self._column(row, 1)
+        obj._type = self._materialType(obj._units)
+        obj._density = self._value(row, 2)
+        return obj
+
+    def read(self):
+        # Material names are in the first column, which the catalog files use for the manufacturer
+        with open(self._filename, newline='', encoding='latin-1') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            for row in reader:
+                try:
+                    obj = self.createObject(row)
+                except (ValueError, IndexError):
+                    print("Error in %s at line %d" % (self._filename, reader.line_num))
+                    continue
+                if obj is not None:
+                    self.addRecord(obj, reader.line_num)
+
+class RktTubeFile(RktCatalogFile):
+
+    def __init__(self, filename, manufacturer, records, tubeClass):
+        super().__init__(filename, manufacturer, records)
+
+        self._tubeClass = tubeClass
+
+    def createObject(self, row):
+        obj = self._tubeClass()
+        self.setComponentValues(obj, row)
+
+        obj._material = (self._column(row, 7), MATERIAL_TYPE_BULK)
+        obj._ID = self._dimension(row, 4)
+        obj._OD = self._dimension(row, 5)
+        obj._length = self._dimension(row, 6)
+        return obj
+
+class RktNoseConeFile(RktCatalogFile):
+
+    def __init__(self, filename, manufacturer, records):
+        super().__init__(filename, manufacturer, records)
+
+        self._massUnitsColumn = 14
+        self._massColumn = 15
+
+    def createObject(self, row):
+        obj = NoseCone()
+        self.setComponentValues(obj, row)
+
+        obj._length = self._dimension(row, 4)
+        obj._outsideDiameter = self._dimension(row, 5)
+        obj._shoulderLength = self._dimension(row, 7)
+        obj._shoulderDiameter = self._dimension(row, 8)
+        obj._thickness = self._dimension(row, 9)
+        obj._noseType = _shapes.get(self._column(row, 10).lower(), self._column(row, 10).lower())
+        obj._filled = self._column(row, 11).lower() not in ["hollow", "1"] or obj._thickness[0] == 0.0
+        obj._material = (self._column(row, 12), MATERIAL_TYPE_BULK)
+        return obj
+
+class RktTransitionFile(RktCatalogFile):
+
+    def __init__(self, filename, manufacturer, records):
+        super().__init__(filename, manufacturer, records)
+
+        self._massUnitsColumn = 16
+        self._massColumn = 17
+
+    def createObject(self, row):
+        obj = Transition()
+        self.setComponentValues(obj, row)
+
+        obj._foreShoulderLength = self._dimension(row, 4)
+        obj._foreShoulderDiameter = self._dimension(row, 5)
+        obj._foreOutsideDiameter = self._dimension(row, 6)
+        obj._length = self._dimension(row, 7)
+        obj._aftOutsideDiameter = self._dimension(row, 8)
+        obj._aftShoulderLength = self._dimension(row, 10)
+        obj._aftShoulderDiameter = self._dimension(row, 11)
+        obj._thickness = self._dimension(row, 12)
+        obj._filled = self._column(row, 13).lower() not in ["hollow", "1"] or obj._thickness[0] == 0.0
+        obj._material = (self._column(row, 14), MATERIAL_TYPE_BULK)
+        obj._noseType = _shapes.get(self._column(row, 18).lower(), self._column(row, 18).lower())
+        return obj
+
+class RktParachuteFile(RktCatalogFile):
+
+    def __init__(self, filename, manufacturer, records):
+        super().__init__(filename, manufacturer, records)
+
+        self._massUnitsColumn = 12
+        self._massColumn = 13
+
+    def createObject(self, row):
+        obj = Parachute()
+        self.setComponentValues(obj, row, MATERIAL_TYPE_SURFACE)
+
+        obj._sides = _toInt(self._column(row, 4))
+        obj._diameter = self._dimension(row, 5)
+        obj._lineCount = _toInt(self._column(row, 7))
+        obj._lineLength = self._dimension(row, 8)
+        obj._lineMaterial = (self._column(row, 9), MATERIAL_TYPE_LINE)
+        obj._material = (self._column(row, 11), MATERIAL_TYPE_SURFACE)
+        return obj
+
+class RktStreamerFile(RktCatalogFile):
+
+    def createObject(self, row):
+        obj = Streamer()
+        self.setComponentValues(obj, row, MATERIAL_TYPE_SURFACE)
+
+        obj._mass = (0.0, "")
+        obj._length = self._dimension(row, 4)
+        obj._width = self._dimension(row, 5)
+        obj._thickness = self._dimension(row, 6)
+        obj._material = (self._column(row, 8), MATERIAL_TYPE_SURFACE)
+        return obj
+
+def _catalogFile(filename, manufacturer, records):
+    name = path.basename(filename).upper()
+    if name == "MATERIAL.CSV":
+        return RktMaterialFile(filename, manufacturer, records)
+
+    tubes = {
+        "BT" : BodyTube,
+        "TC" : Coupler,
+        "CR" : CenteringRing,
+        "BH" : Bulkhead,
+        "EB" : EngineBlock,
+        "LL" : LaunchLug
+    }
+    prefix = name[:2]
+    if prefix in tubes:
+        return RktTubeFile(filename, manufacturer, records, tubes[prefix])
+    if prefix == "NC":
+        return RktNoseConeFile(filename, manufacturer, records)
+    if prefix == "TR":
+        return RktTransitionFile(filename, manufacturer, records)
+    if prefix == "PC":
+        return RktParachuteFile(filename, manufacturer, records)
+    if prefix == "ST":
+        return RktStreamerFile(filename, manufacturer, records)
+
+    # Fins, mass objects, sleeves etc are not supported
+    return None
+
+def parseRktFolder(folder):
+    """
+    Parse a RockSim catalog folder without touching the database, so it can be run in a worker process.
+    Returns the folder and its records
+    """
+    vendor = path.basename(path.normpath(folder)).lower()
+    if vendor not in _manufacturers:
+        raise UnknownManufacturerError("Unknown manufacturer for '%s'" % vendor)
+
+    # Materials are read first so the components can reference them
+    files = sorted(listdir(folder), key=lambda name: (name.upper() != "MATERIAL.CSV", name.upper()))
+
+    records = []
+    for file in files:
+        if not file.upper().endswith(".CSV"):
+            continue
+        catalog = _catalogFile(path.join(folder, file), _manufacturers[vendor], records)
+        if catalog is not None:
+            catalog.read()
+
+    return folder, records
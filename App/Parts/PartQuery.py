@@ -0,0 +1,152 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Dimensional searches of the parts database"""
+
+__title__ = "FreeCAD Open Rocket Part Queries"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+from App.Constants import COMPONENT_TYPE_ANY
+
+# Dimensions are in mm, using the normalized columns. Ranges are (minimum, maximum) tuples
+
+_bodyTubeQuery = """SELECT b.body_tube_index, c.component_index, type, manufacturer, part_number, description, inner_diameter, inner_diameter_units,
+                        outer_diameter, outer_diameter_units, length, length_units, inner_diameter_mm, outer_diameter_mm, length_mm, estimated_mass
+                    FROM body_tube_rtree r, body_tube b, component c, tube_type t
+                    WHERE r.body_tube_index = b.body_tube_index AND b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index"""
+
+_noseConeQuery = """SELECT n.nose_index, c.component_index, manufacturer, part_number, description, shape, diameter, diameter_units, length, length_units,
+                        shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units,
+                        diameter_mm, length_mm, shoulder_diameter_mm, shoulder_length_mm, estimated_mass
+                    FROM nose_rtree r, nose n, component c
+                    WHERE r.nose_index = n.nose_index AND n.component_index = c.component_index"""
+
+_transitionQuery = """SELECT t.transition_index, c.component_index, manufacturer, part_number, description,
+                        shape, length, length_units,
+                        fore_outside_diameter, fore_outside_diameter_units, fore_shoulder_diameter, fore_shoulder_diameter_units, fore_shoulder_length, fore_shoulder_length_units,
+                        aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units,
+                        length_mm, fore_outside_diameter_mm, fore_shoulder_diameter_mm, fore_shoulder_length_mm,
+                        aft_outside_diameter_mm, aft_shoulder_diameter_mm, aft_shoulder_length_mm, estimated_mass
+                    FROM transition_rtree r, transition t, component c
+                    WHERE r.transition_index = t.transition_index AND t.component_index = c.component_index"""
+
+# Nearest searches start with this half width, doubling until enough parts are found
+_initialWindow = 1.0
+_maximumWindow = 100000.0
+
+def window(value, tolerance):
+    """ The range value +/- tolerance """
+    return (value - tolerance, value + tolerance)
+
+def _tubeTypeFilter(tubeType):
+    if tubeType is None or tubeType == COMPONENT_TYPE_ANY:
+        return " AND NOT t.type = 'Centering Ring' AND NOT t.type = 'Bulkhead'", {}
+    return " AND t.type = :type", { "type" : tubeType }
+
+def _inRange(connection, query, alias, ranges, where="", parameters={}, order=""):
+    """
+    Rows of the query within all of the ranges. The R*Tree stores 32 bit floats, so it is
+    used to find candidates and the normalized column decides the result
+    """
+    values = dict(parameters)
+    for dimension, limits in ranges.items():
+        if limits is None:
+            continue
+
+        where += " AND r.max_%s >= :%s_min AND r.min_%s <= :%s_max" % (dimension, dimension, dimension, dimension)
+        where += " AND %s.%s_mm BETWEEN :%s_min AND :%s_max" % (alias, dimension, dimension, dimension)
+        values[dimension + "_min"] = limits[0]
+        values[dimension + "_max"] = limits[1]
+
+    cursor = connection.cursor()
+    cursor.execute(query + where + order, values)
+    return cursor.fetchall()
+
+def _nearest(connection, query, alias, count, targets, where="", parameters={}):
+    """
+    The count rows closest to the target dimensions, searching a window that grows until it
+    holds count rows that are all closer than any row outside of it
+    """
+    targets = {dimension : target for dimension, target in targets.items() if target is not None}
+    if count < 1 or len(targets) < 1:
+        return []
+
+    distance = " + ".join(["(%s.%s_mm - :%s) * (%s.%s_mm - :%s)" % (alias, dimension, dimension, alias, dimension, dimension) for dimension in targets])
+    query = query.replace(" FROM ", ", %s AS distance FROM " % distance, 1)
+    order = " ORDER BY distance LIMIT :count"
+
+    values = dict(parameters)
+    values.update(targets)
+    values["count"] = count
+
+    halfWidth = _initialWindow
+    while True:
+        ranges = {dimension : window(target, halfWidth) for dimension, target in targets.items()}
+        rows = _inRange(connection, query, alias, ranges, where, values, order)
+
+        # Anything outside the window is further away than the half width
+        if len(rows) >= count and rows[-1][-1] <= halfWidth * halfWidth:
+            return rows
+        if halfWidth >= _maximumWindow:
+            return rows
+        halfWidth *= 2.0
+
+def bodyTubesInRange(connection, tubeType=None, outerDiameter=None, innerDiameter=None, length=None):
+    where, parameters = _tubeTypeFilter(tubeType)
+    return _inRange(connection, _bodyTubeQuery, "b", {
+                        "outer_diameter" : outerDiameter,
+                        "inner_diameter" : innerDiameter,
+                        "length" : length
+                    }, where, parameters)
+
+def nearestBodyTubes(connection, count, tubeType=None, outerDiameter=None, innerDiameter=None, length=None):
+    where, parameters = _tubeTypeFilter(tubeType)
+    return _nearest(connection, _bodyTubeQuery, "b", count, {
+                        "outer_diameter" : outerDiameter,
+                        "inner_diameter" : innerDiameter,
+                        "length" : length
+                    }, where, parameters)
+
+def noseConesInRange(connection, diameter=None, length=None):
+    return _inRange(connection, _noseConeQuery, "n", {
+                        "diameter" : diameter,
+                        "length" : length
+                    })
+
+def nearestNoseCones(connection, count, diameter=None, length=None):
+    return _nearest(connection, _noseConeQuery, "n", count, {
+                        "diameter" : diameter,
+                        "length" : length
+                    })
+
+def transitionsInRange(connection, foreDiameter=None, aftDiameter=None, length=None):
+    return _inRange(connection, _transitionQuery, "t", {
+                        "fore_outside_diameter" : foreDiameter,
+                        "aft_outside_diameter" : aftDiameter,
+                        "length" : length
+                    })
+
+def nearestTransitions(connection, count, foreDiameter=None, aftDiameter=None, length=None):
+    return _nearest(connection, _transitionQuery, "t", count, {
+                        "fore_outside_diameter" : foreDiameter,
+                        "aft_outside_diameter" : aftDiameter,
+                        "length" : length
+                    })
@@ -0,0 +1,357 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Versions of the parts database schema, and the upgrades between them"""
+
+__title__ = "FreeCAD Open Rocket Part Database Schema"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import re
+import sqlite3
+from os import path
+from pathlib import Path
+
+from App.Constants import COMPONENT_TYPE_NOSECONE, COMPONENT_TYPE_PARACHUTE, COMPONENT_TYPE_STREAMER, COMPONENT_TYPE_TRANSITION
+from App.Constants import MATERIAL_TYPE_BULK
+from App.Parts.Component import _fuzzyText
+from App.Parts.Exceptions import SchemaVersionError
+from App.Parts.Parachute import canopyArea
+from App.Parts.Utilities import _toMillimeters, _toKilograms
+from App.Parts.Volume import tubeVolume, noseVolume, transitionVolume, estimateMass
+
+# Stored in PRAGMA user_version. Databases written before versioning are version 0
+SCHEMA_VERSION = 6
+
+# Catalog lengths stored with their units, which are also stored in mm as <column>_mm
+_lengthColumns = {
+    "body_tube" : ["inner_diameter", "outer_diameter", "length"],
+    "nose" : ["diameter", "length", "thickness", "shoulder_diameter", "shoulder_length"],
+    "transition" : ["fore_outside_diameter", "fore_shoulder_diameter", "fore_shoulder_length",
+                    "aft_outside_diameter", "aft_shoulder_diameter", "aft_shoulder_length", "length", "thickness"],
+    "parachute" : ["diameter", "line_length"],
+    "streamer" : ["length", "width", "thickness"]
+}
+
+# Columns holding the integer primary key of another table
+_keyColumns = ["component_index", "tube_type_index", "material_index", "line_material_index"]
+
+def _millimeters(value, units):
+    if value is None:
+        return None
+    return _toMillimeters(value, units)
+
+def _kilograms(value, units):
+    if value is None:
+        return None
+    return _toKilograms(value, units)
+
+def schemaVersion(connection):
+    return connection.execute("PRAGMA user_version").fetchone()[0]
+
+def setSchemaVersion(connection):
+    """ Mark a database created with the current schema """
+    connection.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
+
+def _hasTable(connection, table):
+    row = connection.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    return row[0] > 0
+
+def _columns(connection, table):
+    return [row[1] for row in connection.execute("PRAGMA table_info(%s)" % table)]
+
+def _addColumns(connection, table, columns):
+    existing = _columns(connection, table)
+    for column in columns:
+        if column not in existing:
+            connection.execute("ALTER TABLE %s ADD COLUMN %s" % (table, column))
+
+def _declareKeys(connection, table):
+    """ Rebuild a table with its key columns declared INTEGER, keeping its rows and indexes """
+    sql = connection.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()[0]
+    indexes = [row[0] for row in connection.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL", (table,))]
+    columns = ", ".join(_columns(connection, table))
+
+    # Only untyped columns are declared, the primary key already being INTEGER
+    sql = re.sub(r"\b(%s)(?=\s*[,)])" % "|".join(_keyColumns), r"\1 INTEGER", sql)
+
+    connection.execute("ALTER TABLE %s RENAME TO %s_old" % (table, table))
+    connection.execute(sql)
+    connection.execute("INSERT INTO %s (%s) SELECT %s FROM %s_old" % (table, columns, columns, table))
+    connection.execute("DROP TABLE %s_old" % table)
+    for index in indexes:
+        connection.execute(index)
+
+def _upgradeSIUnits(connection):
+    """ Version 1 adds the dimensions in mm, masses in kg and densities in SI units """
+    _addColumns(connection, "material", ["density_si"])
+
+    # Earlier databases only held Open Rocket materials, whose densities are SI whatever the units say
+    connection.execute("UPDATE material SET density_si = density")
+
+    _addColumns(connection, "component", ["mass_kg"])
+    connection.execute("UPDATE component SET mass_kg = to_kilograms(mass, mass_units)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_component_mass ON component(mass_kg)")
+
+    for table, columns in _lengthColumns.items():
+        _addColumns(connection, table, ["%s_mm" % column for column in columns])
+        connection.execute("UPDATE %s SET %s" % (table,
+                            ", ".join(["%s_mm = to_millimeters(%s, %s_units)" % (column, column, column) for column in columns])))
+
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_body_tube_inner_diameter ON body_tube(inner_diameter_mm)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_body_tube_outer_diameter ON body_tube(outer_diameter_mm)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_nose_diameter ON nose(diameter_mm)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_transition_fore_diameter ON transition(fore_outside_diameter_mm)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_transition_aft_diameter ON transition(aft_outside_diameter_mm)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_parachute_diameter ON parachute(diameter_mm)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_streamer_width ON streamer(width_mm)")
+
+def _upgradeUniqueKeys(connection):
+    """
+    Version 2 makes materials unique by manufacturer, name and type, and parts unique by manufacturer,
+    part number and component type. The first of any duplicates is kept, as an import does
+    """
+    connection.execute("ALTER TABLE material RENAME TO material_old")
+    connection.execute("""CREATE TABLE material (material_index INTEGER PRIMARY KEY ASC, manufacturer, material_name, type, density, units, density_si,
+                            UNIQUE (manufacturer, material_name, type))""")
+    connection.execute("""INSERT INTO material SELECT material_index, manufacturer, material_name, type, density, units, density_si
+                            FROM material_old WHERE true ORDER BY material_index ON CONFLICT DO NOTHING""")
+
+    # Parts using a duplicate material use the one kept instead
+    for table, column in [("component", "material_index"), ("parachute", "line_material_index")]:
+        connection.execute("""UPDATE {table} SET {column} = (SELECT m.material_index FROM material_old o, material m
+                                    WHERE o.material_index = {table}.{column} AND m.manufacturer = o.manufacturer
+                                        AND m.material_name = o.material_name AND m.type = o.type)
+                                WHERE {column} NOT IN (SELECT material_index FROM material)""".format(table=table, column=column))
+    connection.execute("DROP TABLE material_old")
+
+    # The component type is given by the table holding the part details
+    connection.execute("ALTER TABLE component RENAME TO component_old")
+    connection.execute("""CREATE TABLE component (component_index INTEGER PRIMARY KEY ASC, manufacturer, part_number, component_type, description, material_index, mass, mass_units, mass_kg,
+                            UNIQUE (manufacturer, part_number, component_type))""")
+    connection.execute("""INSERT INTO component SELECT component_index, manufacturer, part_number,
+                                COALESCE((SELECT t.type FROM body_tube b, tube_type t WHERE b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index),
+                                    (SELECT :nose FROM nose n WHERE n.component_index = c.component_index),
+                                    (SELECT :transition FROM transition t WHERE t.component_index = c.component_index),
+                                    (SELECT :parachute FROM parachute p WHERE p.component_index = c.component_index),
+                                    (SELECT :streamer FROM streamer s WHERE s.component_index = c.component_index)),
+                                description, material_index, mass, mass_units, mass_kg
+                            FROM component_old c WHERE true ORDER BY component_index ON CONFLICT DO NOTHING""",
+                        {"nose" : COMPONENT_TYPE_NOSECONE, "transition" : COMPONENT_TYPE_TRANSITION,
+                            "parachute" : COMPONENT_TYPE_PARACHUTE, "streamer" : COMPONENT_TYPE_STREAMER})
+    connection.execute("DROP TABLE component_old")
+    connection.execute("CREATE INDEX idx_component_manufacturer ON component(manufacturer)")
+    connection.execute("CREATE INDEX idx_component_mass ON component(mass_kg)")
+
+    # The details of the duplicate parts that weren't kept
+    for table in ["body_tube", "nose", "transition", "parachute", "streamer"]:
+        connection.execute("DELETE FROM %s WHERE component_index NOT IN (SELECT component_index FROM component)" % table)
+
+def _upgradeEstimatedMass(connection):
+    """ Version 3 adds the volumes estimated from the part dimensions, and the masses of the bulk material parts """
+    _addColumns(connection, "component", ["estimated_volume", "estimated_mass"])
+
+    connection.execute("""UPDATE component SET estimated_volume = COALESCE(
+                                (SELECT tube_volume(outer_diameter_mm, inner_diameter_mm, length_mm) FROM body_tube b
+                                    WHERE b.component_index = component.component_index),
+                                (SELECT nose_volume(shape, style, diameter_mm, length_mm, thickness_mm, shoulder_diameter_mm, shoulder_length_mm) FROM nose n
+                                    WHERE n.component_index = component.component_index),
+                                (SELECT transition_volume(shape, style, fore_outside_diameter_mm, aft_outside_diameter_mm, length_mm, thickness_mm,
+                                        fore_shoulder_diameter_mm, fore_shoulder_length_mm, aft_shoulder_diameter_mm, aft_shoulder_length_mm) FROM transition t
+                                    WHERE t.component_index = component.component_index))""")
+    connection.execute("""UPDATE component SET estimated_mass = estimate_mass(estimated_volume,
+                                (SELECT density_si FROM material m WHERE m.material_index = component.material_index AND m.type = ?))""",
+                        (MATERIAL_TYPE_BULK,))
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_component_estimated_mass ON component(estimated_mass)")
+
+def _upgradeSearchIndexes(connection):
+    """
+    Version 4 indexes the nose cone and transition parts, for the joins from search matches. The
+    version change also rebuilds the trigram index with the current text normalization
+    """
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_nose ON nose(component_index)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_transition ON transition(component_index)")
+
+def _upgradeKeyAffinity(connection):
+    """
+    Version 5 declares the key columns INTEGER, so their indexes can be used when joining on the
+    integer primary keys, and adds the indexes for the tube type and material name lookups
+    """
+    for table in ["component", "body_tube", "nose", "transition", "parachute", "streamer"]:
+        _declareKeys(connection, table)
+
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_material_name ON material(material_name COLLATE NOCASE, type, manufacturer COLLATE NOCASE)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_body_tube_type ON body_tube(tube_type_index, component_index)")
+
+def _upgradeRecoveryArea(connection):
+    """ Version 6 adds the parachute canopy and streamer areas, and indexes the recovery parts """
+    _addColumns(connection, "parachute", ["area_mm2"])
+    connection.execute("UPDATE parachute SET area_mm2 = canopy_area(diameter_mm, sides)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_parachute ON parachute(component_index)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_parachute_area ON parachute(area_mm2)")
+
+    _addColumns(connection, "streamer", ["area_mm2"])
+    connection.execute("UPDATE streamer SET area_mm2 = length_mm * width_mm")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_streamer ON streamer(component_index)")
+    connection.execute("CREATE INDEX IF NOT EXISTS idx_streamer_area ON streamer(area_mm2)")
+
+def indexComponents(connection):
+    """ (Re)build the full text search indexes used by the component lookup """
+    cursor = connection.cursor()
+
+    cursor.execute("DROP TABLE IF EXISTS component_search")
+    cursor.execute("CREATE VIRTUAL TABLE component_search USING fts5(manufacturer, part_number, description, material, prefix='1 2 3')")
+    cursor.execute("""INSERT INTO component_search (rowid, manufacturer, part_number, description, material)
+                        SELECT component_index, c.manufacturer, part_number, description, material_name
+                        FROM component c LEFT JOIN material m ON c.material_index = m.material_index""")
+
+    # Trigrams of the normalized part numbers and descriptions, for fuzzy searches. Part number matches rank higher
+    cursor.execute("DROP TABLE IF EXISTS component_trigram")
+    cursor.execute("CREATE VIRTUAL TABLE component_trigram USING fts5(part_number, description, tokenize='trigram', content='')")
+    cursor.execute("INSERT INTO component_trigram (component_trigram, rank) VALUES ('rank', 'bm25(4.0, 1.0)')")
+    cursor.execute("SELECT component_index, part_number, description FROM component")
+    cursor.executemany("INSERT INTO component_trigram (rowid, part_number, description) VALUES (?, ?, ?)",
+                        [(row[0], _fuzzyText(row[1]), _fuzzyText(row[2])) for row in cursor.fetchall()])
+
+def indexDimensions(connection):
+    """ (Re)build the R*Tree indexes used for dimensional searches. Dimensions are stored as points """
+    cursor = connection.cursor()
+
+    cursor.execute("DROP TABLE IF EXISTS body_tube_rtree")
+    cursor.execute("""CREATE VIRTUAL TABLE body_tube_rtree USING rtree(body_tube_index,
+                        min_outer_diameter, max_outer_diameter, min_inner_diameter, max_inner_diameter, min_length, max_length)""")
+    cursor.execute("""INSERT INTO body_tube_rtree SELECT body_tube_index,
+                        outer_diameter_mm, outer_diameter_mm, inner_diameter_mm, inner_diameter_mm, length_mm, length_mm
+                        FROM body_tube WHERE outer_diameter_mm IS NOT NULL AND inner_diameter_mm IS NOT NULL AND length_mm IS NOT NULL""")
+
+    cursor.execute("DROP TABLE IF EXISTS nose_rtree")
+    cursor.execute("CREATE VIRTUAL TABLE nose_rtree USING rtree(nose_index, min_diameter, max_diameter, min_length, max_length)")
+    cursor.execute("""INSERT INTO nose_rtree SELECT nose_index, diameter_mm, diameter_mm, length_mm, length_mm
+                        FROM nose WHERE diameter_mm IS NOT NULL AND length_mm IS NOT NULL""")
+
+    cursor.execute("DROP TABLE IF EXISTS transition_rtree")
+    cursor.execute("""CREATE VIRTUAL TABLE transition_rtree USING rtree(transition_index,
+                        min_fore_outside_diameter, max_fore_outside_diameter, min_aft_outside_diameter, max_aft_outside_diameter, min_length, max_length)""")
+    cursor.execute("""INSERT INTO transition_rtree SELECT transition_index,
+                        fore_outside_diameter_mm, fore_outside_diameter_mm, aft_outside_diameter_mm, aft_outside_diameter_mm, length_mm, length_mm
+                        FROM transition WHERE fore_outside_diameter_mm IS NOT NULL AND aft_outside_diameter_mm IS NOT NULL AND length_mm IS NOT NULL""")
+
+def buildIndexes(connection):
+    """ Indexes derived from the imported rows, rebuilt after every import """
+    indexComponents(connection)
+    indexDimensions(connection)
+
+# Tables derived from the imported rows, and the function building each one. They are built
+# when missing, and rebuilt after any upgrade as it may change the rows they index
+_derivedTables = {
+    "component_search" : indexComponents,
+    "component_trigram" : indexComponents,
+    "body_tube_rtree" : indexDimensions,
+    "nose_rtree" : indexDimensions,
+    "transition_rtree" : indexDimensions
+}
+
+# The upgrade to each version from the one before, in order
+_upgrades = [
+    (1, _upgradeSIUnits),
+    (2, _upgradeUniqueKeys),
+    (3, _upgradeEstimatedMass),
+    (4, _upgradeSearchIndexes),
+    (5, _upgradeKeyAffinity),
+    (6, _upgradeRecoveryArea)
+]
+
+def _missingIndexes(connection):
+    builders = []
+    for table, builder in _derivedTables.items():
+        if not _hasTable(connection, table) and builder not in builders:
+            builders.append(builder)
+    return builders
+
+def _needsUpgrade(connection):
+    return schemaVersion(connection) < SCHEMA_VERSION or len(_missingIndexes(connection)) > 0
+
+def checkSchema(connection, filename):
+    """ Raise SchemaVersionError for a database that must be upgraded before it can be queried """
+    if not _hasTable(connection, "component") or not _needsUpgrade(connection):
+        return
+
+    version = schemaVersion(connection)
+    if version < SCHEMA_VERSION:
+        problem = "has schema version %d, but version %d is needed" % (version, SCHEMA_VERSION)
+    else:
+        problem = "is missing its search indexes"
+    raise SchemaVersionError("The parts database '%s' %s. Upgrade it with util/ImportDatabase.py --upgrade" % (filename, problem))
+
+def checkDatabase(filename):
+    """ Check the schema of a database file without writing to it """
+    connection = sqlite3.connect(Path(path.abspath(filename)).as_uri() + "?mode=ro", uri=True)
+    try:
+        checkSchema(connection, filename)
+    finally:
+        connection.close()
+
+def upgradeSchema(connection):
+    """
+    Upgrade a database written by an earlier version of the workbench, in a single transaction.
+    Returns True when the database was changed
+    """
+    # An empty database has nothing to upgrade, and a newer one is left alone
+    if not _hasTable(connection, "component") or not _needsUpgrade(connection):
+        return False
+
+    connection.create_function("to_millimeters", 2, _millimeters, deterministic=True)
+    connection.create_function("to_kilograms", 2, _kilograms, deterministic=True)
+    connection.create_function("tube_volume", 3, tubeVolume, deterministic=True)
+    connection.create_function("nose_volume", 7, noseVolume, deterministic=True)
+    connection.create_function("transition_volume", 10, transitionVolume, deterministic=True)
+    connection.create_function("estimate_mass", 2, estimateMass, deterministic=True)
+    connection.create_function("canopy_area", 2, canopyArea, deterministic=True)
+
+    if connection.in_transaction:
+        connection.commit()
+    connection.execute("BEGIN IMMEDIATE")
+    try:
+        # Another connection may have upgraded the database while waiting for the lock
+        version = schemaVersion(connection)
+        for upgradeVersion, upgrade in _upgrades:
+            if upgradeVersion > version:
+                upgrade(connection)
+        if version < SCHEMA_VERSION:
+            setSchemaVersion(connection)
+            builders = list(dict.fromkeys(_derivedTables.values()))
+        else:
+            builders = _missingIndexes(connection)
+        for builder in builders:
+            builder(connection)
+        connection.execute("COMMIT")
+    except Exception:
+        connection.execute("ROLLBACK")
+        raise
+
+    return True
+
+def upgradeDatabase(filename):
+    """ Upgrade the database file in place. Returns True when it was changed """
+    connection = sqlite3.connect(filename, isolation_level=None)
+    try:
+        return upgradeSchema(connection)
+    finally:
+        connection.close()
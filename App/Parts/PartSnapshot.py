@@ -0,0 +1,169 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Columnar snapshot of the parts database"""
+
+__title__ = "FreeCAD Open Rocket Part Snapshot"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import zipfile
+
+import numpy as np
+
+from App.Parts.Exceptions import NotFoundError
+
+# The snapshot is an uncompressed .npz file, with one array per column named "<table>.<column>".
+# Keys are int64, dimensions are float64 with NaN for missing values, and text columns are
+# int32 codes into the "categories.<name>" array, with -1 for missing values. Rows are in
+# primary key order, and the keys can be passed to getBodyTube() etc.
+
+_snapshotQueries = {
+    "body_tube" : """SELECT body_tube_index, c.component_index, manufacturer, type, inner_diameter_mm, outer_diameter_mm, length_mm, mass_kg, estimated_mass
+                    FROM component c, body_tube b, tube_type t
+                    WHERE b.component_index = c.component_index AND b.tube_type_index = t.tube_type_index
+                    ORDER BY body_tube_index""",
+    "nose" : """SELECT nose_index, c.component_index, manufacturer, shape, style, diameter_mm, length_mm, thickness_mm, shoulder_diameter_mm, shoulder_length_mm,
+                        mass_kg, estimated_mass
+                    FROM component c, nose n WHERE n.component_index = c.component_index
+                    ORDER BY nose_index""",
+    "transition" : """SELECT transition_index, c.component_index, manufacturer, shape, style, fore_outside_diameter_mm, fore_shoulder_diameter_mm, fore_shoulder_length_mm,
+                        aft_outside_diameter_mm, aft_shoulder_diameter_mm, aft_shoulder_length_mm, length_mm, thickness_mm, mass_kg, estimated_mass
+                    FROM component c, transition t WHERE t.component_index = c.component_index
+                    ORDER BY transition_index""",
+    "parachute" : """SELECT parachute_index, c.component_index, manufacturer, sides, lines, diameter_mm, line_length_mm, area_mm2, mass_kg
+                    FROM component c, parachute p WHERE p.component_index = c.component_index
+                    ORDER BY parachute_index""",
+    "streamer" : """SELECT streamer_index, c.component_index, manufacturer, length_mm, width_mm, thickness_mm, area_mm2, mass_kg
+                    FROM component c, streamer s WHERE s.component_index = c.component_index
+                    ORDER BY streamer_index"""
+}
+
+# Text columns, and the categories they're coded against
+_categorical = {
+    "manufacturer" : "manufacturer",
+    "type" : "tube_type",
+    "shape" : "shape",
+    "style" : "style"
+}
+
+# Integer columns other than the keys
+_integer = ["sides", "lines"]
+
+def _columnArray(column, values, categories):
+    if column in _categorical:
+        codes = categories.setdefault(_categorical[column], {})
+        return np.array([-1 if value is None else codes.setdefault(value, len(codes)) for value in values], dtype=np.int32)
+    if column.endswith("_index") or column in _integer:
+        return np.array([-1 if value is None else value for value in values], dtype=np.int64)
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+def writeSnapshot(connection, filename):
+    """ Write the dimensional columns of the part tables to an .npz snapshot """
+    arrays = {}
+    categories = {}
+
+    cursor = connection.cursor()
+    for table, query in _snapshotQueries.items():
+        cursor.execute(query)
+        columns = [description[0] for description in cursor.description]
+        rows = cursor.fetchall()
+        for i, column in enumerate(columns):
+            arrays["%s.%s" % (table, column)] = _columnArray(column, [row[i] for row in rows], categories)
+
+    for name, codes in categories.items():
+        arrays["categories.%s" % name] = np.array(list(codes.keys()), dtype=str)
+
+    # Stored uncompressed so the loader can memory map the arrays
+    with open(filename, "wb") as file:
+        np.savez(file, **arrays)
+
+def _mapMember(file, filename, info):
+    """ Memory map an uncompressed .npy member of the archive """
+    if info.compress_type != zipfile.ZIP_STORED:
+        raise ValueError("Snapshot member %s is compressed" % info.filename)
+
+    # The member data follows its local file header, which may differ from the central directory
+    file.seek(info.header_offset)
+    header = file.read(30)
+    offset = info.header_offset + 30 + int.from_bytes(header[26:28], "little") + int.from_bytes(header[28:30], "little")
+
+    file.seek(offset)
+    version = np.lib.format.read_magic(file)
+    if version == (1, 0):
+        shape, fortran, dtype = np.lib.format.read_array_header_1_0(file)
+    else:
+        shape, fortran, dtype = np.lib.format.read_array_header_2_0(file)
+
+    if dtype.hasobject:
+        raise ValueError("Snapshot member %s contains objects" % info.filename)
+    if np.prod(shape) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode="r", offset=file.tell(), shape=shape, order="F" if fortran else "C")
+
+class PartSnapshot:
+    """
+    Read only view of a snapshot, with the arrays memory mapped from the file.
+
+    For example, body tubes within 0.5mm of a BT-50:
+
+        tubes = snapshot.table("body_tube")
+        found = tubes["body_tube_index"][(np.abs(tubes["outer_diameter_mm"] - 24.8) < 0.5) &
+                                         (tubes["type"] == snapshot.code("tube_type", "Body Tube"))]
+    """
+
+    def __init__(self, filename):
+        self._tables = {}
+        self._categories = {}
+
+        with open(filename, "rb") as file, zipfile.ZipFile(file) as archive:
+            for info in archive.infolist():
+                name = info.filename[:-len(".npy")] if info.filename.endswith(".npy") else info.filename
+                table, column = name.split(".", 1)
+                array = _mapMember(file, filename, info)
+                if table == "categories":
+                    self._categories[column] = [str(value) for value in array]
+                else:
+                    self._tables.setdefault(table, {})[column] = array
+
+    def tables(self):
+        return list(self._tables.keys())
+
+    def table(self, name):
+        """ The columns of the table, as a dict of arrays """
+        if name not in self._tables:
+            raise NotFoundError("Table %s not found" % name)
+        return self._tables[name]
+
+    def categories(self, name):
+        """ The values coded for a text column, indexed by code """
+        if name not in self._categories:
+            raise NotFoundError("Categories %s not found" % name)
+        return self._categories[name]
+
+    def code(self, name, value):
+        """ The code for a text value, or -1 when it isn't in the snapshot so matches nothing """
+        try:
+            return self.categories(name).index(value)
+        except ValueError:
+            return -1
+
+def loadSnapshot(filename):
+    return PartSnapshot(filename)
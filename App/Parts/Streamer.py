@@ -24,10 +24,15 @@ __title__ = "FreeCAD Open Rocket Part Streamer"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
-from App.Parts.Component import Component
+from App.Parts.Component import Component, _searchClause, _pageClause
+from App.Parts.Exceptions import MultipleEntryError, NotFoundError
+from App.Parts.Utilities import _toMillimeters
+from App.Constants import COMPONENT_TYPE_STREAMER
 
 class Streamer(Component):
 
+    _componentType = COMPONENT_TYPE_STREAMER
+
     def __init__(self):
         super().__init__()
 
@@ -46,15 +51,56 @@ class Streamer(Component):
         self.validateNonEmptyString(self._width[1], "Width Units invalid '%s'" % self._width[1])
         self.validateNonEmptyString(self._thickness[1], "Thickness Units invalid '%s'" % self._thickness[1])
 
-    def persist(self, connection):
-        component_id = super().persist(connection)
+    def area(self):
+        length = _toMillimeters(*self._length)
+        width = _toMillimeters(*self._width)
+        if length is None or width is None:
+            return None
+        return length * width
+
+    def persist(self, loader):
+        component_id = super().persist(loader)
+        return loader.insert("streamer", {"component_index" : component_id,
+                                          "length" : self._length[0],
+                                          "length_units" : self._length[1],
+                                          "width" : self._width[0],
+                                          "width_units" : self._width[1],
+                                          "thickness" : self._thickness[0],
+                                          "thickness_units" : self._thickness[1],
+                                          "length_mm" : _toMillimeters(*self._length),
+                                          "width_mm" : _toMillimeters(*self._width),
+                                          "thickness_mm" : _toMillimeters(*self._thickness),
+                                          "area_mm2" : self.area()})
+
+def listStreamers(connection, search=None, order=None, descending=False, limit=-1, offset=0):
+    cursor = connection.cursor()
+
+    parameters = {}
+    where = _searchClause(connection, search, parameters)
+
+    cursor.execute("""SELECT streamer_index, c.component_index, manufacturer, part_number, description, length, length_units, width, width_units,
+                        thickness, thickness_units, length_mm, width_mm, thickness_mm, area_mm2
+                    FROM component c, streamer s WHERE s.component_index = c.component_index""" + where +
+                    _pageClause(order, descending, limit, offset, parameters), parameters)
+
+    rows = cursor.fetchall()
+    return rows
+
+def getStreamer(connection, index):
+    cursor = connection.cursor()
 
-        cursor = connection.cursor()
+    cursor.execute("""SELECT streamer_index, c.manufacturer, part_number, description, material_name, mass, mass_units,
+                        length, length_units, width, width_units, thickness, thickness_units,
+                        mass_kg, length_mm, width_mm, thickness_mm, area_mm2
+                    FROM component c, streamer s, material m WHERE s.component_index = c.component_index AND c.material_index = m.material_index AND s.streamer_index = :index""", {
+                        "index" : index
+                    })
 
-        cursor.execute("INSERT INTO streamer (component_index, length, length_units, width, width_units, thickness, thickness_units) VALUES (?,?,?,?,?,?,?)",
-                            (component_id, self._length[0], self._length[1], self._width[0], self._width[1], self._thickness[0], self._thickness[1]))
-        id = cursor.lastrowid
+    rows = cursor.fetchall()
+    if len(rows) < 1:
+        raise NotFoundError()
 
-        connection.commit()
+    if len(rows) > 1:
+        raise MultipleEntryError()
 
-        return id
+    return rows[0]
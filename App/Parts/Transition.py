@@ -24,13 +24,17 @@ __title__ = "FreeCAD Open Rocket Part Transition"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
-from App.Parts.Component import Component
+from App.Parts.Component import Component, _searchClause, _pageClause
 from App.Constants import TYPE_CONE, TYPE_ELLIPTICAL, TYPE_HAACK, TYPE_OGIVE, TYPE_VON_KARMAN, TYPE_PARABOLA, TYPE_PARABOLIC, TYPE_POWER
-from App.Constants import STYLE_SOLID, STYLE_CAPPED
+from App.Constants import STYLE_SOLID, STYLE_CAPPED, COMPONENT_TYPE_TRANSITION
 from App.Parts.Exceptions import MultipleEntryError, NotFoundError
+from App.Parts.Utilities import _toMillimeters
+from App.Parts.Volume import transitionVolume
 
 class Transition(Component):
 
+    _componentType = COMPONENT_TYPE_TRANSITION
+
     def __init__(self):
         super().__init__()
 
@@ -81,37 +85,58 @@ class Transition(Component):
             return STYLE_SOLID
         return STYLE_CAPPED
 
-    def persist(self, connection):
-        style = self._tranStyle()
-
-        component_id = super().persist(connection)
-
-        cursor = connection.cursor()
+    def estimatedVolume(self):
+        return transitionVolume(self._noseType, self._tranStyle(), _toMillimeters(*self._foreOutsideDiameter), _toMillimeters(*self._aftOutsideDiameter),
+                                _toMillimeters(*self._length), _toMillimeters(*self._thickness),
+                                _toMillimeters(*self._foreShoulderDiameter), _toMillimeters(*self._foreShoulderLength),
+                                _toMillimeters(*self._aftShoulderDiameter), _toMillimeters(*self._aftShoulderLength))
 
-        cursor.execute("""INSERT INTO transition (component_index, shape, style, 
-                fore_outside_diameter, fore_outside_diameter_units, fore_shoulder_diameter, fore_shoulder_diameter_units, fore_shoulder_length, fore_shoulder_length_units,
-                aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units,
-                length, length_units, thickness, thickness_units)
-            VALUES
-                (?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                    (component_id, self._noseType, style,
-                    self._foreOutsideDiameter[0], self._foreOutsideDiameter[1], self._foreShoulderDiameter[0], self._foreShoulderDiameter[1], self._foreShoulderLength[0], self._foreShoulderLength[1],
-                    self._aftOutsideDiameter[0], self._aftOutsideDiameter[1], self._aftShoulderDiameter[0], self._aftShoulderDiameter[1], self._aftShoulderLength[0], self._aftShoulderLength[1],
-                    self._length[0], self._length[1], self._thickness[0], self._thickness[1]))
-        id = cursor.lastrowid
-
-        connection.commit()
-
-        return id
+    def persist(self, loader):
+        style = self._tranStyle()
 
-def listTransitions(connection):
+        component_id = super().persist(loader)
+        return loader.insert("transition", {"component_index" : component_id,
+                                            "shape" : self._noseType,
+                                            "style" : style,
+                                            "fore_outside_diameter" : self._foreOutsideDiameter[0],
+                                            "fore_outside_diameter_units" : self._foreOutsideDiameter[1],
+                                            "fore_shoulder_diameter" : self._foreShoulderDiameter[0],
+                                            "fore_shoulder_diameter_units" : self._foreShoulderDiameter[1],
+                                            "fore_shoulder_length" : self._foreShoulderLength[0],
+                                            "fore_shoulder_length_units" : self._foreShoulderLength[1],
+                                            "aft_outside_diameter" : self._aftOutsideDiameter[0],
+                                            "aft_outside_diameter_units" : self._aftOutsideDiameter[1],
+                                            "aft_shoulder_diameter" : self._aftShoulderDiameter[0],
+                                            "aft_shoulder_diameter_units" : self._aftShoulderDiameter[1],
+                                            "aft_shoulder_length" : self._aftShoulderLength[0],
+                                            "aft_shoulder_length_units" : self._aftShoulderLength[1],
+                                            "length" : self._length[0],
+                                            "length_units" : self._length[1],
+                                            "thickness" : self._thickness[0],
+                                            "thickness_units" : self._thickness[1],
+                                            "fore_outside_diameter_mm" : _toMillimeters(*self._foreOutsideDiameter),
+                                            "fore_shoulder_diameter_mm" : _toMillimeters(*self._foreShoulderDiameter),
+                                            "fore_shoulder_length_mm" : _toMillimeters(*self._foreShoulderLength),
+                                            "aft_outside_diameter_mm" : _toMillimeters(*self._aftOutsideDiameter),
+                                            "aft_shoulder_diameter_mm" : _toMillimeters(*self._aftShoulderDiameter),
+                                            "aft_shoulder_length_mm" : _toMillimeters(*self._aftShoulderLength),
+                                            "length_mm" : _toMillimeters(*self._length),
+                                            "thickness_mm" : _toMillimeters(*self._thickness)})
+
+def listTransitions(connection, search=None, order=None, descending=False, limit=-1, offset=0):
     cursor = connection.cursor()
 
-    cursor.execute("""SELECT transition_index, manufacturer, part_number, description,
+    parameters = {}
+    where = _searchClause(connection, search, parameters)
+
+    cursor.execute("""SELECT transition_index, c.component_index, manufacturer, part_number, description,
                         shape, length, length_units, 
                         fore_outside_diameter, fore_outside_diameter_units, fore_shoulder_diameter, fore_shoulder_diameter_units, fore_shoulder_length, fore_shoulder_length_units,
-                        aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units
-                    FROM component c, transition t WHERE t.component_index = c.component_index""")
+                        aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units,
+                        length_mm, fore_outside_diameter_mm, fore_shoulder_diameter_mm, fore_shoulder_length_mm,
+                        aft_outside_diameter_mm, aft_shoulder_diameter_mm, aft_shoulder_length_mm, estimated_mass
+                    FROM component c, transition t WHERE t.component_index = c.component_index""" + where +
+                    _pageClause(order, descending, limit, offset, parameters), parameters)
 
     rows = cursor.fetchall()
     return rows
@@ -122,7 +147,9 @@ def getTransition(connection, index):
     cursor.execute("""SELECT transition_index, c.manufacturer, part_number, description, material_name, mass, mass_units,
                         shape, style, length, length_units, thickness, thickness_units,
                         fore_outside_diameter, fore_outside_diameter_units, fore_shoulder_diameter, fore_shoulder_diameter_units, fore_shoulder_length, fore_shoulder_length_units,
-                        aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units
+                        aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units,
+                        mass_kg, estimated_mass, estimated_volume, length_mm, thickness_mm, fore_outside_diameter_mm, fore_shoulder_diameter_mm, fore_shoulder_length_mm,
+                        aft_outside_diameter_mm, aft_shoulder_diameter_mm, aft_shoulder_length_mm
                     FROM component c, transition t, material m WHERE t.component_index = c.component_index AND c.material_index = m.material_index AND t.transition_index = :index""", {
                         "index" : index
                     })
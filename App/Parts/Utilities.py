@@ -59,3 +59,58 @@ def _toBoolean(value):
     if str(value).strip().lower() == "true":
         return True
     return False
+
+# Conversion factors to SI base units
+_lengthUnits = {
+    "mm" : 0.001,
+    "cm" : 0.01,
+    "m" : 1.0,
+    "in" : 0.0254,
+    "ft" : 0.3048
+}
+
+_massUnits = {
+    "g" : 0.001,
+    "kg" : 1.0,
+    "oz" : 0.028349523125,
+    "lb" : 0.45359237
+}
+
+def _toMillimeters(value, units):
+    """ Length in mm, or None when the units are unknown """
+    if value == 0.0:
+        return 0.0
+    factor = _lengthUnits.get(str(units).strip().lower())
+    if factor is None:
+        return None
+    return value * factor * 1000.0
+
+def _toKilograms(value, units):
+    """ Mass in kg, or None when the units are unknown """
+    if value == 0.0:
+        return 0.0
+    factor = _massUnits.get(str(units).strip().lower())
+    if factor is None:
+        return None
+    return value * factor
+
+def _toSIDensity(value, units):
+    """
+    Density in kg/m3, kg/m2 or kg/m for units such as lb/ft3, oz/in2 or g/cm.
+    Returns None when the units are unknown
+    """
+    if value == 0.0:
+        return 0.0
+    try:
+        mass, length = str(units).strip().lower().split('/')
+    except ValueError:
+        return None
+
+    dimension = 1
+    if length[-1:] in ['2', '3']:
+        dimension = int(length[-1])
+        length = length[:-1]
+
+    if mass not in _massUnits or length not in _lengthUnits:
+        return None
+    return value * _massUnits[mass] / (_lengthUnits[length] ** dimension)
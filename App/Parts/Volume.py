@@ -0,0 +1,145 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Analytic volume estimates for catalog components"""
+
+__title__ = "FreeCAD Open Rocket Part Volume Estimates"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import math
+
+from App.Constants import TYPE_ELLIPTICAL, TYPE_HAACK, TYPE_OGIVE, TYPE_VON_KARMAN, TYPE_PARABOLA, TYPE_PARABOLIC, TYPE_POWER
+from App.Constants import STYLE_SOLID
+
+# Dimensions are in mm and volumes in mm^3. A dimension of None means the units were
+# not recognized, and no estimate is made.
+
+# Catalog entries don't carry a shape parameter, so the defaults used by Open Rocket apply
+_HAACK_COEFFICIENT = 0.0
+_POWER_COEFFICIENT = 0.5
+_PARABOLIC_COEFFICIENT = 1.0
+
+# Simpson's rule intervals used to integrate the nose profiles
+_INTERVALS = 64
+
+def _profileRadius(shape, x, length, radius):
+    """ Radius of the nose profile at distance x from the tip """
+    if x <= 0.0:
+        return 0.0
+    if x >= length:
+        return radius
+
+    ratio = x / length
+    if shape == TYPE_ELLIPTICAL.lower():
+        return radius * math.sqrt(1.0 - (1.0 - ratio) ** 2)
+    if shape == TYPE_OGIVE.lower():
+        # Tangent ogive
+        rho = (radius * radius + length * length) / (2.0 * radius)
+        return math.sqrt(max(rho * rho - (length - x) ** 2, 0.0)) + radius - rho
+    if shape in [TYPE_HAACK.lower(), TYPE_VON_KARMAN.lower()]:
+        theta = math.acos(1.0 - 2.0 * ratio)
+        return radius * math.sqrt(max(theta - math.sin(2.0 * theta) / 2.0 + _HAACK_COEFFICIENT * math.pow(math.sin(theta), 3), 0.0)) / math.sqrt(math.pi)
+    if shape == TYPE_PARABOLIC.lower():
+        return radius * ((2.0 * ratio) - (_PARABOLIC_COEFFICIENT * ratio * ratio)) / (2.0 - _PARABOLIC_COEFFICIENT)
+    if shape in [TYPE_PARABOLA.lower(), TYPE_POWER.lower()]:
+        return radius * math.pow(ratio, _POWER_COEFFICIENT)
+
+    # Cone, and the fallback for anything unrecognized
+    return radius * ratio
+
+def _revolvedVolume(function, length):
+    """ Volume of the solid of revolution of function(x) for x in [0, length], by Simpson's rule """
+    h = length / _INTERVALS
+    total = 0.0
+    for i in range(_INTERVALS + 1):
+        r = function(i * h)
+        if i == 0 or i == _INTERVALS:
+            weight = 1.0
+        elif i % 2:
+            weight = 4.0
+        else:
+            weight = 2.0
+        total += weight * r * r
+
+    return math.pi * total * h / 3.0
+
+def _disc(diameter, length):
+    return math.pi * diameter * diameter * length / 4.0
+
+def _shoulderVolume(diameter, length, thickness, solid):
+    """ The shoulder is a tube of the wall thickness, or a solid cylinder """
+    if not diameter or not length:
+        return 0.0
+    if solid:
+        return _disc(diameter, length)
+    return tubeVolume(diameter, max(diameter - 2.0 * thickness, 0.0), length)
+
+def tubeVolume(outerDiameter, innerDiameter, length):
+    """ Body tubes, couplers, launch lugs, engine blocks, centering rings and bulkheads """
+    if outerDiameter is None or innerDiameter is None or length is None:
+        return None
+    return math.pi * max(outerDiameter * outerDiameter - innerDiameter * innerDiameter, 0.0) * length / 4.0
+
+def noseVolume(shape, style, diameter, length, thickness, shoulderDiameter, shoulderLength):
+    if diameter is None or length is None or shoulderDiameter is None or shoulderLength is None:
+        return None
+
+    radius = diameter / 2.0
+    solid = (style == STYLE_SOLID or not thickness)
+
+    volume = _revolvedVolume(lambda x: _profileRadius(shape, x, length, radius), length)
+    if not solid:
+        # Hollow shell, with the base or shoulder capped
+        volume -= _revolvedVolume(lambda x: max(_profileRadius(shape, x, length, radius) - thickness, 0.0), length)
+        if shoulderLength > 0.0:
+            volume += _disc(max(shoulderDiameter - 2.0 * thickness, 0.0), thickness)
+        else:
+            volume += _disc(max(diameter - 2.0 * thickness, 0.0), thickness)
+
+    return volume + _shoulderVolume(shoulderDiameter, shoulderLength, thickness, solid)
+
+def transitionVolume(shape, style, foreDiameter, aftDiameter, length, thickness,
+                     foreShoulderDiameter, foreShoulderLength, aftShoulderDiameter, aftShoulderLength):
+    if None in [foreDiameter, aftDiameter, length, foreShoulderDiameter, foreShoulderLength, aftShoulderDiameter, aftShoulderLength]:
+        return None
+
+    # The profile runs from the smaller radius to the larger one
+    minimum = min(foreDiameter, aftDiameter) / 2.0
+    delta = abs(aftDiameter - foreDiameter) / 2.0
+    solid = (style == STYLE_SOLID or not thickness)
+
+    def profile(x):
+        if delta <= 0.0:
+            return minimum
+        return minimum + _profileRadius(shape, x, length, delta)
+
+    volume = _revolvedVolume(profile, length)
+    if not solid:
+        volume -= _revolvedVolume(lambda x: max(profile(x) - thickness, 0.0), length)
+
+    return volume + _shoulderVolume(foreShoulderDiameter, foreShoulderLength, thickness, solid) + \
+        _shoulderVolume(aftShoulderDiameter, aftShoulderLength, thickness, solid)
+
+def estimateMass(volume, density):
+    """ Mass in kg of a volume in mm^3 for a bulk density in kg/m^3, or None when either is unknown """
+    if volume is None or not density:
+        return None
+    return volume * 1e-9 * density
@@ -0,0 +1,93 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Profile radius functions evaluated over arrays of points"""
+
+__title__ = "FreeCAD Rocket Profile Kernels"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import numpy as np
+
+# Each kernel evaluates the radius of a profile family at every x in an array, with the same
+# arguments as the matching scalar function in the shape handler. Rounding can take the
+# argument of a square root slightly negative at the tip, so it is clamped to zero.
+
+def sampleX(length, resolution, min = 0.0):
+    """ The resolution sample points from the base of the profile, [0, length - min) """
+    return np.arange(resolution, dtype=np.float64) * ((length - min) / float(resolution))
+
+def ogiveY(x, length, radius, rho):
+    """ Tangent ogive """
+    return np.sqrt(np.maximum(rho * rho - np.square(length - x), 0.0)) + radius - rho
+
+def secantOgiveY(x, length, rho, alpha):
+    return np.sqrt(np.maximum(rho * rho - np.square(rho * np.cos(alpha) - (length - x)), 0.0)) - (rho * np.sin(alpha))
+
+def haackY(x, length, radius, coefficient):
+    """ Haack series, with coefficient 0 for Von Karman """
+    theta = np.arccos(np.clip(1.0 - 2.0 * x / length, -1.0, 1.0))
+    return radius * np.sqrt(np.maximum(theta - np.sin(2.0 * theta) / 2.0 + coefficient * np.power(np.sin(theta), 3), 0.0)) / np.sqrt(np.pi)
+
+def parabolicY(x, length, radius, k):
+    ratio = x / length
+    return radius * ((2.0 * ratio) - (k * ratio * ratio)) / (2.0 - k)
+
+def powerY(x, length, radius, k):
+    return radius * np.power(x / length, k)
+
+# Maximum distance in mm between a fitted profile and the true one at the sample midpoints
+PROFILE_TOLERANCE = 0.01
+
+# Intervals the adaptive sampling starts from, before refining
+ADAPTIVE_INTERVALS = 8
+
+def refineX(x, error, tolerance, maxPoints):
+    """
+    Split the intervals of x whose error exceeds the tolerance at their midpoints, worst first,
+    without exceeding maxPoints. Returns None when nothing needs splitting or there's no room.
+    """
+    over = np.nonzero(error > tolerance)[0]
+    room = maxPoints - len(x)
+    if len(over) == 0 or room <= 0:
+        return None
+    if len(over) > room:
+        over = over[np.argsort(error[over])[::-1][:room]]
+
+    mid = (x[over] + x[over + 1]) / 2.0
+    return np.sort(np.concatenate((x, mid)))
+
+def adaptiveX(function, span, tolerance, maxPoints):
+    """
+    Sample positions over [0, span] for the vectorized profile function, placed by chord error.
+
+    An interval is split while its chord strays from the profile by more than the tolerance at its
+    midpoint. The sag of a chord grows with curvature, so points gather near the tip and thin out
+    where the profile is nearly straight.
+    """
+    x = np.linspace(0.0, span, max(min(ADAPTIVE_INTERVALS, maxPoints - 1), 1) + 1)
+    while True:
+        y = function(x)
+        mid = (x[:-1] + x[1:]) / 2.0
+        error = np.abs(function(mid) - (y[:-1] + y[1:]) / 2.0)
+        refined = refineX(x, error, tolerance, maxPoints)
+        if refined is None:
+            return x
+        x = refined
@@ -0,0 +1,82 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Splines fitted to nose cone and transition profiles"""
+
+__title__ = "FreeCAD Rocket Profile Splines"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import Part
+
+import numpy as np
+
+from App.ProfileKernels import PROFILE_TOLERANCE, adaptiveX, refineX
+
+# Rounds of refitting when the spline strays from the profile between samples
+_FIT_ITERATIONS = 4
+
+class ProfileCurve:
+    """
+    A profile radius y = function(u) for u in [0, span], drawn through the points toPoint(u, y).
+
+    The function takes and returns arrays. When first or last is given, the radius is pinned to
+    that value at the end, with the difference blended linearly along the profile, so the curve
+    meets the lines drawn from it.
+    """
+
+    def __init__(self, function, span, toPoint, maxPoints, first = None, last = None):
+        self._function = function
+        self._span = float(span)
+        self._toPoint = toPoint
+        self._maxPoints = max(int(maxPoints), 2)
+        self._first = first
+        self._last = last
+
+        if self._span <= 0.0:
+            raise ZeroDivisionError("Profile length must be greater than zero")
+
+        ends = function(np.array([0.0, self._span]))
+        self._firstOffset = 0.0 if first is None else first - ends[0]
+        self._lastOffset = 0.0 if last is None else last - ends[1]
+
+    def radius(self, u):
+        weight = u / self._span
+        return self._function(u) + (1.0 - weight) * self._firstOffset + weight * self._lastOffset
+
+    def _points(self, u, y):
+        return [self._toPoint(pu, py) for pu, py in zip(u.tolist(), y.tolist())]
+
+    def toSpline(self, tolerance = PROFILE_TOLERANCE):
+        """ Interpolate the profile, adding samples until it is within the tolerance or has maxPoints """
+        u = adaptiveX(self.radius, self._span, tolerance, self._maxPoints)
+        for i in range(_FIT_ITERATIONS):
+            spline = Part.BSplineCurve()
+            spline.interpolate(Points=self._points(u, self.radius(u)), Parameters=u.tolist())
+
+            mid = (u[:-1] + u[1:]) / 2.0
+            expected = self._points(mid, self.radius(mid))
+            error = np.array([spline.value(m).distanceToPoint(point) for m, point in zip(mid.tolist(), expected)])
+            refined = refineX(u, error, tolerance, self._maxPoints)
+            if refined is None:
+                break
+            u = refined
+
+        return spline
@@ -36,6 +36,10 @@ from App.Utilities import _err
 from DraftTools import translate
 
 class RailButtonShapeHandler():
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["RailButtonType", "OuterDiameter", "InnerDiameter", "TopThickness", "BaseThickness", "Thickness",
+                       "Length", "Fastener", "ShankDiameter", "HeadDiameter", "CountersinkAngle", "FilletedTop", "FilletRadius"]
+
     def __init__(self, obj):
 
         # This gets changed when redrawn so it's very important to save a copy
@@ -36,6 +36,11 @@ from DraftTools import translate
 TOLERANCE_OFFSET = 0.5     # Distance to offset a vertex
 
 class RailGuideShapeHandler():
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["RailGuideBaseType", "TopWidth", "MiddleWidth", "BaseWidth", "TopThickness", "BaseThickness", "Thickness",
+                       "Length", "VAngle", "ForwardSweep", "ForwardSweepAngle", "AftSweep", "AftSweepAngle", "Notch",
+                       "NotchWidth", "NotchDepth", "AutoDiameter", "Diameter"]
+
     def __init__(self, obj):
 
         # This gets changed when redrawn so it's very important to save a copy
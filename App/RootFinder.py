@@ -0,0 +1,104 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Root finding for profile intercepts"""
+
+__title__ = "FreeCAD Rocket Root Finder"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import math
+
+# Default tolerance in mm for the position of a root
+ROOT_TOLERANCE = 1e-6
+
+_MAX_ITERATIONS = 100
+_EPSILON = 2.220446049250313e-16
+
+def findRoot(function, a, b, tolerance = ROOT_TOLERANCE):
+    """
+    Find x in [a, b] where function(x) == 0 using Brent's method.
+
+    The function must change sign over the interval. Brent's method falls back to bisection
+    whenever interpolation isn't converging, so it needs no derivative. This matters for nose
+    profiles, where the slope is infinite at the tip of Haack and power series noses.
+    """
+    fa = function(a)
+    fb = function(b)
+    if fa == 0.0:
+        return a
+    if fb == 0.0:
+        return b
+    if (fa > 0.0) == (fb > 0.0):
+        raise ValueError("Root is not bracketed by [%f, %f]" % (a, b))
+
+    c = a
+    fc = fa
+    d = e = b - a
+    for i in range(_MAX_ITERATIONS):
+        if (fb > 0.0) == (fc > 0.0):
+            # Keep the root between b and c
+            c = a
+            fc = fa
+            d = e = b - a
+        if math.fabs(fc) < math.fabs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2.0 * _EPSILON * math.fabs(b) + 0.5 * tolerance
+        m = 0.5 * (c - b)
+        if math.fabs(m) <= tol or fb == 0.0:
+            return b
+
+        if math.fabs(e) >= tol and math.fabs(fa) > math.fabs(fb):
+            # Inverse quadratic interpolation, or the secant method when only two points differ
+            s = fb / fa
+            if a == c:
+                p = 2.0 * m * s
+                q = 1.0 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2.0 * m * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0.0:
+                q = -q
+            else:
+                p = -p
+
+            if 2.0 * p < min(3.0 * m * q - math.fabs(tol * q), math.fabs(e * q)):
+                e = d
+                d = p / q
+            else:
+                d = m
+                e = m
+        else:
+            d = m
+            e = m
+
+        a = b
+        fa = fb
+        if math.fabs(d) > tol:
+            b += d
+        else:
+            b += math.copysign(tol, m)
+        fb = function(b)
+
+    return b
@@ -25,6 +25,7 @@ __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 
 from App.BodyTubeShapeHandler import BodyTubeShapeHandler
 
@@ -49,4 +50,4 @@ class ShapeBodyTube(ShapeComponent):
     def execute(self, obj):
         shape = BodyTubeShapeHandler(obj)
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
@@ -25,6 +25,7 @@ __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 
 from App.BulkheadShapeHandler import BulkheadShapeHandler
 
@@ -64,4 +65,4 @@ class ShapeBulkhead(ShapeComponent):
     def execute(self, obj):
         shape = BulkheadShapeHandler(obj)
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
@@ -0,0 +1,218 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Cache of the shapes drawn by the shape handlers"""
+
+__title__ = "FreeCAD Rocket Shape Cache"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import collections
+import hashlib
+import inspect
+import os
+
+import FreeCAD
+import Part
+
+from App.Utilities import _err
+
+# Shapes are keyed by a hash of the handler class and the shapeProperties the handlers declare,
+# so undoing a change or toggling a property back finds the shape drawn before. Identical
+# components in a rocket share a single cached shape.
+
+# Default number of shapes kept in memory, and on disk when enabled
+MEMORY_ENTRIES = 128
+DISK_ENTRIES = 1024
+
+_PARAMETERS = "User parameter:BaseApp/Preferences/Mod/Rocket"
+
+class _Uncacheable(Exception):
+    pass
+
+def _propertyValue(value):
+    """ A hashable representation of a property value """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, FreeCAD.Units.Quantity):
+        return value.Value
+    if isinstance(value, FreeCAD.Vector):
+        return (value.x, value.y, value.z)
+    if isinstance(value, (list, tuple)):
+        return tuple([_propertyValue(item) for item in value])
+    if hasattr(value, "Shape"):
+        # Linked objects such as fin sketches are keyed by their geometry
+        return hashlib.sha1(value.Shape.exportBrepToString().encode()).hexdigest()
+    raise _Uncacheable()
+
+_sourceVersions = {}
+
+def _sourceVersion(handlerClass):
+    """ Modification times of the handler sources, so the disk cache doesn't outlive code changes """
+    if handlerClass not in _sourceVersions:
+        times = []
+        for cls in handlerClass.__mro__:
+            try:
+                times.append(os.path.getmtime(inspect.getfile(cls)))
+            except (TypeError, OSError):
+                pass
+        _sourceVersions[handlerClass] = tuple(times)
+    return _sourceVersions[handlerClass]
+
+_shapeProperties = {}
+
+def shapeProperties(handlerClass):
+    """ The properties declared by the handler and its base classes """
+    if handlerClass not in _shapeProperties:
+        names = set()
+        for cls in handlerClass.__mro__:
+            names.update(cls.__dict__.get("shapeProperties", []))
+        _shapeProperties[handlerClass] = sorted(names)
+    return _shapeProperties[handlerClass]
+
+def shapeKey(handler, obj):
+    """ The cache key for the shape the handler draws for obj, or None when it can't be cached """
+    handlerClass = type(handler)
+    names = shapeProperties(handlerClass)
+    if len(names) < 1:
+        # Without declared properties any change could alter the shape
+        return None
+
+    values = []
+    try:
+        for name in names:
+            # Documents from older versions may lack recently added properties
+            values.append((name, _propertyValue(getattr(obj, name, None))))
+    except _Uncacheable:
+        return None
+
+    description = repr((handlerClass.__module__, handlerClass.__qualname__, _sourceVersion(handlerClass), values))
+    return hashlib.sha1(description.encode()).hexdigest()
+
+class ShapeCache:
+    """ Least recently used shapes in memory, optionally backed by BREP files on disk """
+
+    def __init__(self, memoryEntries=MEMORY_ENTRIES, folder=None, diskEntries=DISK_ENTRIES):
+        self._shapes = collections.OrderedDict()
+        self._memoryEntries = memoryEntries
+        self._folder = folder
+        self._diskEntries = diskEntries
+        self.hits = 0
+        self.misses = 0
+
+    def _filename(self, key):
+        return os.path.join(self._folder, key + ".brep")
+
+    def _remember(self, key, shape):
+        self._shapes[key] = shape
+        self._shapes.move_to_end(key)
+        while len(self._shapes) > self._memoryEntries:
+            self._shapes.popitem(last=False)
+
+    def get(self, key):
+        if key in self._shapes:
+            self._shapes.move_to_end(key)
+            self.hits += 1
+            return self._shapes[key]
+
+        if self._folder is not None:
+            filename = self._filename(key)
+            if os.path.exists(filename):
+                try:
+                    shape = Part.Shape()
+                    shape.importBrep(filename)
+                    os.utime(filename) # Mark as recently used
+                    self._remember(key, shape)
+                    self.hits += 1
+                    return shape
+                except (OSError, Part.OCCError):
+                    # Corrupt or removed while reading, draw it again
+                    pass
+
+        self.misses += 1
+        return None
+
+    def put(self, key, shape):
+        self._remember(key, shape)
+
+        if self._folder is not None:
+            try:
+                os.makedirs(self._folder, exist_ok=True)
+                filename = self._filename(key)
+                temporary = "%s.%d.tmp" % (filename, os.getpid())
+                shape.exportBrep(temporary)
+                os.replace(temporary, filename)
+                self._trimDisk()
+            except (OSError, Part.OCCError) as ex:
+                _err("Unable to write the shape cache: %s" % str(ex))
+
+    def _trimDisk(self):
+        entries = [entry for entry in os.scandir(self._folder) if entry.name.endswith(".brep")]
+        if len(entries) > self._diskEntries:
+            entries.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in entries[:len(entries) - self._diskEntries]:
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def clear(self):
+        self._shapes.clear()
+        if self._folder is not None and os.path.isdir(self._folder):
+            for entry in os.scandir(self._folder):
+                if entry.name.endswith(".brep"):
+                    os.remove(entry.path)
+
+_shapeCache = None
+
+def getShapeCache():
+    global _shapeCache
+
+    if _shapeCache is None:
+        param = FreeCAD.ParamGet(_PARAMETERS)
+        folder = None
+        if param.GetBool("ShapeCacheOnDisk", False):
+            folder = os.path.join(FreeCAD.getUserAppDataDir(), "RocketShapeCache")
+        _shapeCache = ShapeCache(param.GetInt("ShapeCacheEntries", MEMORY_ENTRIES), folder, param.GetInt("ShapeCacheDiskEntries", DISK_ENTRIES))
+    return _shapeCache
+
+def drawShape(handler, obj):
+    """ Set the shape of obj from the cache, or have the handler draw it and cache the result """
+    key = shapeKey(handler, obj)
+    if key is None:
+        handler.draw()
+        return
+
+    cache = getShapeCache()
+    shape = cache.get(key)
+    if shape is not None:
+        # Setting the shape also sets the placement, so restore it
+        placement = obj.Placement
+        obj.Shape = shape
+        obj.Placement = placement
+        return
+
+    previous = obj.Shape
+    handler.draw()
+
+    # The handlers report invalid parameters and leave the previous shape in place
+    shape = obj.Shape
+    if not shape.isNull() and (previous.isNull() or not shape.isSame(previous)):
+        cache.put(key, shape)
@@ -25,6 +25,7 @@ __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
 from App.ShapeBulkhead import ShapeBulkhead
+from App.ShapeCache import drawShape
 
 from App.CenteringRingShapeHandler import CenteringRingShapeHandler
 
@@ -58,4 +59,4 @@ class ShapeCenteringRing(ShapeBulkhead):
     def execute(self, obj):
         shape = CenteringRingShapeHandler(obj)
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
@@ -27,6 +27,7 @@ __url__ = "https://www.davesrocketshop.com"
 import FreeCAD
     
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 
 from App.Constants import FIN_TYPE_TRAPEZOID, FIN_TYPE_ELLIPSE, FIN_TYPE_SKETCH
 from App.Constants import FIN_CROSS_SAME, FIN_CROSS_SQUARE, FIN_CROSS_ROUND, FIN_CROSS_AIRFOIL, FIN_CROSS_WEDGE, \
@@ -160,4 +161,4 @@ class ShapeFin(ShapeComponent):
             shape = FinSketchShapeHandler(obj)
 
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
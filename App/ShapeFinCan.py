@@ -27,6 +27,7 @@ __url__ = "https://www.davesrocketshop.com"
 import FreeCAD
 
 from App.ShapeFin import ShapeFin
+from App.ShapeCache import drawShape
 from App.Constants import FIN_TYPE_TRAPEZOID, FIN_TYPE_ELLIPSE, FIN_TYPE_SKETCH
 from App.Constants import FINCAN_EDGE_SQUARE, FINCAN_EDGE_ROUND, FINCAN_EDGE_TAPER
 from App.Constants import FINCAN_PRESET_CUSTOM, FINCAN_PRESET_1_8, FINCAN_PRESET_3_16, FINCAN_PRESET_1_4
@@ -152,4 +153,4 @@ class ShapeFinCan(ShapeFin):
             shape = FinCanSketchShapeHandler(obj)
 
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
@@ -25,6 +25,7 @@ __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 
 from App.NoseConeShapeHandler import NoseConeShapeHandler
 from App.NoseBluntedConeShapeHandler import NoseBluntedConeShapeHandler
@@ -116,7 +117,7 @@ class ShapeNoseCone(ShapeComponent):
         if not hasattr(obj, 'OgiveDiameter'):
             obj.addProperty('App::PropertyLength', 'OgiveDiameter', 'NoseCone', translate('App::Property', 'The radius of the circle used to define a secant ogive')).OgiveDiameter = 120.0
         if not hasattr(obj, 'Resolution'):
-            obj.addProperty('App::PropertyInteger', 'Resolution', 'NoseCone', translate('App::Property', 'Resolution')).Resolution = 100
+            obj.addProperty('App::PropertyInteger', 'Resolution', 'NoseCone', translate('App::Property', 'Maximum number of points used to fit the profile')).Resolution = 100
 
         if not hasattr(obj, 'NoseType'):
             obj.addProperty('App::PropertyEnumeration', 'NoseType', 'NoseCone', translate('App::Property', 'Nose cone type'))
@@ -188,4 +189,4 @@ class ShapeNoseCone(ShapeComponent):
             shape = NosePowerShapeHandler(obj)
 
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
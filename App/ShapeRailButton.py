@@ -25,6 +25,7 @@ __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 from App.Constants import FEATURE_RAIL_BUTTON
 from App.Constants import RAIL_BUTTON_ROUND, RAIL_BUTTON_AIRFOIL
 from App.Constants import CONTERSINK_ANGLE_60, CONTERSINK_ANGLE_82, CONTERSINK_ANGLE_90, CONTERSINK_ANGLE_100, \
@@ -100,7 +101,7 @@ class ShapeRailButton(ShapeComponent):
     def execute(self, obj):
         shape = RailButtonShapeHandler(obj)
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
 
     def eligibleChild(self, childType):
         return False
@@ -25,6 +25,7 @@ __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 from App.Constants import FEATURE_RAIL_GUIDE
 from App.Constants import RAIL_GUIDE_BASE_FLAT, RAIL_GUIDE_BASE_CONFORMAL, RAIL_GUIDE_BASE_V
 
@@ -87,4 +88,4 @@ class ShapeRailGuide(ShapeComponent):
     def execute(self, obj):
         shape = RailGuideShapeHandler(obj)
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
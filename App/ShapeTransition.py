@@ -25,6 +25,7 @@ __url__ = "https://www.davesrocketshop.com"
 import FreeCAD
     
 from App.ShapeComponent import ShapeComponent
+from App.ShapeCache import drawShape
 
 from App.TransitionConeShapeHandler import TransitionConeShapeHandler
 from App.TransitionEllipseShapeHandler import TransitionEllipseShapeHandler
@@ -101,7 +102,7 @@ class ShapeTransition(ShapeComponent):
         if not hasattr(obj, 'Coefficient'):
             obj.addProperty('App::PropertyFloat', 'Coefficient', 'Transition', translate('App::Property', 'Coefficient')).Coefficient = 0.0
         if not hasattr(obj, 'Resolution'):
-            obj.addProperty('App::PropertyInteger', 'Resolution', 'Transition', translate('App::Property', 'Resolution')).Resolution = 100
+            obj.addProperty('App::PropertyInteger', 'Resolution', 'Transition', translate('App::Property', 'Maximum number of points used to fit the profile')).Resolution = 100
         if not hasattr(obj, 'ForeCapBarWidth'):
             obj.addProperty('App::PropertyLength', 'ForeCapBarWidth', 'Transition', translate('App::Property', 'Width of the foreward cap bar')).ForeCapBarWidth = 3.0
         if not hasattr(obj, 'AftCapBarWidth'):
@@ -175,4 +176,4 @@ class ShapeTransition(ShapeComponent):
             shape = TransitionPowerShapeHandler(obj)
 
         if shape is not None:
-            shape.draw()
+            drawShape(shape, obj)
@@ -30,18 +30,27 @@ __url__ = "https://www.davesrocketshop.com"
     
 import FreeCAD
 import Part
-import math
+
+import numpy as np
 
 from DraftTools import translate
 
 from App.Constants import STYLE_CAPPED, STYLE_HOLLOW, STYLE_SOLID, STYLE_SOLID_CORE
 from App.Constants import STYLE_CAP_BAR, STYLE_CAP_CROSS
 
+from App.ProfileSpline import ProfileCurve
+from App.RootFinder import findRoot
 from App.Utilities import _err
 
 CLIP_PRECISION = 0.00001
 
 class TransitionShapeHandler():
+    # Properties the shape is drawn from, which key the shape cache
+    shapeProperties = ["TransitionType", "TransitionStyle", "Length", "ForeDiameter", "AftDiameter", "CoreDiameter", "Thickness",
+                       "Clipped", "Coefficient", "Resolution", "ForeShoulder", "ForeShoulderDiameter", "ForeShoulderLength",
+                       "ForeShoulderThickness", "AftShoulder", "AftShoulderDiameter", "AftShoulderLength",
+                       "AftShoulderThickness", "ForeCapStyle", "ForeCapBarWidth", "AftCapStyle", "AftCapBarWidth"]
+
     def __init__(self, obj):
 
         # This gets changed when redrawn so it's very important to save a copy
@@ -85,11 +94,8 @@ class TransitionShapeHandler():
 
         self._obj = obj
 
-    def makeSpline(self, points):
-        
-        spline = Part.BSplineCurve()
-        spline.buildFromPoles(points)
-        return spline
+    def makeSpline(self, profile):
+        return profile.toSpline()
 
     def isClippable(self):
         return True # Override if the shape is not clippable
@@ -159,7 +165,7 @@ class TransitionShapeHandler():
     #
     # Numerically solve clipLength from the equation
     #     r1 == self._getRadius(clipLength,r2,clipLength+length)
-    # using a binary search.  It assumes getOuterRadius() to be monotonically increasing.
+    # using Brent's method.  It assumes getOuterRadius() to be monotonically increasing.
     #
     def _calculateClip(self, r1, r2):
 
@@ -194,19 +200,9 @@ class TransitionShapeHandler():
                 break
             rmax = self._radiusAt(0.0, r2, max, self._length)
 
-        # Do a binary search to see where we fit within tolerance
-        while True:
-            self._clipLength = (min + max) / 2.0
-            val =self. _radiusAt(0.0, r2, self._clipLength, self._length)
-            err = (val - r1)
-            if math.fabs(err) < CLIP_PRECISION:
-                if self._debugShape:
-                   print("_calculateClip: r1 = %f, r2 = %f, clip length = %f, err = %f" % (r1, r2, self._clipLength, err))
-                return
-            if err > 0:
-                max = self._clipLength
-            else:
-                min = self._clipLength
+        self._clipLength = findRoot(lambda length: self._radiusAt(0.0, r2, length, self._length) - r1, min, max, CLIP_PRECISION)
+        if self._debugShape:
+            print("_calculateClip: r1 = %f, r2 = %f, clip length = %f" % (r1, r2, self._clipLength))
 
     def _foreBarCap(self):
         return self._foreCrossCap(barOnly = True)
@@ -340,49 +336,34 @@ class TransitionShapeHandler():
         self._obj.Shape = shape
         self._obj.Placement = self._placement
 
+    def _radii(self, r1, r2, length, positions):
+        return np.array([self._radiusAt(r1, r2, length, pos) for pos in positions.tolist()])
+
     def _generateCurve(self, r1, r2, length, min = 0, max = 0.0):
         if self._debugShape:
             print("r1 = %f, r2 = %f, length = %f, min = %f, max = %f" % (r1, r2, length, min, max))
         if max <= 0:
             max = self._length
 
+        # The profile runs from max to min, pinned to the radii at either end
         if self._clipped:
-            if r2 > r1:
-                points = [FreeCAD.Vector(max, r1)] # 0
-            else:
-                points = [FreeCAD.Vector(min, r2)] # 1
-        else:
-            points = [FreeCAD.Vector(max, r1)] # 2,3
-
-        for i in range(1, self._resolution):
-            
-            if self._clipped:
-                if r2 > r1: # 0
-                    x = max - (float(i) * ((max - min) / float(self._resolution)))
-                    y = self._radiusAt(0.0, r2, length, x)
-                else: # 1
-                    x = max - (float(i) * ((max - min) / float(self._resolution)))
-                    y = self._radiusAt(0.0, r1, length, x)
-                    x = max + min - x
-            else:
-                # 2,3
-                x = max - (float(i) * ((max - min) / float(self._resolution)))
-                y = self._radiusAt(r1, r2, length, x)
-            points.append(FreeCAD.Vector(x, y))
-
-        if self._clipped:
-            if r2 > r1:
-                points.append(FreeCAD.Vector(min, r2)) # 0
-            else:
-                points.append(FreeCAD.Vector(max, r1)) # 1
+            if r2 > r1: # 0
+                profile = ProfileCurve(lambda u: self._radii(0.0, r2, length, max - u), max - min,
+                                       lambda u, y: FreeCAD.Vector(max - u, y), self._resolution, r1, r2)
+            else: # 1
+                profile = ProfileCurve(lambda u: self._radii(0.0, r1, length, max - u), max - min,
+                                       lambda u, y: FreeCAD.Vector(min + u, y), self._resolution, r2, r1)
         else:
-            points.append(FreeCAD.Vector(min, r2)) # 2, 3
+            # 2,3
+            profile = ProfileCurve(lambda u: self._radii(r1, r2, length, max - u), max - min,
+                                   lambda u, y: FreeCAD.Vector(max - u, y), self._resolution, r1, r2)
 
+        spline = self.makeSpline(profile)
         if self._debugShape:
-            for point in points:
+            for point in spline.getPoles():
                 print("x,y (%f,%f)" % (point.x, point.y))
 
-        return self.makeSpline(points)
+        return spline
 
     def _getLength(self):
         if self._clipped:
@@ -24,6 +24,8 @@ __title__ = "General utilities for the Rocket Workbench"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
 
+import os
+
 import FreeCAD
 
 def _msg(message):
@@ -66,3 +68,28 @@ def _valueWithUnits(value, units):
     ''' Converts units to user preferred '''
     qty = FreeCAD.Units.Quantity(str(value) + str(units))
     return qty.UserString
+
+def _lengthFromMillimeters(value):
+    ''' Converts a length in mm to user preferred units '''
+    if value is None:
+        return ""
+    qty = FreeCAD.Units.Quantity(value, FreeCAD.Units.Length)
+    return qty.UserString
+
+def _areaFromSquareMillimeters(value):
+    ''' Converts an area in mm^2 to user preferred units '''
+    if value is None:
+        return ""
+    qty = FreeCAD.Units.Quantity(value, FreeCAD.Units.Area)
+    return qty.UserString
+
+def _massFromKilograms(value):
+    ''' Converts a mass in kg to user preferred units '''
+    if value is None:
+        return ""
+    qty = FreeCAD.Units.Quantity(value, FreeCAD.Units.Mass)
+    return qty.UserString
+
+def _userPartsDatabase():
+    ''' User parts overlay, shown alongside the shipped parts database '''
+    return os.path.join(FreeCAD.getUserAppDataDir(), "RocketUserParts.db")
@@ -60,6 +60,11 @@ class RocketWorkbench ( Workbench ):
                          QT_TRANSLATE_NOOP("Rocket", "Analysis")],
                         ['Rocket_FinFlutter', "Rocket_MaterialEditor"])
 
+    def Deactivated(self):
+        # Release the parts database
+        from App.Parts.ConnectionManager import closeConnections
+        closeConnections()
+
     def GetClassName(self):
         return "Gui::PythonWorkbench"
 
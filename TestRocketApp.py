@@ -31,9 +31,20 @@ from Ui.CmdFin import makeFin
 from Ui.CmdFinCan import makeFinCan
 
 from Tests.TestBodyTube import BodyTubeTests
+from Tests.TestBulkLoader import BulkLoaderTests
 from Tests.TestBulkhead import BulkheadTests
 from Tests.TestCenteringRing import CenteringRingTests
+from Tests.TestConnectionManager import ConnectionManagerTests
+from Tests.TestFins import FinTests
+from Tests.TestMaterialResolver import MaterialResolverTests
 from Tests.TestNoses import NoseTests
+from Tests.TestOrcImport import OrcImportTests
+from Tests.TestPartDatabase import PartDatabaseTests
+from Tests.TestPartImport import PartImportTests
+from Tests.TestPartSchema import PartSchemaTests
+from Tests.TestRockSimImport import RockSimImportTests
+from Tests.TestRootFinder import RootFinderTests
+from Tests.TestShapeCache import ShapeCacheTests
 from Tests.TestTransition import TransitionTests
 
 class RocketTestCases(unittest.TestCase):
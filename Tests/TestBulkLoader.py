@@ -0,0 +1,129 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the parts database bulk loader"""
+
+__title__ = "FreeCAD Parts Bulk Loader Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import contextlib
+import io
+import sqlite3
+import unittest
+
+from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_LINE
+from App.Parts.BodyTube import BodyTube
+from App.Parts.BulkLoader import BulkLoader
+from App.Parts.Coupler import Coupler
+from App.Parts.Material import Material
+from App.Parts.PartDatabase import PartDatabase
+
+class BulkLoaderTests(unittest.TestCase):
+
+    def setUp(self):
+        self._connection = sqlite3.connect(":memory:")
+        self._connection.row_factory = sqlite3.Row
+        PartDatabase()._createTables(self._connection)
+        self._loader = BulkLoader(self._connection, batchSize=2)
+
+    def tearDown(self):
+        self._connection.close()
+
+    def _material(self, manufacturer, name, type=MATERIAL_TYPE_BULK, density=820.0):
+        material = Material()
+        material._manufacturer = manufacturer
+        material._name = name
+        material._type = type
+        material._density = density
+        material._units = "kg/m3"
+        return material
+
+    def _tube(self, partNumber, tubeClass=BodyTube):
+        tube = tubeClass()
+        tube._manufacturer = "Estes"
+        tube._partNumber = partNumber
+        tube._material = ("Paper", MATERIAL_TYPE_BULK)
+        tube._ID = (24.1, "mm")
+        tube._OD = (24.8, "mm")
+        tube._length = (457.0, "mm")
+        return tube
+
+    def _rows(self, sql):
+        return [tuple(row) for row in self._connection.execute(sql)]
+
+    def testKeys(self):
+        self.assertEqual(self._material("Estes", "Paper").persist(self._loader), 1)
+        self.assertEqual(self._material("Estes", "Kraft").persist(self._loader), 2)
+        self.assertEqual(self._tube("BT-50").persist(self._loader), 1)
+        self.assertEqual(self._tube("BT-55").persist(self._loader), 2)
+        self.assertEqual(self._loader.nextIndexes()["component"], 3)
+        self.assertEqual(self._loader.nextIndexes()["body_tube"], 3)
+        self._loader.commit()
+
+        self.assertEqual(self._rows("SELECT b.body_tube_index, c.part_number, c.component_type, m.material_name FROM body_tube b, component c, material m " +
+                                    "WHERE b.component_index = c.component_index AND c.material_index = m.material_index ORDER BY b.body_tube_index"),
+                            [(1, "BT-50", "Body Tube", "Paper"), (2, "BT-55", "Body Tube", "Paper")])
+
+        # A second loader continues from the keys already written
+        loader = BulkLoader(self._connection)
+        self.assertEqual(self._tube("BT-60").persist(loader), 3)
+        loader.commit()
+        self.assertEqual(self._rows("SELECT component_index, part_number FROM component WHERE component_index = 3"), [(3, "BT-60")])
+
+    def testDuplicates(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(self._material("Estes", "Paper").persist(self._loader), 1)
+            duplicate = self._material("Estes", "Paper", density=900.0).persist(self._loader)
+            self.assertEqual(self._material("Estes", "Paper", MATERIAL_TYPE_LINE).persist(self._loader), 3)
+            self.assertEqual(self._material("Estes", "Paper").persist(self._loader), 4)
+
+            self.assertEqual(self._tube("BT-50").persist(self._loader), 1)
+            tube = self._tube("BT-50")
+            tube._length = (300.0, "mm")
+            tube.persist(self._loader)
+
+            # The part number is unique for each component type
+            self.assertEqual(self._tube("BT-50", Coupler).persist(self._loader), 3)
+
+            # A part referencing a duplicate material gets the material already written
+            values = dict.fromkeys(self._loader._columns["component"][1:])
+            values.update({"manufacturer" : "Estes", "part_number" : "PK-18", "component_type" : "Parachute", "material_index" : duplicate})
+            self._loader.insert("component", values)
+            self._loader.commit()
+
+        # The first definition wins, and the duplicate part has no orphaned child rows
+        self.assertEqual(self._rows("SELECT material_index, density FROM material WHERE material_name = 'Paper' AND type = 'BULK'"), [(1, 820.0)])
+        self.assertEqual(self._rows("SELECT component_index, component_type, material_index FROM component ORDER BY component_index"),
+                            [(1, "Body Tube", 1), (3, "Tube Coupler", 1), (4, "Parachute", 1)])
+        self.assertEqual(self._rows("SELECT body_tube_index, component_index, length FROM body_tube ORDER BY body_tube_index"), [(1, 1, 457.0), (3, 3, 457.0)])
+
+        # Only the duplicate with a different density is reported
+        self.assertEqual(output.getvalue().count("Skipped duplicate material"), 1, output.getvalue())
+        self.assertIn("900.0", output.getvalue())
+        self.assertEqual(self._loader._duplicates, {"material" : 2, "component" : 1})
+
+    def testNullKeys(self):
+        # SQLite treats NULL values as distinct, so these aren't duplicates
+        self.assertEqual(self._material(None, "Paper").persist(self._loader), 1)
+        self.assertEqual(self._material(None, "Paper").persist(self._loader), 2)
+        self._loader.commit()
+        self.assertEqual(self._rows("SELECT COUNT(*) FROM material"), [(2,)])
@@ -0,0 +1,131 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the pooled connections and query cache of the parts database"""
+
+__title__ = "FreeCAD Parts Connection Manager Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from App.Parts.BodyTube import listBodyTubes
+from App.Parts.ConnectionManager import ConnectionManager
+from App.Parts.Exceptions import SchemaVersionError
+from App.Parts.PartDatabase import PartDatabase
+from App.Parts.PartSchema import SCHEMA_VERSION, upgradeDatabase
+
+class ConnectionManagerTests(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._filename = os.path.join(self._folder, "Parts.db")
+
+        connection = sqlite3.connect(self._filename)
+        connection.row_factory = sqlite3.Row
+        database = PartDatabase(self._folder)
+        database._createTables(connection)
+        connection.execute("INSERT INTO material VALUES (1, 'Estes', 'Paper', 'BULK', 820.0, 'kg/m3', 820.0)")
+        connection.commit()
+        self._addTube(connection, 1, "BT-50", 24.8)
+        database._buildIndexes(connection)
+        connection.commit()
+        connection.close()
+
+        self._manager = ConnectionManager(self._filename)
+
+    def tearDown(self):
+        self._manager.close()
+        shutil.rmtree(self._folder)
+
+    def _addTube(self, connection, index, partNumber, outer):
+        connection.execute("""INSERT INTO component (component_index, manufacturer, part_number, component_type, description, material_index)
+                                VALUES (?, 'Estes', ?, 'Body Tube', '', 1)""", (index, partNumber))
+        connection.execute("""INSERT INTO body_tube (body_tube_index, component_index, tube_type_index, inner_diameter_mm, outer_diameter_mm, length_mm)
+                                VALUES (?, ?, 1, ?, ?, 457.0)""", (index, index, outer - 0.7, outer))
+        connection.commit()
+
+    def _change(self, statement, *parameters):
+        """ Change the file as another process would, moving the modification time on """
+        info = os.stat(self._filename)
+        connection = sqlite3.connect(self._filename)
+        connection.execute(statement, parameters)
+        connection.commit()
+        connection.close()
+
+        # File systems with a coarse timestamp could otherwise leave it unchanged
+        os.utime(self._filename, ns=(info.st_atime_ns, info.st_mtime_ns + 1000000000))
+        return info.st_size
+
+    def _partNumbers(self, rows):
+        return [row["part_number"] for row in rows]
+
+    def testCached(self):
+        rows = self._manager.query(listBodyTubes, search="bt50")
+        self.assertEqual(self._partNumbers(rows), ["BT-50"])
+        self.assertIsInstance(rows, tuple)
+
+        # Repeated queries share the result, while different arguments are queried separately
+        self.assertIs(self._manager.query(listBodyTubes, search="bt50"), rows)
+        self.assertEqual(len(self._manager.query(listBodyTubes, search="bt60")), 0)
+        self.assertIs(self._manager.query(listBodyTubes, search="bt50"), rows)
+
+    def testFileChanged(self):
+        rows = self._manager.query(listBodyTubes, order="outer_diameter_mm")
+        self.assertEqual(self._partNumbers(rows), ["BT-50"])
+        connection = self._manager.acquire()
+        self._manager.release(connection)
+
+        self._change("""INSERT INTO component (component_index, manufacturer, part_number, component_type, description, material_index)
+                        VALUES (2, 'Estes', 'BT-60', 'Body Tube', '', 1)""")
+        self._change("""INSERT INTO body_tube (body_tube_index, component_index, tube_type_index, inner_diameter_mm, outer_diameter_mm, length_mm)
+                        VALUES (2, 2, 1, 40.5, 41.6, 457.0)""")
+
+        # The cached result and the idle connection are both from the earlier file
+        self.assertEqual(self._partNumbers(self._manager.query(listBodyTubes, order="outer_diameter_mm")), ["BT-50", "BT-60"])
+        with self._manager.connection() as current:
+            self.assertIsNot(current, connection)
+
+    def testSameSize(self):
+        rows = self._manager.query(listBodyTubes)
+        self.assertEqual(self._partNumbers(rows), ["BT-50"])
+
+        # Rewriting a value in place leaves the size alone, so only the modification time shows the change
+        size = self._change("UPDATE component SET part_number = 'BT-5X' WHERE component_index = 1")
+        self.assertEqual(os.path.getsize(self._filename), size)
+        self.assertEqual(self._partNumbers(self._manager.query(listBodyTubes)), ["BT-5X"])
+
+    def testSchemaVersion(self):
+        self._manager.close()
+        self._change("PRAGMA user_version = %d" % (SCHEMA_VERSION - 1))
+        info = os.stat(self._filename)
+
+        # The catalog is never written, as it may be in a read only install folder
+        self.assertRaises(SchemaVersionError, ConnectionManager, self._filename)
+        self.assertEqual(os.stat(self._filename).st_mtime_ns, info.st_mtime_ns)
+
+        # Once upgraded it can be opened again
+        self.assertTrue(upgradeDatabase(self._filename))
+        self._manager = ConnectionManager(self._filename)
+        self.assertEqual(self._partNumbers(self._manager.query(listBodyTubes)), ["BT-50"])
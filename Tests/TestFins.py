@@ -0,0 +1,69 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing fins"""
+
+__title__ = "FreeCAD Fin Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import FreeCAD
+import unittest
+
+from Ui.CmdFin import makeFin
+from Ui.CmdFinCan import makeFinCan
+
+class FinTests(unittest.TestCase):
+
+    def setUp(self):
+        self.Doc = FreeCAD.newDocument("FinTest")
+
+    def tearDown(self):
+        FreeCAD.closeDocument(self.Doc.Name)
+
+    def _checkInstances(self, fins, count, message):
+        self.assertEqual(len(fins), count, message)
+        for fin in fins:
+            self.assertTrue(fin.isValid(), message)
+            self.assertTrue(fin.isPartner(fins[0]), message)
+            self.assertAlmostEqual(fin.Volume, fins[0].Volume, msg=message)
+
+    def testFinSet(self):
+        feature = makeFin('Fin')
+        feature.FinSet = True
+        feature.FinCount = 8
+        feature.FinSpacing = 45.0
+        self.Doc.recompute()
+
+        fins = feature.Shape.childShapes()
+        self._checkInstances(fins, 8, "Fin set")
+
+        # Evenly spaced around the body tube
+        self.assertAlmostEqual(fins[2].BoundBox.Center.y, -fins[6].BoundBox.Center.y, places=6)
+        self.assertAlmostEqual(fins[0].BoundBox.Center.z, -fins[4].BoundBox.Center.z, places=6)
+
+    def testFinCan(self):
+        feature = makeFinCan('FinCan')
+        feature.FinCount = 4
+        feature.FinSpacing = 90.0
+        self.Doc.recompute()
+
+        can, fins = feature.Shape.childShapes()
+        self._checkInstances(fins.childShapes(), 4, "Fin can")
@@ -0,0 +1,107 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the in-memory material index used when importing parts"""
+
+__title__ = "FreeCAD Material Resolver Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import sqlite3
+import unittest
+
+from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_LINE, MATERIAL_TYPE_SURFACE
+from App.Parts.Exceptions import MaterialNotFoundError
+from App.Parts.Material import MaterialResolver, getMaterial, getMaterialAnyType
+from App.Parts.PartDatabase import PartDatabase
+
+class MaterialResolverTests(unittest.TestCase):
+
+    def setUp(self):
+        self._connection = sqlite3.connect(":memory:")
+        self._connection.row_factory = sqlite3.Row
+        PartDatabase()._createTables(self._connection)
+
+        self._connection.execute("""INSERT INTO material VALUES (1, 'Estes', 'Paper', 'BULK', 820.0, 'kg/m3', 820.0),
+                                        (2, 'Semroc', 'paper', 'BULK', 0.82, 'g/cm3', 820.0),
+                                        (3, 'Estes', 'Ripstop nylon', 'SURFACE', 0.067, 'kg/m2', 0.067),
+                                        (4, 'Estes', 'Carpet String', 'LINE', 0.0003, 'kg/m', 0.0003),
+                                        (5, 'Apogee', 'Kraft', 'BULK', 700.0, 'kg/m3', 700.0),
+                                        (6, 'Apogee', 'Kraft', 'SURFACE', 0.09, 'kg/m2', 0.09)""")
+
+        # Kraft comes from the second source file
+        self._connection.execute("INSERT INTO source_file VALUES (1, 'estes.orc', '', 0, ''), (2, 'apogee.orc', '', 1, '')")
+        self._connection.execute("INSERT INTO source_range VALUES (1, 'material', 1, 4), (2, 'material', 5, 6)")
+
+    def tearDown(self):
+        self._connection.close()
+
+    def _index(self, function, *args):
+        try:
+            return function(*args)
+        except MaterialNotFoundError:
+            return None
+
+    def testMatchesDatabase(self):
+        resolver = MaterialResolver(self._connection)
+
+        # Exact matches, then any manufacturer, then any type, as the database lookups fall back
+        lookups = [("estes", "PAPER", MATERIAL_TYPE_BULK), ("Semroc", "Paper", MATERIAL_TYPE_BULK), ("Public Missiles", "paper", MATERIAL_TYPE_BULK),
+                   ("Estes", "Ripstop Nylon", MATERIAL_TYPE_SURFACE), ("Estes", "Kraft", MATERIAL_TYPE_LINE), ("Estes", "Unobtainium", MATERIAL_TYPE_BULK)]
+        for lookup in lookups:
+            self.assertEqual(self._index(resolver.getMaterial, *lookup), self._index(getMaterial, self._connection, *lookup), lookup)
+        self.assertEqual([self._index(resolver.getMaterial, *lookup) for lookup in lookups], [1, 2, 1, 3, 5, None])
+
+        # Any type lookups are case sensitive
+        for lookup in [("Estes", "Carpet String"), ("estes", "Carpet String"), ("Apogee", "Kraft")]:
+            self.assertEqual(self._index(resolver.getMaterialAnyType, *lookup), self._index(getMaterialAnyType, self._connection, *lookup), lookup)
+
+        self.assertEqual(resolver.findByName("KRAFT", MATERIAL_TYPE_SURFACE), 6)
+        self.assertIsNone(resolver.findByName("Kraft", MATERIAL_TYPE_LINE))
+        self.assertEqual(resolver.bulkDensity(2), 820.0)
+        self.assertIsNone(resolver.bulkDensity(4))
+
+    def testPosition(self):
+        resolver = MaterialResolver(self._connection)
+
+        # Materials from later files can't be seen
+        resolver.setPosition(0)
+        self.assertIsNone(resolver.findByName("Kraft", MATERIAL_TYPE_BULK))
+        self.assertIsNone(self._index(resolver.getMaterial, "Apogee", "Kraft", MATERIAL_TYPE_BULK))
+        self.assertEqual(resolver.getMaterial("Estes", "Paper", MATERIAL_TYPE_BULK), 1)
+
+        resolver.setPosition(1)
+        self.assertEqual(resolver.getMaterial("Apogee", "Kraft", MATERIAL_TYPE_BULK), 5)
+
+        # Materials added while importing an earlier file win over those of later files
+        resolver.setPosition(None)
+        resolver.add(7, "Public Missiles", "Phenolic", MATERIAL_TYPE_BULK, 950.0, "kg/m3", 950.0, position=3)
+        resolver.add(8, "Estes", "Phenolic", MATERIAL_TYPE_BULK, 960.0, "kg/m3", 960.0, position=0)
+        self.assertEqual(resolver.findByName("Phenolic", MATERIAL_TYPE_BULK), 8)
+        resolver.setPosition(2)
+        resolver.add(9, "Apogee", "Phenolic", MATERIAL_TYPE_BULK, 970.0, "kg/m3", 970.0)
+        self.assertEqual(resolver.getMaterial("Public Missiles", "Phenolic", MATERIAL_TYPE_BULK), 8)
+        self.assertEqual(resolver.getMaterial("Apogee", "Phenolic", MATERIAL_TYPE_BULK), 9)
+
+        # Materials added without a position have no source file, so they are always visible
+        resolver.setPosition(None)
+        resolver.add(10, "Estes", "Balsa", MATERIAL_TYPE_BULK, 160.0, "kg/m3", 160.0)
+        resolver.setPosition(0)
+        self.assertEqual(resolver.findByName("Balsa", MATERIAL_TYPE_BULK), 10)
@@ -0,0 +1,253 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the import of Open Rocket part files"""
+
+__title__ = "FreeCAD Open Rocket Import Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from App.Parts.BodyTube import BodyTube
+from App.Parts.Bulkhead import Bulkhead
+from App.Parts.CenteringRing import CenteringRing
+from App.Parts.ConnectionManager import _workbenchFolder
+from App.Parts.Coupler import Coupler
+from App.Parts.EngineBlock import EngineBlock
+from App.Parts.LaunchLug import LaunchLug
+from App.Parts.Material import Material
+from App.Parts.NoseCone import NoseCone
+from App.Parts.Parachute import Parachute
+from App.Parts.PartDatabaseOrcImporter import parseOrcFile
+from App.Parts.Streamer import Streamer
+from App.Parts.Transition import Transition
+
+# Part file with every kind of component, along with mixed case tags, multi line text, entities,
+# material prefixes, manufacturer aliases, an invalid part and an unknown component
+_catalog = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<OpenRocketComponent>
+    <Version>0.1</Version>
+    <Materials>
+        <Material UnitsOfMeasure="kg/m3">
+            <Name>[material:Paper]</Name>
+            <Density>820.0</Density>
+            <Type>BULK</Type>
+        </Material>
+        <Material UnitsOfMeasure="kg/m2">
+            <Name> Rip stop nylon </Name>
+            <Density>0.067</Density>
+            <Type>SURFACE</Type>
+        </Material>
+        <Material UnitsOfMeasure="kg/m">
+            <Name>Carpet String</Name>
+            <Density>0.0003</Density>
+            <Type>LINE</Type>
+        </Material>
+    </Materials>
+    <Components>
+        <BodyTube>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>BT-50</PartNumber>
+            <Description>BT-50 Body Tube/18in</Description>
+            <Material Type="BULK">[material:Paper]</Material>
+            <Mass Unit="g">5.2</Mass>
+            <InsideDiameter Unit="in">0.95</InsideDiameter>
+            <OutsideDiameter Unit="in">0.976</OutsideDiameter>
+            <Length Unit="in">18</Length>
+        </BodyTube>
+        <TubeCoupler>
+            <Manufacturer>LOC</Manufacturer>
+            <PartNumber>JT-50C</PartNumber>
+            <Description>Coupler
+                over two lines</Description>
+            <Material Type="BULK">Paper</Material>
+            <InsideDiameter Unit="in">0.88</InsideDiameter>
+            <OutsideDiameter Unit="in">0.94</OutsideDiameter>
+            <Length Unit="in">1</Length>
+        </TubeCoupler>
+        <EngineBlock>
+            <PartNumber>EB-50</PartNumber>
+            <Description>Engine &amp; block</Description>
+            <Material Type="BULK">Paper</Material>
+            <InsideDiameter Unit="mm">18.0</InsideDiameter>
+            <OutsideDiameter Unit="mm">24.0</OutsideDiameter>
+            <Length Unit="mm">6.35</Length>
+        </EngineBlock>
+        <CenteringRing>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>CR-2050</PartNumber>
+            <Material Type="BULK">Paper</Material>
+            <InsideDiameter Unit="in">0.736</InsideDiameter>
+            <OutsideDiameter Unit="in">0.95</OutsideDiameter>
+            <Length Unit="in">0.125</Length>
+        </CenteringRing>
+        <LaunchLug>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>LL-2A</PartNumber>
+            <Material Type="BULK">Paper</Material>
+            <InsideDiameter Unit="in">0.125</InsideDiameter>
+            <OutsideDiameter Unit="in">0.156</OutsideDiameter>
+            <Length Unit="in">2</Length>
+        </LaunchLug>
+        <Bulkhead>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>BC-50</PartNumber>
+            <Material Type="BULK">Balsa</Material>
+            <Filled>true</Filled>
+            <OutsideDiameter Unit="in">0.95</OutsideDiameter>
+            <Length Unit="in">0.25</Length>
+        </Bulkhead>
+        <NoseCone>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>BNC-50J</PartNumber>
+            <Description>Balsa nose cone</Description>
+            <Material Type="BULK">Balsa</Material>
+            <Mass Unit="oz">0.1</Mass>
+            <Filled>true</Filled>
+            <Shape>OGIVE</Shape>
+            <OutsideDiameter Unit="in">0.976</OutsideDiameter>
+            <ShoulderDiameter Unit="in">0.95</ShoulderDiameter>
+            <ShoulderLength Unit="in">0.75</ShoulderLength>
+            <Length Unit="in">2.75</Length>
+        </NoseCone>
+        <NoseCone>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>PNC-50</PartNumber>
+            <Material Type="BULK">Polystyrene PS</Material>
+            <Shape>Haack</Shape>
+            <OutsideDiameter Unit="in">0.976</OutsideDiameter>
+            <Length Unit="in">3.5</Length>
+            <Thickness>0.0625</Thickness>
+        </NoseCone>
+        <Transition>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>TA-5055</PartNumber>
+            <Material Type="BULK">Balsa</Material>
+            <Filled>false</Filled>
+            <Shape>conical</Shape>
+            <ForeOutsideDiameter Unit="in">0.976</ForeOutsideDiameter>
+            <ForeShoulderDiameter Unit="in">0.95</ForeShoulderDiameter>
+            <ForeShoulderLength Unit="in">0.5</ForeShoulderLength>
+            <AftOutsideDiameter Unit="in">1.325</AftOutsideDiameter>
+            <AftShoulderDiameter Unit="in">1.283</AftShoulderDiameter>
+            <AftShoulderLength Unit="in">0.5</AftShoulderLength>
+            <Length Unit="in">1</Length>
+            <Thickness Unit="in">0.0625</Thickness>
+        </Transition>
+        <Parachute>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>PK-18</PartNumber>
+            <Material Type="SURFACE">Rip stop nylon</Material>
+            <Diameter Unit="in">18</Diameter>
+            <Sides>6</Sides>
+            <LineCount>6</LineCount>
+            <LineLength Unit="in">24</LineLength>
+            <LineMaterial Type="LINE">Carpet String</LineMaterial>
+        </Parachute>
+        <Streamer>
+            <Manufacturer>Estes</Manufacturer>
+            <PartNumber>ST-1</PartNumber>
+            <Material Type="SURFACE">Mylar</Material>
+            <Length Unit="in">36</Length>
+            <Width Unit="in">1.75</Width>
+            <Thickness Unit="in">0.001</Thickness>
+        </Streamer>
+        <FinSet>
+            <PartNumber>FS-1</PartNumber>
+        </FinSet>
+    </Components>
+</OpenRocketComponent>
+"""
+
+# The records parsed by the importer before its tag dispatch was made table driven, as
+# (class, line, attributes)
+_preseedRecords = [
+    (Material, 5, {"_density" : 0.0, "_manufacturer" : "unspecified", "_name" : "unspecified", "_type" : "BULK", "_units" : "g/cm3"}),
+    (Material, 10, {"_density" : 0.0, "_manufacturer" : "unspecified", "_name" : "unspecified", "_type" : "SURFACE", "_units" : "g/cm3"}),
+    (Material, 15, {"_density" : 0.0, "_manufacturer" : "unspecified", "_name" : "unspecified", "_type" : "LINE", "_units" : "g/cm3"}),
+]
+
+_catalogRecords = [
+    (Material, 5, {"_density" : 820.0, "_manufacturer" : "Estes", "_name" : "Paper", "_type" : "BULK", "_units" : "kg/m3"}),
+    (Material, 10, {"_density" : 0.067, "_manufacturer" : "Estes", "_name" : "Rip stop nylon", "_type" : "SURFACE", "_units" : "kg/m2"}),
+    (Material, 15, {"_density" : 0.0003, "_manufacturer" : "Estes", "_name" : "Carpet String", "_type" : "LINE", "_units" : "kg/m"}),
+    (BodyTube, 22, {"_ID" : (0.95, "in"), "_OD" : (0.976, "in"), "_description" : "BT-50 Body Tube/18in", "_length" : (18.0, "in"),
+                    "_manufacturer" : "Estes", "_mass" : (5.2, "g"), "_material" : ("Paper", "BULK"), "_partNumber" : "BT-50",
+                    "_tubeType" : "body tube"}),
+    (Coupler, 32, {"_ID" : (0.88, "in"), "_OD" : (0.94, "in"), "_description" : "Coupler\n                over two lines",
+                   "_length" : (1.0, "in"), "_manufacturer" : "LOC/Precision", "_mass" : (0.0, ""), "_material" : ("Paper", "BULK"),
+                   "_partNumber" : "JT-50C", "_tubeType" : "coupler"}),
+    (EngineBlock, 42, {"_ID" : (18.0, "mm"), "_OD" : (24.0, "mm"), "_description" : "Engine & block", "_length" : (6.35, "mm"),
+                       "_manufacturer" : "Estes", "_mass" : (0.0, ""), "_material" : ("Paper", "BULK"), "_partNumber" : "EB-50",
+                       "_tubeType" : "engine block"}),
+    (CenteringRing, 50, {"_ID" : (0.736, "in"), "_OD" : (0.95, "in"), "_description" : "", "_length" : (0.125, "in"),
+                         "_manufacturer" : "Estes", "_mass" : (0.0, ""), "_material" : ("Paper", "BULK"), "_partNumber" : "CR-2050",
+                         "_tubeType" : "centering ring"}),
+    (LaunchLug, 58, {"_ID" : (0.125, "in"), "_OD" : (0.156, "in"), "_description" : "", "_length" : (2.0, "in"),
+                     "_manufacturer" : "Estes", "_mass" : (0.0, ""), "_material" : ("Paper", "BULK"), "_partNumber" : "LL-2A",
+                     "_tubeType" : "launch lug"}),
+    (Bulkhead, 66, {"_ID" : (0.0, "mm"), "_OD" : (0.95, "in"), "_description" : "", "_length" : (0.25, "in"), "_manufacturer" : "Estes",
+                    "_mass" : (0.0, ""), "_material" : ("Balsa", "BULK"), "_partNumber" : "BC-50", "_tubeType" : "bulkhead"}),
+    (NoseCone, 74, {"_description" : "Balsa nose cone", "_filled" : True, "_length" : (2.75, "in"), "_manufacturer" : "Estes",
+                    "_mass" : (0.1, "oz"), "_material" : ("Balsa", "BULK"), "_noseType" : "ogive", "_outsideDiameter" : (0.976, "in"),
+                    "_partNumber" : "BNC-50J", "_shoulderDiameter" : (0.95, "in"), "_shoulderLength" : (0.75, "in"),
+                    "_thickness" : (0.0, "")}),
+    (NoseCone, 87, {"_description" : "", "_filled" : False, "_length" : (3.5, "in"), "_manufacturer" : "Estes", "_mass" : (0.0, ""),
+                    "_material" : ("Polystyrene PS", "BULK"), "_noseType" : "haack series", "_outsideDiameter" : (0.976, "in"),
+                    "_partNumber" : "PNC-50", "_shoulderDiameter" : (0.0, ""), "_shoulderLength" : (0.0, ""),
+                    "_thickness" : (0.0625, "in")}),
+    (Transition, 96, {"_aftOutsideDiameter" : (1.325, "in"), "_aftShoulderDiameter" : (1.283, "in"), "_aftShoulderLength" : (0.5, "in"),
+                      "_description" : "", "_filled" : True, "_foreOutsideDiameter" : (0.976, "in"),
+                      "_foreShoulderDiameter" : (0.95, "in"), "_foreShoulderLength" : (0.5, "in"), "_length" : (1.0, "in"),
+                      "_manufacturer" : "Estes", "_mass" : (0.0, ""), "_material" : ("Balsa", "BULK"), "_noseType" : "cone",
+                      "_partNumber" : "TA-5055", "_thickness" : (0.0, "")}),
+    (Parachute, 111, {"_description" : "", "_diameter" : (18.0, "in"), "_lineCount" : 6, "_lineLength" : (24.0, "in"),
+                      "_lineMaterial" : ("Carpet String", "LINE"), "_manufacturer" : "Estes", "_mass" : (0.0, ""),
+                      "_material" : ("Rip stop nylon", "SURFACE"), "_partNumber" : "PK-18", "_sides" : 6}),
+    (Streamer, 121, {"_description" : "", "_length" : (36.0, "in"), "_manufacturer" : "Estes", "_mass" : (0.0, ""),
+                     "_material" : ("Mylar", "SURFACE"), "_partNumber" : "ST-1", "_thickness" : (0.001, "in"), "_width" : (1.75, "in")}),
+]
+
+class OrcImportTests(unittest.TestCase):
+
+    def setUp(self):
+        # The default manufacturer comes from the file name
+        self._folder = tempfile.mkdtemp()
+        self._catalog = os.path.join(self._folder, "estes_classic.orc")
+        with open(self._catalog, "w", encoding="utf-8") as f:
+            f.write(_catalog)
+
+    def tearDown(self):
+        shutil.rmtree(self._folder)
+
+    def _records(self, filename):
+        parsed, records = parseOrcFile(filename)
+        self.assertEqual(parsed, filename)
+        return [(obj.__class__, line, vars(obj)) for obj, line in records]
+
+    def testPreseed(self):
+        self.assertEqual(self._records(os.path.join(_workbenchFolder, "Resources", "parts", "workbench", "preseed.orc")), _preseedRecords)
+
+    def testRecords(self):
+        self.assertEqual(self._records(self._catalog), _catalogRecords)
@@ -0,0 +1,302 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the parts database query plans and snapshots"""
+
+__title__ = "FreeCAD Parts Database Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import os
+import random
+import re
+import sqlite3
+import tempfile
+import unittest
+
+import numpy as np
+
+from App.Constants import COMPONENT_TYPE_BODYTUBE, COMPONENT_TYPE_BULKHEAD, COMPONENT_TYPE_CENTERINGRING, COMPONENT_TYPE_COUPLER, \
+    COMPONENT_TYPE_ENGINEBLOCK, COMPONENT_TYPE_LAUNCHLUG
+from App.Parts.PartDatabase import PartDatabase
+from App.Parts.Exceptions import NotFoundError, MaterialNotFoundError
+from App.Parts.BodyTube import getTubeType, listBodyTubes, getBodyTube, listCompatibleTubes
+from App.Parts.NoseCone import listNoseCones, getNoseCone
+from App.Parts.Transition import listTransitions, getTransition
+from App.Parts.Parachute import listParachutes, getParachute
+from App.Parts.Streamer import listStreamers, getStreamer
+from App.Parts.Component import getManufacturers, searchComponents, fuzzySearchComponents
+from App.Parts.Material import getMaterial, getMaterialAnyType
+from App.Parts.PartQuery import bodyTubesInRange, nearestBodyTubes, noseConesInRange, nearestNoseCones, transitionsInRange, nearestTransitions
+from App.Parts.PartSnapshot import writeSnapshot, loadSnapshot
+
+# A plan step reading every row of a table, rather than searching it or scanning an index
+_tableScan = re.compile(r"^SCAN [\w.]+( AS \w+)?$")
+
+class PartDatabaseTests(unittest.TestCase):
+
+    def setUp(self):
+        self._connection = sqlite3.connect(":memory:")
+        self._connection.row_factory = sqlite3.Row
+
+        database = PartDatabase()
+        database._createTables(self._connection)
+
+        self._connection.execute("""INSERT INTO material VALUES (1, 'Estes', 'Paper', 'BULK', 820.0, 'kg/m3', 820.0),
+                                        (2, 'Estes', 'Ripstop nylon', 'SURFACE', 0.067, 'kg/m2', 0.067),
+                                        (3, 'Estes', 'Carpet String', 'LINE', 0.0003, 'kg/m', 0.0003)""")
+        self._connection.execute("""INSERT INTO component (component_index, manufacturer, part_number, component_type, description, material_index, mass, mass_units, mass_kg)
+                                        VALUES (1, 'Estes', 'BT-50', 'Body Tube', 'Body tube', 1, 0.0, '', 0.0),
+                                            (2, 'Estes', 'JT-50C', 'Tube Coupler', 'Coupler', 1, 0.0, '', 0.0),
+                                            (3, 'Estes', 'BNC-50', 'Nose Cone', 'Nose cone', 1, 0.0, '', 0.0),
+                                            (4, 'Estes', 'TA-5055', 'Transition', 'Transition', 1, 0.0, '', 0.0),
+                                            (5, 'Estes', 'PK-18', 'Parachute', '18 in parachute', 2, 0.0, '', 0.0),
+                                            (6, 'Estes', 'ST-2', 'Streamer', 'Streamer', 2, 0.0, '', 0.0)""")
+        self._connection.execute("""INSERT INTO body_tube (body_tube_index, component_index, tube_type_index, inner_diameter_mm, outer_diameter_mm, length_mm)
+                                        VALUES (1, 1, 1, 24.1, 24.8, 457.0), (2, 2, 3, 23.0, 24.0, 38.0)""")
+        self._connection.execute("""INSERT INTO nose (nose_index, component_index, shape, style, diameter_mm, length_mm, shoulder_diameter_mm, shoulder_length_mm)
+                                        VALUES (1, 3, 'ogive', 'solid', 24.8, 70.0, 24.0, 15.0)""")
+        self._connection.execute("""INSERT INTO transition (transition_index, component_index, shape, style, fore_outside_diameter_mm, aft_outside_diameter_mm, length_mm)
+                                        VALUES (1, 4, 'cone', 'solid', 24.8, 33.7, 25.0)""")
+        self._connection.execute("""INSERT INTO parachute (parachute_index, component_index, line_material_index, sides, lines, diameter_mm, line_length_mm, area_mm2)
+                                        VALUES (1, 5, 3, 6, 6, 457.2, 457.2, 135799.0)""")
+        self._connection.execute("""INSERT INTO streamer (streamer_index, component_index, length_mm, width_mm, thickness_mm, area_mm2)
+                                        VALUES (1, 6, 762.0, 50.8, 0.1, 38709.6)""")
+
+        database._buildIndexes(self._connection)
+
+        self._statements = []
+        self._connection.set_trace_callback(self._statements.append)
+
+    def tearDown(self):
+        self._connection.close()
+
+    def _queries(self):
+        # FTS5 and R*Tree tables read their shadow tables with statements of their own
+        return [statement for statement in dict.fromkeys(self._statements)
+                    if statement.lstrip().upper().startswith("SELECT") and "'.'" not in statement]
+
+    def _checkPlans(self, function, *args, **kwargs):
+        """ Run the lookup, and check the plan of every query it made """
+        self._statements.clear()
+        try:
+            function(self._connection, *args, **kwargs)
+        except (NotFoundError, MaterialNotFoundError):
+            pass
+
+        queries = self._queries()
+        self.assertTrue(len(queries) > 0, "%s made no queries" % function.__name__)
+
+        self._connection.set_trace_callback(None)
+        try:
+            for query in queries:
+                for row in self._connection.execute("EXPLAIN QUERY PLAN " + query):
+                    self.assertIsNone(_tableScan.match(row[3]), "%s: %s\n%s" % (function.__name__, row[3], query))
+        finally:
+            self._connection.set_trace_callback(self._statements.append)
+
+    def testBodyTubes(self):
+        self._checkPlans(getTubeType, "coupler")
+        self._checkPlans(listBodyTubes)
+        for tubeType in [COMPONENT_TYPE_BODYTUBE, COMPONENT_TYPE_BULKHEAD, COMPONENT_TYPE_CENTERINGRING, COMPONENT_TYPE_COUPLER,
+                            COMPONENT_TYPE_ENGINEBLOCK, COMPONENT_TYPE_LAUNCHLUG]:
+            self._checkPlans(listBodyTubes, tubeType)
+        self._checkPlans(listBodyTubes, search="Estes", order="outer_diameter_mm", limit=200)
+        self._checkPlans(getBodyTube, 1)
+        self._checkPlans(listCompatibleTubes, 1)
+
+    def testCompatibleTubes(self):
+        self._connection.set_trace_callback(None)
+
+        # Tube type indexes are 1 body tube, 2 centering ring, 3 coupler, 4 engine block and 6 bulkhead
+        parts = [(20, 'CR-2050', 'Centering Ring', 2, 25.0, 50.0), (21, 'BC-50', 'Bulkhead', 6, 0.0, 24.1),
+                 (22, 'BT-50L', 'Body Tube', 1, 24.1, 24.8), (23, 'JT-20C', 'Tube Coupler', 3, 12.0, 13.0),
+                 (24, 'EB-50', 'Engine Block', 4, 20.0, 24.7)]
+        for index, partNumber, componentType, tubeType, inner, outer in parts:
+            self._connection.execute("""INSERT INTO component (component_index, manufacturer, part_number, component_type, description, material_index)
+                                            VALUES (?, 'Estes', ?, ?, '', 1)""", (index, partNumber, componentType))
+            self._connection.execute("""INSERT INTO body_tube (body_tube_index, component_index, tube_type_index, inner_diameter_mm, outer_diameter_mm, length_mm)
+                                            VALUES (?, ?, ?, ?, ?, 10.0)""", (index - 17, index, tubeType, inner, outer))
+
+        # Closest fit first, leaving out other body tubes and parts outside the tolerance
+        rows = listCompatibleTubes(self._connection, 1)
+        self.assertEqual([(row["part_number"], row["fit"]) for row in rows],
+                         [("BC-50", "inside"), ("JT-50C", "inside"), ("CR-2050", "outside")])
+        self.assertEqual([row["type"] for row in rows], ["Bulkhead", "Tube Coupler", "Centering Ring"])
+        self.assertAlmostEqual(rows[2]["delta"], 0.2)
+
+        rows = listCompatibleTubes(self._connection, 1, tolerance=1.0)
+        self.assertIn(("EB-50", "inside"), [(row["part_number"], row["fit"]) for row in rows])
+
+        # Body tubes fit over a coupler, but other couplers don't
+        rows = listCompatibleTubes(self._connection, 2)
+        self.assertEqual(sorted([(row["part_number"], row["fit"]) for row in rows]), [("BT-50", "outside"), ("BT-50L", "outside")])
+
+    def testNoseCones(self):
+        self._checkPlans(listNoseCones, search="bnc 50")
+        self._checkPlans(getNoseCone, 1)
+
+    def testTransitions(self):
+        self._checkPlans(listTransitions, search="ta5055")
+        self._checkPlans(getTransition, 1)
+
+    def testParachutes(self):
+        self._checkPlans(listParachutes, search="pk18", order="area_mm2", descending=True)
+        self._checkPlans(getParachute, 1)
+
+    def testStreamers(self):
+        self._checkPlans(listStreamers, search="streamer", order="area_mm2")
+        self._checkPlans(getStreamer, 1)
+
+    def testSearch(self):
+        self._checkPlans(getManufacturers)
+        self._checkPlans(searchComponents, "estes")
+        self._checkPlans(fuzzySearchComponents, "bt50")
+
+        # Substring and fuzzy matches
+        self._checkPlans(listBodyTubes, search="bt50")
+        self._checkPlans(listBodyTubes, search="bt5o")
+
+    def testFuzzyRanking(self):
+        self._connection.set_trace_callback(None)
+
+        # Part numbers near BT-50, and descriptions mentioning it
+        self._connection.execute("UPDATE component SET description = 'BT-50 Body Tube/18in' WHERE component_index = 1")
+        parts = [("BT-5", "BT-5 Body Tube/18in"), ("BT-55", "BT-55 Body Tube/18in"), ("BT-50H", "BT-50 heavy wall body tube"),
+                 ("BT-60", "BT-60 Body Tube/18in"), ("BT-5S", "BT-5 Body Tube/6in"), ("JT-50C", "BT-50 coupler")]
+        for index, (partNumber, description) in enumerate(parts, 10):
+            self._connection.execute("""INSERT INTO component (component_index, manufacturer, part_number, component_type, description, material_index)
+                                            VALUES (?, 'Estes', ?, 'Body Tube', ?, 1)""", (index, partNumber, description))
+            self._connection.execute("""INSERT INTO body_tube (component_index, tube_type_index, inner_diameter_mm, outer_diameter_mm, length_mm)
+                                            VALUES (?, 1, 24.1, 24.8, 457.0)""", (index,))
+        PartDatabase()._buildIndexes(self._connection)
+
+        for search in ["bt50", "bt5o", "BT 50"]:
+            results = fuzzySearchComponents(self._connection, search)
+            self.assertEqual(results[0][0], 1, search)
+            self.assertEqual(results[1][0], 12, search)
+            scores = [score for index, score in results]
+            self.assertEqual(scores, sorted(scores, reverse=True))
+
+            self.assertIn("BT-50", [row["part_number"] for row in listBodyTubes(self._connection, search=search)])
+
+        # Without a substring match the list is the fuzzy matches, best first unless sorted by a column
+        ranking = [index for index, score in fuzzySearchComponents(self._connection, "bt50 tube q")]
+        rows = listBodyTubes(self._connection, search="bt50 tube q")
+        self.assertEqual([row["component_index"] for row in rows], ranking)
+        rows = listBodyTubes(self._connection, search="bt50 tube q", order="part_number")
+        self.assertEqual([row["part_number"] for row in rows], sorted([row["part_number"] for row in rows]))
+        self.assertEqual(len(rows), len(ranking))
+
+    def testMaterials(self):
+        self._checkPlans(getMaterial, "estes", "paper", "BULK")
+        self._checkPlans(getMaterial, "Semroc", "Paper", "SURFACE")
+        self._checkPlans(getMaterial, "Semroc", "Kraft", "BULK")
+        self._checkPlans(getMaterialAnyType, "Estes", "Paper")
+
+    def testSnapshot(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, "parts.npz")
+            writeSnapshot(self._connection, filename)
+            snapshot = loadSnapshot(filename)
+
+            tubes = snapshot.table("body_tube")
+            self.assertIsInstance(tubes["outer_diameter_mm"], np.memmap)
+            self.assertEqual(list(tubes["component_index"]), [1, 2])
+            found = tubes["body_tube_index"][(np.abs(tubes["outer_diameter_mm"] - 24.8) < 0.5) &
+                                             (tubes["type"] == snapshot.code("tube_type", "Body Tube"))]
+            self.assertEqual(list(found), [1])
+            self.assertEqual(snapshot.code("tube_type", "Centering Ring"), -1)
+
+            noses = snapshot.table("nose")
+            self.assertEqual(snapshot.categories("shape")[noses["shape"][0]], "ogive")
+            self.assertTrue(np.isnan(noses["thickness_mm"][0]))
+            self.assertEqual(snapshot.table("parachute")["sides"][0], 6)
+            self.assertRaises(NotFoundError, snapshot.table, "fin")
+
+            # Release the memory maps before the folder is removed
+            del tubes, noses, snapshot
+
+    def testDimensions(self):
+        self._checkPlans(bodyTubesInRange, tubeType=COMPONENT_TYPE_BODYTUBE, outerDiameter=(24.0, 25.0))
+        self._checkPlans(nearestBodyTubes, 5, innerDiameter=24.0, length=450.0)
+        self._checkPlans(noseConesInRange, diameter=(24.0, 25.0))
+        self._checkPlans(nearestNoseCones, 5, diameter=24.8)
+        self._checkPlans(transitionsInRange, foreDiameter=(24.0, 25.0), aftDiameter=(33.0, 34.0))
+        self._checkPlans(nearestTransitions, 5, length=25.0)
+
+    def _addDimensions(self, count):
+        """ Random tubes, nose cones and transitions, for checking the dimensional searches """
+        generator = random.Random(50)
+        for i in range(count):
+            index = 100 + i
+            self._connection.execute("""INSERT INTO component (component_index, manufacturer, part_number, component_type, material_index)
+                                            VALUES (?, 'Test', ?, 'Body Tube', 1), (?, 'Test', ?, 'Nose Cone', 1), (?, 'Test', ?, 'Transition', 1)""",
+                                        (index, "BT-%d" % i, index + count, "NC-%d" % i, index + 2 * count, "TA-%d" % i))
+            outer = round(generator.uniform(10.0, 100.0), 1)
+            self._connection.execute("""INSERT INTO body_tube (component_index, tube_type_index, inner_diameter_mm, outer_diameter_mm, length_mm)
+                                            VALUES (?, ?, ?, ?, ?)""", (index, generator.choice([1, 3]), outer - 0.8, outer, round(generator.uniform(20.0, 900.0))))
+            self._connection.execute("INSERT INTO nose (component_index, diameter_mm, length_mm) VALUES (?, ?, ?)",
+                                        (index + count, outer, round(generator.uniform(20.0, 300.0), 1)))
+            self._connection.execute("""INSERT INTO transition (component_index, fore_outside_diameter_mm, aft_outside_diameter_mm, length_mm)
+                                            VALUES (?, ?, ?, ?)""", (index + 2 * count, outer, round(generator.uniform(10.0, 100.0), 1), round(generator.uniform(10.0, 100.0), 1)))
+        PartDatabase()._buildIndexes(self._connection)
+
+    def _bruteForce(self, query, ranges):
+        """ Every row of the query within the ranges, checked in Python """
+        rows = self._connection.execute(query).fetchall()
+        return sorted([row[0] for row in rows if all(limits[0] <= row[column] <= limits[1] for column, limits in ranges.items())])
+
+    def _distances(self, rows, targets):
+        return [sum((row[column] - target) ** 2 for column, target in targets.items()) for row in rows]
+
+    def _checkNearest(self, query, function, count, targets, **kwargs):
+        """ The nearest rows are as close as the nearest found by sorting every row """
+        expected = sorted(self._distances(self._connection.execute(query).fetchall(), targets))[:count]
+        found = self._distances(function(self._connection, count, **kwargs), targets)
+        self.assertEqual(len(found), len(expected))
+        for distance, expectedDistance in zip(found, expected):
+            self.assertAlmostEqual(distance, expectedDistance)
+
+    def testDimensionResults(self):
+        self._connection.set_trace_callback(None)
+        self._addDimensions(200)
+
+        tubes = """SELECT body_tube_index, inner_diameter_mm, outer_diameter_mm, length_mm FROM body_tube b, tube_type t
+                    WHERE b.tube_type_index = t.tube_type_index AND t.type = 'Body Tube'"""
+        found = bodyTubesInRange(self._connection, tubeType=COMPONENT_TYPE_BODYTUBE, outerDiameter=(24.0, 42.0), length=(100.0, 500.0))
+        self.assertEqual(sorted([row["body_tube_index"] for row in found]),
+                         self._bruteForce(tubes, {"outer_diameter_mm" : (24.0, 42.0), "length_mm" : (100.0, 500.0)}))
+        self.assertTrue(len(found) > 0)
+        self._checkNearest(tubes, nearestBodyTubes, 5, {"inner_diameter_mm" : 24.0, "length_mm" : 450.0},
+                            tubeType=COMPONENT_TYPE_BODYTUBE, innerDiameter=24.0, length=450.0)
+
+        noses = "SELECT nose_index, diameter_mm, length_mm FROM nose WHERE diameter_mm IS NOT NULL AND length_mm IS NOT NULL"
+        found = noseConesInRange(self._connection, diameter=(24.0, 25.0))
+        self.assertEqual(sorted([row["nose_index"] for row in found]), self._bruteForce(noses, {"diameter_mm" : (24.0, 25.0)}))
+        self._checkNearest(noses, nearestNoseCones, 10, {"diameter_mm" : 41.6, "length_mm" : 120.0}, diameter=41.6, length=120.0)
+
+        transitions = """SELECT transition_index, fore_outside_diameter_mm, aft_outside_diameter_mm, length_mm FROM transition
+                            WHERE fore_outside_diameter_mm IS NOT NULL AND aft_outside_diameter_mm IS NOT NULL AND length_mm IS NOT NULL"""
+        found = transitionsInRange(self._connection, foreDiameter=(30.0, 60.0), aftDiameter=(20.0, 50.0))
+        self.assertEqual(sorted([row["transition_index"] for row in found]),
+                         self._bruteForce(transitions, {"fore_outside_diameter_mm" : (30.0, 60.0), "aft_outside_diameter_mm" : (20.0, 50.0)}))
+        self._checkNearest(transitions, nearestTransitions, 3, {"fore_outside_diameter_mm" : 24.8, "aft_outside_diameter_mm" : 33.7},
+                            foreDiameter=24.8, aftDiameter=33.7)
@@ -0,0 +1,207 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the import of the part files into the parts database"""
+
+__title__ = "FreeCAD Parts Import Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import os
+import shutil
+import sqlite3
+from os import path
+import tempfile
+import unittest
+
+from App.Parts.BodyTube import listBodyTubes, getBodyTube
+from App.Parts.ConnectionManager import closeConnections, getConnectionManager, _workbenchFolder
+from App.Parts.PartDatabase import PartDatabase
+
+# Columns referring to other rows, replaced by the natural keys of those rows when comparing databases
+_materialColumns = ["material_index", "line_material_index"]
+
+class _ImportDatabase(PartDatabase):
+    """ Notes the files parsed for an import """
+
+    def __init__(self, rootFolder):
+        super().__init__(rootFolder)
+        self.parsed = []
+
+    def _parseFiles(self, files, workers=None):
+        self.parsed += files
+        return super()._parseFiles(files, workers)
+
+class PartImportTests(unittest.TestCase):
+
+    def setUp(self):
+        # Incremental updates are compared with complete rebuilds of the same sources in a second folder
+        self._folder = tempfile.mkdtemp()
+        self._reference = tempfile.mkdtemp()
+        for folder in ["workbench", "rocksim_components"]:
+            shutil.copytree(os.path.join(_workbenchFolder, "Resources", "parts", folder), os.path.join(self._folder, "Resources", "parts", folder))
+            os.makedirs(os.path.join(self._reference, "Resources", "parts"), exist_ok=True)
+            os.symlink(os.path.join(self._folder, "Resources", "parts", folder), os.path.join(self._reference, "Resources", "parts", folder))
+
+    def tearDown(self):
+        closeConnections(self._folder)
+        shutil.rmtree(self._folder)
+        shutil.rmtree(self._reference)
+
+    def _source(self, *names):
+        return os.path.join(self._folder, "Resources", "parts", "rocksim_components", *names)
+
+    def _edit(self, filename, old, new):
+        with open(filename, encoding="latin-1") as f:
+            text = f.read()
+        self.assertIn(old, text)
+        with open(filename, "w", encoding="latin-1") as f:
+            f.write(text.replace(old, new, 1))
+
+    def _import(self, folder, incremental):
+        """ The contents of the database after the import, the rows from each file, and the vendors imported """
+        database = _ImportDatabase(folder)
+        connection = database.getConnection(ro=False)
+        try:
+            if incremental:
+                database._update(connection, workers=1)
+            else:
+                database.rebuild(connection, workers=1)
+            return self._contents(connection), self._ranges(connection), {path.basename(filename) for filename in database.parsed}
+        finally:
+            connection.close()
+
+    def _contents(self, connection):
+        """ Every imported row, with the keys replaced by the natural keys of the rows they refer to """
+        materials = {row[0] : tuple(row[1:]) for row in connection.execute("SELECT material_index, manufacturer, material_name, type FROM material")}
+        components = {row[0] : tuple(row[1:]) for row in connection.execute("SELECT component_index, manufacturer, part_number, component_type FROM component")}
+
+        contents = {}
+        for table in ["material", "component", "body_tube", "nose", "transition", "parachute", "streamer"]:
+            cursor = connection.execute("SELECT * FROM %s" % table)
+            columns = [column[0] for column in cursor.description]
+            rows = []
+            for row in cursor.fetchall():
+                values = []
+                for column, value in zip(columns[1:], tuple(row)[1:]):
+                    if column in _materialColumns:
+                        value = materials[value]
+                    elif column == "component_index":
+                        value = components[value]
+                    values.append(value)
+                rows.append(tuple(values))
+            contents[table] = sorted(rows, key=repr)
+        return contents
+
+    def _ranges(self, connection):
+        return {tuple(row[:2]) : tuple(row[2:]) for row in connection.execute("""SELECT filename, table_name, first_index, last_index
+                                                                                FROM source_file f, source_range r WHERE f.source_file_index = r.source_file_index""")}
+
+    def _update(self):
+        """ Update the database, check it matches a complete rebuild, and return the rows from each file and the vendors imported """
+        contents, ranges, imported = self._import(self._folder, True)
+        self.assertEqual(contents, self._import(self._reference, False)[0])
+        return ranges, imported
+
+    def testIncremental(self):
+        self._import(self._folder, False)
+
+        ranges, imported = self._update()
+        self.assertEqual(imported, set())
+
+        # Nothing but the files of a vendor folder is read
+        os.makedirs(self._source("estes", "backup"))
+        ranges, imported = self._update()
+        self.assertEqual(imported, set())
+
+        # A dimension change only imports that vendor again, keeping its materials for the other vendors
+        self._edit(self._source("estes", "BTDATA.CSV"), "EST 3084,BT-5 Body Tube/18in,in,0.515", "EST 3084,BT-5 Body Tube/18in,in,0.505")
+        materials = ranges[("Resources/parts/rocksim_components/estes", "material")]
+        ranges, imported = self._update()
+        self.assertEqual(imported, {"estes"})
+        self.assertEqual(ranges[("Resources/parts/rocksim_components/estes", "material")], materials)
+
+        # The first file with a part number wins, so a later vendor with the same part is imported again
+        self._edit(self._source("estes", "BTDATA.CSV"), "Estes,EST 3085,", "Quest,9527,MMX Body Tube/6in,in,0.257,0.277,6,Paper,,oz,0.05\nEstes,EST 3085,")
+        ranges, imported = self._update()
+        self.assertEqual(imported, {"estes", "quest"})
+
+        self._edit(self._source("estes", "BTDATA.CSV"), "Quest,9527,MMX Body Tube/6in,in,0.257,0.277,6,Paper,,oz,0.05\n", "")
+        ranges, imported = self._update()
+        self.assertEqual(imported, {"estes", "quest"})
+
+        # Materials are shared by name, so a material change imports every later vendor again
+        self._edit(self._source("estes", "MATERIAL.CSV"), "1309.,1309.", "1310.,1310.")
+        ranges, imported = self._update()
+        self.assertEqual(imported, {"estes", "giantleaprocketry", "publicmissiles", "quest", "semroc"})
+
+        shutil.rmtree(self._source("bms"))
+        ranges, imported = self._update()
+        self.assertEqual(imported, {"estes", "giantleaprocketry", "publicmissiles", "quest", "semroc"})
+
+    def _write(self, filename, lines):
+        os.makedirs(path.dirname(filename), exist_ok=True)
+        with open(filename, "w", encoding="latin-1") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def testOverlay(self):
+        database = PartDatabase(self._folder)
+        connection = database.getConnection(ro=False)
+        database.rebuild(connection, workers=1)
+        catalog = connection.execute("SELECT COUNT(*) FROM material").fetchone()[0]
+        components = connection.execute("SELECT COUNT(*) FROM component").fetchone()[0]
+        unspecified = connection.execute("SELECT COUNT(*) FROM material WHERE material_name = 'unspecified'").fetchone()[0]
+        connection.close()
+
+        # User parts with a material of their own, and one from the catalog
+        user = path.join(self._folder, "user", "bluetube")
+        self._write(path.join(user, "MATERIAL.CSV"), ["Material Name,Units,Density",
+                                                      "Test Fiber,g/cm3,1.25"])
+        self._write(path.join(user, "BTDATA.CSV"), ["Mfg.,Part No.,Desc.,Units,ID,OD,Length,Material",
+                                                    "Test,TEST-1,Test tube,in.,1.141,1.265,48,Test Fiber",
+                                                    "Test,TEST-2,Test tube,in.,1.525,1.649,48,unspecified"])
+        overlay = path.join(self._folder, "overlay.db")
+        database.updateOverlay(overlay, [user], workers=1)
+
+        # Only the catalog materials used by the user parts are copied, and the copies keep their catalog keys
+        connection = sqlite3.connect(overlay)
+        self.assertEqual(sorted(connection.execute("SELECT material_name, type FROM material").fetchall()),
+                         [("Test Fiber", "BULK"), ("unspecified", "BULK")])
+        self.assertEqual(connection.execute("SELECT material_index FROM catalog_material").fetchall(),
+                         connection.execute("SELECT material_index FROM material WHERE material_name = 'unspecified'").fetchall())
+        connection.close()
+
+        with getConnectionManager(self._folder, overlay).connection() as connection:
+            self.assertTrue(connection.overlay)
+
+            # The copied catalog materials aren't shown twice
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM material").fetchone()[0], catalog + 1)
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM material WHERE material_name = 'unspecified'").fetchone()[0], unspecified)
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM material WHERE material_name = 'Test Fiber'").fetchone()[0], 1)
+            self.assertEqual(connection.execute("SELECT COUNT(*) FROM component").fetchone()[0], components + 2)
+
+            # Overlay rows have negative keys, and join to their own materials or to the catalog ones
+            tubes = listBodyTubes(connection, search="test")
+            self.assertEqual([row["part_number"] for row in tubes], ["TEST-2", "TEST-1"])
+            self.assertTrue(all(row["body_tube_index"] < 0 for row in tubes))
+            self.assertEqual([getBodyTube(connection, row["body_tube_index"])["material_name"] for row in tubes], ["unspecified", "Test Fiber"])
+            materials = connection.execute("SELECT material_index FROM component WHERE part_number IN ('TEST-1', 'TEST-2') ORDER BY part_number").fetchall()
+            self.assertLess(materials[0][0], 0)
+            self.assertGreater(materials[1][0], 0)
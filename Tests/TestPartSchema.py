@@ -0,0 +1,207 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the upgrade of older parts databases"""
+
+__title__ = "FreeCAD Parts Schema Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from App.Parts.BodyTube import getBodyTube, listBodyTubes
+from App.Parts.NoseCone import getNoseCone
+from App.Parts.Parachute import listParachutes, getParachute
+from App.Parts.PartDatabase import PartDatabase
+from App.Parts.PartSchema import SCHEMA_VERSION, schemaVersion, upgradeSchema, upgradeDatabase
+from App.Parts.Streamer import listStreamers
+from App.Parts.Transition import getTransition
+
+# The schema before it was versioned, as shipped in the original Parts.db
+_unversionedTables = [
+    "CREATE TABLE alias (alias_index INTEGER PRIMARY KEY ASC, alias_type, name, alias_name)",
+    "CREATE TABLE material (material_index INTEGER PRIMARY KEY ASC, manufacturer, material_name, type, density, units)",
+    "CREATE INDEX idx_material ON material(manufacturer, material_name, type)",
+    "CREATE TABLE component (component_index INTEGER PRIMARY KEY ASC, manufacturer, part_number, description, material_index, mass, mass_units)",
+    "CREATE INDEX idx_component_manufacturer ON component(manufacturer)",
+    "CREATE TABLE tube_type (tube_type_index INTEGER PRIMARY KEY ASC, type)",
+    "CREATE INDEX idx_tube_type_type ON tube_type(type)",
+    "INSERT INTO tube_type(type) VALUES ('Body Tube'), ('Centering Ring'), ('Tube Coupler'), ('Engine Block'), ('Launch Lug'), ('Bulkhead')",
+    """CREATE TABLE body_tube (body_tube_index INTEGER PRIMARY KEY ASC, component_index, tube_type_index, inner_diameter, inner_diameter_units,
+        outer_diameter, outer_diameter_units, length, length_units)""",
+    "CREATE INDEX idx_body_tube ON body_tube(component_index, tube_type_index)",
+    """CREATE TABLE nose (nose_index INTEGER PRIMARY KEY ASC, component_index, shape, style, diameter, diameter_units,
+        length, length_units, thickness, thickness_units, shoulder_diameter, shoulder_diameter_units, shoulder_length, shoulder_length_units)""",
+    """CREATE TABLE transition (transition_index INTEGER PRIMARY KEY ASC, component_index, shape, style,
+        fore_outside_diameter, fore_outside_diameter_units, fore_shoulder_diameter, fore_shoulder_diameter_units, fore_shoulder_length, fore_shoulder_length_units,
+        aft_outside_diameter, aft_outside_diameter_units, aft_shoulder_diameter, aft_shoulder_diameter_units, aft_shoulder_length, aft_shoulder_length_units,
+        length, length_units, thickness, thickness_units)""",
+    """CREATE TABLE parachute (parachute_index INTEGER PRIMARY KEY ASC, component_index, line_material_index, sides, lines, diameter, diameter_units,
+        line_length, line_length_units)""",
+    "CREATE TABLE streamer (streamer_index INTEGER PRIMARY KEY ASC, component_index, length, length_units, width, width_units, thickness, thickness_units)",
+
+    "INSERT INTO material VALUES (1, 'Estes', 'Paper', 'BULK', 820.0, 'g/cm3'), (2, 'Estes', 'Ripstop nylon', 'SURFACE', 0.067, 'g/cm2')",
+    "INSERT INTO material VALUES (3, 'Estes', 'Carpet String', 'LINE', 0.0003, 'g/cm'), (4, 'Estes', 'Paper', 'BULK', 680.0, 'g/cm3')",
+    """INSERT INTO component VALUES (1, 'Estes', 'BT-50', 'Body tube', 1, 0.0, ''), (2, 'Estes', 'BNC-50', 'Nose cone', 1, 0.5, 'oz'),
+        (3, 'Estes', 'TA-5055', 'Transition', 4, 2.0, 'g'), (4, 'Estes', 'PK-18', '18 in parachute', 2, 0.0, ''),
+        (5, 'Estes', 'ST-2', 'Streamer', 2, 0.0, ''), (6, 'Estes', 'BT-50', 'Body tube', 4, 0.0, ''), (7, 'Estes', 'BT-50', 'Coupler', 1, 0.0, '')""",
+    "INSERT INTO body_tube VALUES (1, 1, 1, 0.95, 'in', 0.976, 'in', 18.0, 'in'), (2, 6, 1, 0.95, 'in', 0.976, 'in', 12.0, 'in')",
+    "INSERT INTO body_tube VALUES (3, 7, 3, 0.9, 'in', 0.95, 'in', 1.5, 'in')",
+    "INSERT INTO nose VALUES (1, 2, 'ogive', 'solid', 0.976, 'in', 2.75, 'in', 0.0, '', 0.95, 'in', 0.5, 'in')",
+    "INSERT INTO transition VALUES (1, 3, 'cone', 'solid', 24.8, 'mm', 24.1, 'mm', 10.0, 'mm', 33.7, 'mm', 33.0, 'mm', 12.0, 'mm', 25.0, 'mm', 0.0, '')",
+    "INSERT INTO parachute VALUES (1, 4, 3, 6, 6, 18.0, 'in', 18.0, 'in')",
+    "INSERT INTO streamer VALUES (1, 5, 30.0, 'in', 2.0, 'in', 0.001, 'in')"
+]
+
+class PartSchemaTests(unittest.TestCase):
+
+    def setUp(self):
+        self._connection = sqlite3.connect(":memory:")
+        self._connection.row_factory = sqlite3.Row
+        for statement in _unversionedTables:
+            self._connection.execute(statement)
+        self._connection.commit()
+
+    def tearDown(self):
+        self._connection.close()
+
+    def _value(self, query):
+        return self._connection.execute(query).fetchone()[0]
+
+    def testUpgrade(self):
+        self.assertEqual(schemaVersion(self._connection), 0)
+        self.assertTrue(upgradeSchema(self._connection))
+        self.assertEqual(schemaVersion(self._connection), SCHEMA_VERSION)
+        self.assertFalse(upgradeSchema(self._connection))
+
+        # Open Rocket densities are already SI
+        self.assertEqual(self._value("SELECT density_si FROM material WHERE material_index = 1"), 820.0)
+        self.assertEqual(self._value("SELECT mass_kg FROM component WHERE component_index = 1"), 0.0)
+        self.assertAlmostEqual(self._value("SELECT mass_kg FROM component WHERE component_index = 2"), 0.0141748, places=6)
+        self.assertAlmostEqual(self._value("SELECT mass_kg FROM component WHERE component_index = 3"), 0.002)
+        self.assertAlmostEqual(self._value("SELECT outer_diameter_mm FROM body_tube WHERE body_tube_index = 1"), 24.7904)
+        self.assertAlmostEqual(self._value("SELECT length_mm FROM body_tube WHERE body_tube_index = 1"), 457.2)
+        self.assertEqual(self._value("SELECT thickness_mm FROM nose"), 0.0)
+        self.assertAlmostEqual(self._value("SELECT shoulder_length_mm FROM nose"), 12.7)
+        self.assertAlmostEqual(self._value("SELECT aft_shoulder_length_mm FROM transition"), 12.0)
+        self.assertAlmostEqual(self._value("SELECT line_length_mm FROM parachute"), 457.2)
+        self.assertAlmostEqual(self._value("SELECT thickness_mm FROM streamer"), 0.0254)
+
+        # The first of each duplicate material and part is kept, with the parts using the duplicate material moved to it
+        self.assertEqual([tuple(row) for row in self._connection.execute("SELECT material_index FROM material ORDER BY material_index")], [(1,), (2,), (3,)])
+        self.assertEqual([tuple(row) for row in self._connection.execute("SELECT component_index, component_type, material_index FROM component ORDER BY component_index")],
+                         [(1, "Body Tube", 1), (2, "Nose Cone", 1), (3, "Transition", 1), (4, "Parachute", 2), (5, "Streamer", 2), (7, "Tube Coupler", 1)])
+        self.assertEqual([tuple(row) for row in self._connection.execute("SELECT body_tube_index FROM body_tube ORDER BY body_tube_index")], [(1,), (3,)])
+        self.assertRaises(sqlite3.IntegrityError, self._connection.execute,
+                          "INSERT INTO component (manufacturer, part_number, component_type) VALUES ('Estes', 'BT-50', 'Body Tube')")
+
+        # Volumes are estimated for the parts with a known shape, and masses for those of bulk materials
+        self.assertAlmostEqual(self._value("SELECT estimated_volume FROM component WHERE component_index = 1"), 11600.94, places=2)
+        self.assertAlmostEqual(self._value("SELECT estimated_mass FROM component WHERE component_index = 1"), 0.0095128, places=7)
+        self.assertIsNotNone(self._value("SELECT estimated_mass FROM component WHERE component_index = 2"))
+        self.assertIsNotNone(self._value("SELECT estimated_mass FROM component WHERE component_index = 3"))
+        self.assertIsNone(self._value("SELECT estimated_volume FROM component WHERE component_index = 4"))
+        self.assertIsNone(self._value("SELECT estimated_mass FROM component WHERE component_index = 5"))
+
+        self.assertAlmostEqual(self._value("SELECT area_mm2 FROM parachute"), 135770.16, places=2)
+        self.assertAlmostEqual(self._value("SELECT area_mm2 FROM streamer"), 38709.6)
+
+        # Keys referring to other tables are declared INTEGER
+        for table, column in [("component", "material_index"), ("body_tube", "component_index"), ("body_tube", "tube_type_index"),
+                              ("parachute", "line_material_index"), ("streamer", "component_index")]:
+            types = {row["name"] : row["type"] for row in self._connection.execute("PRAGMA table_info(%s)" % table)}
+            self.assertEqual(types[column], "INTEGER", "%s.%s" % (table, column))
+
+        # Derived tables are built by the upgrade
+        self.assertEqual(self._value("SELECT rowid FROM component_search WHERE component_search MATCH 'bnc*'"), 2)
+        self.assertEqual(self._value("SELECT COUNT(*) FROM body_tube_rtree"), 2)
+        self.assertEqual(self._value("SELECT COUNT(*) FROM transition_rtree"), 1)
+
+    def _schema(self, connection):
+        """ The columns and their declared types for each table, and the index names, leaving out the import manifest """
+        tables = {}
+        for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'source_%' AND sql LIKE 'CREATE TABLE%'"):
+            tables[row[0]] = [(column[1], column[2]) for column in connection.execute("PRAGMA table_info(%s)" % row[0])]
+        indexes = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL AND name NOT LIKE 'idx_source%'")}
+        return tables, indexes
+
+    def testUpgradedSchema(self):
+        # An upgraded database has the schema of a new one, and the lookups can use it
+        upgradeSchema(self._connection)
+
+        connection = sqlite3.connect(":memory:")
+        database = PartDatabase()
+        database._createTables(connection)
+        database._buildIndexes(connection)
+        self.assertEqual(self._schema(self._connection), self._schema(connection))
+        connection.close()
+
+        self.assertEqual([(row["part_number"], row["type"]) for row in listBodyTubes(self._connection, search="bt50")],
+                         [("BT-50", "Body Tube"), ("BT-50", "Tube Coupler")])
+        self.assertAlmostEqual(getBodyTube(self._connection, 1)["estimated_mass"], 0.0095128, places=7)
+        self.assertEqual(getNoseCone(self._connection, 1)["part_number"], "BNC-50")
+        self.assertEqual(getTransition(self._connection, 1)["part_number"], "TA-5055")
+        self.assertEqual(getParachute(self._connection, 1)["part_number"], "PK-18")
+        self.assertEqual([row["part_number"] for row in listParachutes(self._connection, order="area_mm2")], ["PK-18"])
+        self.assertEqual([row["part_number"] for row in listStreamers(self._connection, search="streamer")], ["ST-2"])
+
+    def testNewDatabase(self):
+        # A database created with the current schema needs no upgrade
+        connection = sqlite3.connect(":memory:")
+        database = PartDatabase()
+        database._createTables(connection)
+        database._buildIndexes(connection)
+        self.assertEqual(schemaVersion(connection), SCHEMA_VERSION)
+        self.assertFalse(upgradeSchema(connection))
+        connection.close()
+
+        connection = sqlite3.connect(":memory:")
+        self.assertFalse(upgradeSchema(connection))
+        self.assertEqual(schemaVersion(connection), 0)
+        connection.close()
+
+    def testMissingIndexes(self):
+        connection = sqlite3.connect(":memory:")
+        PartDatabase()._createTables(connection)
+        connection.execute("""INSERT INTO component (component_index, manufacturer, part_number, component_type, description)
+                                VALUES (1, 'Estes', 'BT-50', 'Body Tube', 'Body tube')""")
+        connection.commit()
+
+        self.assertTrue(upgradeSchema(connection))
+        self.assertEqual(connection.execute("SELECT rowid FROM component_search WHERE component_search MATCH 'estes'").fetchone()[0], 1)
+        self.assertFalse(upgradeSchema(connection))
+        connection.close()
+
+    def testUpgradeFile(self):
+        with tempfile.TemporaryDirectory() as folder:
+            filename = os.path.join(folder, "Parts.db")
+            connection = sqlite3.connect(filename)
+            self._connection.backup(connection)
+            connection.close()
+
+            self.assertTrue(upgradeDatabase(filename))
+            self.assertFalse(upgradeDatabase(filename))
+
+            connection = sqlite3.connect(filename)
+            self.assertEqual(schemaVersion(connection), SCHEMA_VERSION)
+            connection.close()
@@ -0,0 +1,149 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the import of RockSim part catalogs"""
+
+__title__ = "FreeCAD RockSim Import Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from App.Constants import MATERIAL_TYPE_BULK, MATERIAL_TYPE_LINE, MATERIAL_TYPE_SURFACE
+from App.Parts.BodyTube import BodyTube
+from App.Parts.BulkLoader import BulkLoader
+from App.Parts.Exceptions import UnknownManufacturerError
+from App.Parts.NoseCone import NoseCone
+from App.Parts.Parachute import Parachute
+from App.Parts.PartDatabase import PartDatabase
+from App.Parts.PartDatabaseRktImporter import RktMaterial, parseRktFolder
+
+# A small catalog in the layout of the RockSim CSV files, trailing columns left out
+_catalog = {
+    "MATERIAL.CSV" : """Material Name,Units,Density,Low,High,Class
+Paper,kg/m3,820.,820.,820.,unknown
+Balsa,lb/ft3,8.,8.,8.,unknown
+Rip stop nylon,kg/m2,0.067,0.067,0.067,unknown
+Carpet String,kg/m,0.0003,0.0003,0.0003,unknown
+""",
+    "BTDATA.CSV" : """Mfg.,Part No.,Desc.,Units,ID,OD,Length,Material,Engine,Mass Units,Mass
+Estes,EST 3086,BT-50 Body Tube/18in,In.,0.95,0.976,18,Paper,,g,5.2
+,EST 3087,BT-55 Body Tube/18in,in,1.283,1.325,18,Paper,,,
+Estes,,No part number,in,1,1.1,18,Paper,,g,0
+Estes,EST 3088,Bad diameter,in,abc,1.1,18,Paper,,g,0
+""",
+    "NCDATA.CSV" : """Mfg.,Part No.,Desc.,Units,Length,Outer Dia,L/D Ratio,Insert Length,Insert OD,Thickness,Shape,Config,Material,CG Loc,Mass Units,Mass
+Estes,BNC-50J,Balsa Nose cone,in,2.75,0.976,0,0.75,0.95,0,1,hollow,Balsa,0,oz,0.1
+""",
+    "PCDATA.CSV" : """Mfg.,Part No.,Desc.,Units,n sides,OD,ID,Shroud Count,Shroud Len,Shroud Material,Chute Thickness,Chute Material,Mass Units,Mass
+Estes,302260,18 in. nylon,mm,8,457.2,0,8,609.6,Carpet String,1.016,Rip stop nylon,g,10.48
+""",
+    # Fins aren't imported
+    "FSDATA.CSV" : """Mfg.,Part No.,Desc.,Units
+Estes,FS-1,Fin set,in
+""",
+    "readme.txt" : "Not a catalog"
+}
+
+class RockSimImportTests(unittest.TestCase):
+
+    def setUp(self):
+        self._folder = tempfile.mkdtemp()
+        self._catalog = os.path.join(self._folder, "estes")
+        os.makedirs(self._catalog)
+        for name, text in _catalog.items():
+            with open(os.path.join(self._catalog, name), "w", encoding="latin-1") as f:
+                f.write(text)
+
+    def tearDown(self):
+        shutil.rmtree(self._folder)
+
+    def testRecords(self):
+        folder, records = parseRktFolder(self._catalog)
+        self.assertEqual(folder, self._catalog)
+
+        # Materials come first, followed by the parts of each file in name order
+        materials = [obj for obj, line in records if isinstance(obj, RktMaterial)]
+        self.assertEqual([(obj._name, obj._type) for obj in materials], [("Paper", MATERIAL_TYPE_BULK), ("Balsa", MATERIAL_TYPE_BULK),
+                            ("Rip stop nylon", MATERIAL_TYPE_SURFACE), ("Carpet String", MATERIAL_TYPE_LINE)])
+        self.assertEqual([obj._manufacturer for obj in materials], ["Estes"] * 4)
+        self.assertAlmostEqual(materials[1].densitySI(), 128.148, places=3)
+
+        parts = [(obj.__class__, obj._partNumber, line) for obj, line in records[len(materials):]]
+        self.assertEqual(parts, [(BodyTube, "EST 3086", 2), (BodyTube, "EST 3087", 3), (NoseCone, "BNC-50J", 2), (Parachute, "302260", 2)])
+
+        tube = records[4][0]
+        self.assertEqual((tube._ID, tube._OD, tube._length), ((0.95, "in"), (0.976, "in"), (18.0, "in")))
+        self.assertEqual(tube._material, ("Paper", MATERIAL_TYPE_BULK))
+        self.assertEqual(tube._mass, (5.2, "g"))
+
+        # The folder gives the manufacturer when the row doesn't, and a missing mass is left unknown
+        tube = records[5][0]
+        self.assertEqual(tube._manufacturer, "Estes")
+        self.assertEqual(tube._mass, (0.0, ""))
+
+        nose = records[6][0]
+        self.assertEqual(nose._noseType, "ogive")
+        self.assertTrue(nose._filled)
+        self.assertEqual(nose._mass, (0.1, "oz"))
+
+        chute = records[7][0]
+        self.assertEqual((chute._sides, chute._lineCount), (8, 8))
+        self.assertEqual(chute._material, ("Rip stop nylon", MATERIAL_TYPE_SURFACE))
+        self.assertEqual(chute._lineMaterial, ("Carpet String", MATERIAL_TYPE_LINE))
+
+    def testPersist(self):
+        connection = sqlite3.connect(":memory:")
+        connection.row_factory = sqlite3.Row
+        PartDatabase()._createTables(connection)
+
+        # RockSim materials share an existing material of the same name and type
+        connection.execute("INSERT INTO material VALUES (1, 'Apogee', 'paper', 'BULK', 800.0, 'kg/m3', 800.0)")
+        loader = BulkLoader(connection)
+
+        folder, records = parseRktFolder(self._catalog)
+        for obj, line in records:
+            obj.persist(loader)
+        loader.commit()
+
+        rows = connection.execute("""SELECT part_number, component_type, c.manufacturer, m.manufacturer, material_name
+                                        FROM component c, material m WHERE c.material_index = m.material_index ORDER BY component_index""")
+        self.assertEqual([tuple(row) for row in rows], [("EST 3086", "Body Tube", "Estes", "Apogee", "paper"),
+                            ("EST 3087", "Body Tube", "Estes", "Apogee", "paper"), ("BNC-50J", "Nose Cone", "Estes", "Estes", "Balsa"),
+                            ("302260", "Parachute", "Estes", "Estes", "Rip stop nylon")])
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM material").fetchone()[0], 4)
+
+        row = connection.execute("SELECT inner_diameter_mm, outer_diameter_mm, length_mm FROM body_tube ORDER BY body_tube_index").fetchone()
+        self.assertAlmostEqual(row["inner_diameter_mm"], 24.13)
+        self.assertAlmostEqual(row["outer_diameter_mm"], 24.7904)
+        self.assertAlmostEqual(row["length_mm"], 457.2)
+
+        row = connection.execute("""SELECT material_name FROM parachute p, material m WHERE p.line_material_index = m.material_index""").fetchone()
+        self.assertEqual(row["material_name"], "Carpet String")
+        connection.close()
+
+    def testUnknownVendor(self):
+        folder = os.path.join(self._folder, "acme")
+        shutil.copytree(self._catalog, folder)
+        self.assertRaises(UnknownManufacturerError, parseRktFolder, folder)
@@ -0,0 +1,57 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the profile root finder"""
+
+__title__ = "FreeCAD Root Finder Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import math
+import unittest
+
+from App.RootFinder import findRoot
+
+class RootFinderTests(unittest.TestCase):
+
+    def _count(self, function):
+        self._evaluations = 0
+        def counted(x):
+            self._evaluations += 1
+            return function(x)
+        return counted
+
+    def testPolynomial(self):
+        root = findRoot(self._count(lambda x: x * x * x - 2.0 * x - 5.0), 2.0, 3.0, 1e-10)
+        self.assertAlmostEqual(root, 2.0945514815423265, places=9)
+        self.assertLess(self._evaluations, 15)
+
+    def testInfiniteSlope(self):
+        # A power series nose, with an infinite slope at the tip
+        root = findRoot(self._count(lambda x: 12.5 * math.pow(x / 100.0, 0.5) - 2.0), 0.0, 100.0, 1e-8)
+        self.assertAlmostEqual(root, 100.0 * math.pow(2.0 / 12.5, 2), places=6)
+        self.assertLess(self._evaluations, 40)
+
+    def testEndpoints(self):
+        self.assertEqual(findRoot(lambda x: x, 0.0, 1.0), 0.0)
+        self.assertEqual(findRoot(lambda x: x - 1.0, 0.0, 1.0), 1.0)
+
+    def testNotBracketed(self):
+        self.assertRaises(ValueError, findRoot, lambda x: x * x + 1.0, -1.0, 1.0)
@@ -0,0 +1,91 @@
+# ***************************************************************************
+# *   Copyright (c) 2022 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Class for testing the shape cache"""
+
+__title__ = "FreeCAD Shape Cache Tests"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import FreeCAD
+import unittest
+
+from App.BodyTubeShapeHandler import BodyTubeShapeHandler
+from App.CenteringRingShapeHandler import CenteringRingShapeHandler
+from App.ShapeCache import getShapeCache, shapeKey, shapeProperties
+from Ui.CmdBodyTube import makeBodyTube
+
+class ShapeCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.Doc = FreeCAD.newDocument("ShapeCacheTest")
+
+    def tearDown(self):
+        FreeCAD.closeDocument(self.Doc.Name)
+
+    def testRestore(self):
+        feature = makeBodyTube('BodyTube')
+        feature.Length = 100.0
+        self.Doc.recompute()
+        volume = feature.Shape.Volume
+
+        feature.Length = 200.0
+        self.Doc.recompute()
+        self.assertGreater(feature.Shape.Volume, volume)
+
+        # Changing it back should reuse the first shape
+        hits = getShapeCache().hits
+        feature.Length = 100.0
+        self.Doc.recompute()
+        self.assertEqual(getShapeCache().hits, hits + 1)
+        self.assertAlmostEqual(feature.Shape.Volume, volume)
+        self.assertTrue(feature.Shape.isValid())
+
+    def testPlacement(self):
+        first = makeBodyTube('First')
+        self.Doc.recompute()
+
+        second = makeBodyTube('Second')
+        second.Placement = FreeCAD.Placement(FreeCAD.Vector(50, 0, 0), FreeCAD.Rotation())
+        self.Doc.recompute()
+
+        # Identical tubes share a shape, but keep their own placement
+        self.assertTrue(first.Shape.isPartner(second.Shape))
+        self.assertEqual(second.Placement.Base, FreeCAD.Vector(50, 0, 0))
+
+    def testShapeProperties(self):
+        feature = makeBodyTube('BodyTube')
+        self.Doc.recompute()
+        key = shapeKey(BodyTubeShapeHandler(feature), feature)
+
+        # Visibility and the catalog details don't change the shape
+        feature.Visibility = False
+        feature.Manufacturer = "Estes"
+        feature.PartNumber = "BT-50"
+        self.assertEqual(shapeKey(BodyTubeShapeHandler(feature), feature), key)
+
+        feature.Length = float(feature.Length) + 10.0
+        self.assertNotEqual(shapeKey(BodyTubeShapeHandler(feature), feature), key)
+
+        # Handlers include the properties of the handlers they extend
+        names = shapeProperties(CenteringRingShapeHandler)
+        self.assertIn("Diameter", names)
+        self.assertIn("CenterDiameter", names)
+        self.assertNotIn("Visibility", names)
@@ -24,24 +24,25 @@ __title__ = "FreeCAD Database Lookup"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
-import sqlite3
-
 import FreeCAD
 
 from DraftTools import translate
 
 from PySide import QtGui, QtCore
-from PySide.QtGui import QStandardItemModel, QStandardItem
 from PySide2.QtWidgets import QVBoxLayout, QHBoxLayout
 
 from App.Constants import COMPONENT_TYPE_BODYTUBE, COMPONENT_TYPE_BULKHEAD, COMPONENT_TYPE_CENTERINGRING, \
     COMPONENT_TYPE_COUPLER, COMPONENT_TYPE_ENGINEBLOCK, COMPONENT_TYPE_LAUNCHLUG, COMPONENT_TYPE_NOSECONE, \
     COMPONENT_TYPE_PARACHUTE, COMPONENT_TYPE_STREAMER, COMPONENT_TYPE_TRANSITION, COMPONENT_TYPE_ANY
-from App.Utilities import _valueWithUnits
+from App.Utilities import _err, _lengthFromMillimeters, _areaFromSquareMillimeters, _massFromKilograms, _userPartsDatabase
+from App.Parts.Exceptions import MultipleEntryError, NotFoundError
 
+from App.Parts.ConnectionManager import getConnectionManager
 from App.Parts.BodyTube import listBodyTubes, getBodyTube
 from App.Parts.NoseCone import listNoseCones, getNoseCone
 from App.Parts.Transition import listTransitions, getTransition
+from App.Parts.Parachute import listParachutes, getParachute
+from App.Parts.Streamer import listStreamers, getStreamer
 
 
 # Constant definitions
@@ -63,12 +64,92 @@ _compatible = {
 }
 
 
+class PartTableModel(QtCore.QAbstractTableModel):
+    """
+    Table model fetching rows from the parts database a page at a time. Columns are
+    (header, key, format) tuples, with sorting done by the query on the key column
+    """
+
+    def __init__(self, pageSize=200):
+        super().__init__()
+
+        self._pageSize = pageSize
+        self._columns = []
+        self._query = None
+        self._rows = []
+        self._more = False
+        self._sortColumn = -1
+        self._descending = False
+
+    def setQuery(self, columns, query):
+        """ The query is called as query(order, descending, limit, offset) and returns a list of rows """
+        self.beginResetModel()
+        self._columns = columns
+        self._query = query
+        self._rows = []
+        self._more = query is not None
+        self.endResetModel()
+
+    def row(self, row):
+        return self._rows[row]
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._columns)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid() or role != QtCore.Qt.DisplayRole:
+            return None
+
+        header, key, format = self._columns[index.column()]
+        return format(self._rows[index.row()][key])
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole or orientation != QtCore.Qt.Horizontal or section >= len(self._columns):
+            return None
+        return self._columns[section][0]
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid():
+            return False
+        return self._more
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid() or not self._more:
+            return
+
+        rows = self._query(self._order(), self._descending, self._pageSize, len(self._rows))
+        self._more = len(rows) == self._pageSize
+        if len(rows) > 0:
+            self.beginInsertRows(QtCore.QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+            self._rows += rows
+            self.endInsertRows()
+
+    def _order(self):
+        if self._sortColumn < 0 or self._sortColumn >= len(self._columns):
+            return None
+        return self._columns[self._sortColumn][1]
+
+    def sort(self, column, order=QtCore.Qt.AscendingOrder):
+        self._sortColumn = column
+        self._descending = (order == QtCore.Qt.DescendingOrder)
+
+        # Sorting is done by the database, so start again from the first page
+        self.setQuery(self._columns, self._query)
+
 class DialogLookup(QtGui.QDialog):
     def __init__(self, lookup):
         super().__init__()
 
         self._lookup = lookup
-        self._model = QStandardItemModel() # (4, 4)
+        self._model = PartTableModel()
+        self._search = None
 
         # self.initSortColumns(lookup)
         self.initUI()
@@ -107,6 +188,7 @@ class DialogLookup(QtGui.QDialog):
         self._dbTable.setSelectionBehavior(QtGui.QTableView.SelectRows)
         self._dbTable.setSelectionMode(QtGui.QTableView.SingleSelection)
         self._dbTable.setSortingEnabled(True)
+        self._dbTable.verticalHeader().hide()
         self._dbTable.doubleClicked.connect(self.onTableDoubleClick)
 
         # cancel button
@@ -142,32 +224,27 @@ class DialogLookup(QtGui.QDialog):
         self.show()
 
     def initDB(self):
-        self._connection = sqlite3.connect("file:" + FreeCAD.getUserAppDataDir() + "Mod/Rocket/Resources/parts/Parts.db?mode=ro", uri=True)
-        self._connection.row_factory = sqlite3.Row
+        self._manager = getConnectionManager(overlay=_userPartsDatabase())
+        self._connection = self._manager.acquire()
         self._updateModel()
 
+    def done(self, result):
+        # Return the connection to the pool. Esc rejects the dialog without a close event,
+        # but closing, accepting and rejecting all finish here
+        self._model.setQuery([], None)
+        self._manager.release(self._connection)
+        super().done(result)
+
     def onLookupType(self, value):
         self._updateModel()
 
     def onSearch(self, value):
-        rows = []
         value = str(value).strip()
         if len(value) > 0:
-            for column in range(self._model.columnCount()):
-                items = self._model.findItems(value, QtCore.Qt.MatchContains, column)
-                for item in items:
-                    row = item.row()
-                    if not row in rows:
-                        rows.append(row)
-
-            for row in range(self._model.rowCount()):
-                if row in rows:
-                    self._dbTable.showRow(row)
-                else:
-                    self._dbTable.hideRow(row)
+            self._search = value
         else:
-            for row in range(self._model.rowCount()):
-                self._dbTable.showRow(row)
+            self._search = None
+        self._updateModel()
 
     def onTableDoubleClick(self, selected):
         self.result = self._getSelected(selected.row())
@@ -186,13 +263,10 @@ class DialogLookup(QtGui.QDialog):
             self.result = {}
         self.close()
 
-    def _getItemFromRow(self, row):
-        item = self._model.item(row, 0)
-        return item
 
     def _getSelectedBodyTube(self, row):
         try:
-            index = int(self._getItemFromRow(row).text())
+            index = self._model.row(row)["body_tube_index"]
             tube = getBodyTube(self._connection, index)
             return tube
         except NotFoundError:
@@ -203,7 +277,7 @@ class DialogLookup(QtGui.QDialog):
 
     def _getSelectedNose(self, row):
         try:
-            index = int(self._getItemFromRow(row).text())
+            index = self._model.row(row)["nose_index"]
             cone = getNoseCone(self._connection, index)
             return cone
         except NotFoundError:
@@ -214,7 +288,7 @@ class DialogLookup(QtGui.QDialog):
 
     def _getSelectedTransition(self, row):
         try:
-            index = int(self._getItemFromRow(row).text())
+            index = self._model.row(row)["transition_index"]
             tran = getTransition(self._connection, index)
             return tran
         except NotFoundError:
@@ -223,6 +297,28 @@ class DialogLookup(QtGui.QDialog):
             _err(translate('Rocket', "Multiple identical entries found"))
         return {}
 
+    def _getSelectedParachute(self, row):
+        try:
+            index = self._model.row(row)["parachute_index"]
+            chute = getParachute(self._connection, index)
+            return chute
+        except NotFoundError:
+            _err(translate('Rocket', "Parachute not found"))
+        except MultipleEntryError:
+            _err(translate('Rocket', "Multiple identical entries found"))
+        return {}
+
+    def _getSelectedStreamer(self, row):
+        try:
+            index = self._model.row(row)["streamer_index"]
+            streamer = getStreamer(self._connection, index)
+            return streamer
+        except NotFoundError:
+            _err(translate('Rocket', "Streamer not found"))
+        except MultipleEntryError:
+            _err(translate('Rocket', "Multiple identical entries found"))
+        return {}
+
     def _getSelected(self, row):
         queryType = str(self._lookupTypeCombo.currentText())
         if queryType == COMPONENT_TYPE_ANY:
@@ -237,128 +333,98 @@ class DialogLookup(QtGui.QDialog):
             return self._getSelectedNose(row)
         elif query == COMPONENT_TYPE_TRANSITION:
             return self._getSelectedTransition(row)
-        # elif query == COMPONENT_TYPE_PARACHUTE:
-        #     pass
-        # elif query == COMPONENT_TYPE_STREAMER:
-        #     pass
+        elif query == COMPONENT_TYPE_PARACHUTE:
+            return self._getSelectedParachute(row)
+        elif query == COMPONENT_TYPE_STREAMER:
+            return self._getSelectedStreamer(row)
         return {}
 
-    def _itemWithDimension(self, value, dim):
-        return self._newItem(_valueWithUnits(value, dim))
-
-    def _newItem(self, text):
-        item = QStandardItem(text)
-        item.setEditable(False)
-        return item
-
     def _queryBodyTube(self, queryType):
-        rows = listBodyTubes(self._connection, queryType)
-
-        self._model.setRowCount(len(rows))
+        columns = [
+            (translate('Rocket', "Type"), "type", str),
+            (translate('Rocket', "Manufacturer"), "manufacturer", str),
+            (translate('Rocket', "Part Number"), "part_number", str),
+            (translate('Rocket', "Description"), "description", str),
+            (translate('Rocket', "Outer Diameter"), "outer_diameter_mm", _lengthFromMillimeters)
+        ]
         if queryType == COMPONENT_TYPE_BULKHEAD:
-            self._model.setColumnCount(7)
+            columns.append((translate('Rocket', "Length"), "length_mm", _lengthFromMillimeters))
         else:
-            self._model.setColumnCount(8)
-        self._dbTable.hideColumn(0) # This holds index for lookups
-        self._dbTable.setVerticalHeader(None)
-
-        # Add the column headers
-        self._model.setHorizontalHeaderItem(1, self._newItem(translate('Rocket', "Type")))
-        self._model.setHorizontalHeaderItem(2, self._newItem(translate('Rocket', "Manufacturer")))
-        self._model.setHorizontalHeaderItem(3, self._newItem(translate('Rocket', "Part Number")))
-        self._model.setHorizontalHeaderItem(4, self._newItem(translate('Rocket', "Description")))
-        self._model.setHorizontalHeaderItem(5, self._newItem(translate('Rocket', "Outer Diameter")))
-        if queryType == COMPONENT_TYPE_BULKHEAD:
-            self._model.setHorizontalHeaderItem(6, self._newItem(translate('Rocket', "Length")))
-        else:
-            self._model.setHorizontalHeaderItem(6, self._newItem(translate('Rocket', "Inner Diameter")))
-            self._model.setHorizontalHeaderItem(7, self._newItem(translate('Rocket', "Length")))
-
-        rowCount = 0
-        for row in rows:
-            self._model.setItem(rowCount, 0, self._newItem(str(row["body_tube_index"])))
-            self._model.setItem(rowCount, 1, self._newItem(str(row["type"])))
-            self._model.setItem(rowCount, 2, self._newItem(str(row["manufacturer"])))
-            self._model.setItem(rowCount, 3, self._newItem(str(row["part_number"])))
-            self._model.setItem(rowCount, 4, self._newItem(str(row["description"])))
-            self._model.setItem(rowCount, 5, self._newItem(self._itemWithDimension(row["outer_diameter"], row["outer_diameter_units"])))
-            if queryType == COMPONENT_TYPE_BULKHEAD:
-                self._model.setItem(rowCount, 6, self._newItem(self._itemWithDimension(row["length"], row["length_units"])))
-            else:
-                self._model.setItem(rowCount, 6, self._newItem(self._itemWithDimension(row["inner_diameter"], row["inner_diameter_units"])))
-                self._model.setItem(rowCount, 7, self._newItem(self._itemWithDimension(row["length"], row["length_units"])))
-
-            rowCount += 1
+            columns.append((translate('Rocket', "Inner Diameter"), "inner_diameter_mm", _lengthFromMillimeters))
+            columns.append((translate('Rocket', "Length"), "length_mm", _lengthFromMillimeters))
+        columns.append((translate('Rocket', "Estimated Mass"), "estimated_mass", _massFromKilograms))
+
+        search = self._search
+        self._model.setQuery(columns, lambda order, descending, limit, offset:
+            self._manager.query(listBodyTubes, queryType, search, order, descending, limit, offset))
 
     def _queryNoseCone(self):
-        rows = listNoseCones(self._connection)
-
-        self._model.setRowCount(len(rows))
-        self._model.setColumnCount(9)
-        self._dbTable.hideColumn(0) # This holds index for lookups
-        self._dbTable.setVerticalHeader(None)
-
-        # Add the column headers
-        self._model.setHorizontalHeaderItem(1, self._newItem(translate('Rocket', "Manufacturer")))
-        self._model.setHorizontalHeaderItem(2, self._newItem(translate('Rocket', "Part Number")))
-        self._model.setHorizontalHeaderItem(3, self._newItem(translate('Rocket', "Description")))
-        self._model.setHorizontalHeaderItem(4, self._newItem(translate('Rocket', "Shape")))
-        self._model.setHorizontalHeaderItem(5, self._newItem(translate('Rocket', "Diameter")))
-        self._model.setHorizontalHeaderItem(6, self._newItem(translate('Rocket', "Length")))
-        self._model.setHorizontalHeaderItem(7, self._newItem(translate('Rocket', "Shoulder Diameter")))
-        self._model.setHorizontalHeaderItem(8, self._newItem(translate('Rocket', "Shoulder Length")))
-
-        rowCount = 0
-        for row in rows:
-            self._model.setItem(rowCount, 0, self._newItem(str(row["nose_index"])))
-            self._model.setItem(rowCount, 1, self._newItem(str(row["manufacturer"])))
-            self._model.setItem(rowCount, 2, self._newItem(str(row["part_number"])))
-            self._model.setItem(rowCount, 3, self._newItem(str(row["description"])))
-            self._model.setItem(rowCount, 4, self._newItem(str(row["shape"])))
-            self._model.setItem(rowCount, 5, self._newItem(self._itemWithDimension(row["diameter"], row["diameter_units"])))
-            self._model.setItem(rowCount, 6, self._newItem(self._itemWithDimension(row["length"], row["length_units"])))
-            self._model.setItem(rowCount, 7, self._newItem(self._itemWithDimension(row["shoulder_diameter"], row["shoulder_diameter_units"])))
-            self._model.setItem(rowCount, 8, self._newItem(self._itemWithDimension(row["shoulder_length"], row["shoulder_length_units"])))
-
-            rowCount += 1
+        columns = [
+            (translate('Rocket', "Manufacturer"), "manufacturer", str),
+            (translate('Rocket', "Part Number"), "part_number", str),
+            (translate('Rocket', "Description"), "description", str),
+            (translate('Rocket', "Shape"), "shape", str),
+            (translate('Rocket', "Diameter"), "diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Length"), "length_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Shoulder Diameter"), "shoulder_diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Shoulder Length"), "shoulder_length_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Estimated Mass"), "estimated_mass", _massFromKilograms)
+        ]
+
+        search = self._search
+        self._model.setQuery(columns, lambda order, descending, limit, offset:
+            self._manager.query(listNoseCones, search, order, descending, limit, offset))
 
     def _queryTransition(self):
-        rows = listTransitions(self._connection)
-
-        self._model.setRowCount(len(rows))
-        self._model.setColumnCount(12)
-        self._dbTable.hideColumn(0) # This holds index for lookups
-        self._dbTable.setVerticalHeader(None)
-
-        # Add the column headers
-        self._model.setHorizontalHeaderItem(1, self._newItem(translate('Rocket', "Manufacturer")))
-        self._model.setHorizontalHeaderItem(2, self._newItem(translate('Rocket', "Part Number")))
-        self._model.setHorizontalHeaderItem(3, self._newItem(translate('Rocket', "Description")))
-        self._model.setHorizontalHeaderItem(4, self._newItem(translate('Rocket', "Shape")))
-        self._model.setHorizontalHeaderItem(5, self._newItem(translate('Rocket', "Fore Diameter")))
-        self._model.setHorizontalHeaderItem(6, self._newItem(translate('Rocket', "Aft Diameter")))
-        self._model.setHorizontalHeaderItem(7, self._newItem(translate('Rocket', "Length")))
-        self._model.setHorizontalHeaderItem(8, self._newItem(translate('Rocket', "Fore Shoulder Diameter")))
-        self._model.setHorizontalHeaderItem(9, self._newItem(translate('Rocket', "Fore Shoulder Length")))
-        self._model.setHorizontalHeaderItem(10, self._newItem(translate('Rocket', "Aft Shoulder Diameter")))
-        self._model.setHorizontalHeaderItem(11, self._newItem(translate('Rocket', "Aft Shoulder Length")))
-
-        rowCount = 0
-        for row in rows:
-            self._model.setItem(rowCount, 0, self._newItem(str(row["transition_index"])))
-            self._model.setItem(rowCount, 1, self._newItem(str(row["manufacturer"])))
-            self._model.setItem(rowCount, 2, self._newItem(str(row["part_number"])))
-            self._model.setItem(rowCount, 3, self._newItem(str(row["description"])))
-            self._model.setItem(rowCount, 4, self._newItem(str(row["shape"])))
-            self._model.setItem(rowCount, 5, self._newItem(self._itemWithDimension(row["fore_outside_diameter"], row["fore_outside_diameter_units"])))
-            self._model.setItem(rowCount, 6, self._newItem(self._itemWithDimension(row["aft_outside_diameter"], row["aft_outside_diameter_units"])))
-            self._model.setItem(rowCount, 7, self._newItem(self._itemWithDimension(row["length"], row["length_units"])))
-            self._model.setItem(rowCount, 8, self._newItem(self._itemWithDimension(row["fore_shoulder_diameter"], row["fore_shoulder_diameter_units"])))
-            self._model.setItem(rowCount, 9, self._newItem(self._itemWithDimension(row["fore_shoulder_length"], row["fore_shoulder_length_units"])))
-            self._model.setItem(rowCount, 10, self._newItem(self._itemWithDimension(row["aft_shoulder_diameter"], row["aft_shoulder_diameter_units"])))
-            self._model.setItem(rowCount, 11, self._newItem(self._itemWithDimension(row["aft_shoulder_length"], row["aft_shoulder_length_units"])))
-
-            rowCount += 1
+        columns = [
+            (translate('Rocket', "Manufacturer"), "manufacturer", str),
+            (translate('Rocket', "Part Number"), "part_number", str),
+            (translate('Rocket', "Description"), "description", str),
+            (translate('Rocket', "Shape"), "shape", str),
+            (translate('Rocket', "Fore Diameter"), "fore_outside_diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Aft Diameter"), "aft_outside_diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Length"), "length_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Fore Shoulder Diameter"), "fore_shoulder_diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Fore Shoulder Length"), "fore_shoulder_length_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Aft Shoulder Diameter"), "aft_shoulder_diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Aft Shoulder Length"), "aft_shoulder_length_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Estimated Mass"), "estimated_mass", _massFromKilograms)
+        ]
+
+        search = self._search
+        self._model.setQuery(columns, lambda order, descending, limit, offset:
+            self._manager.query(listTransitions, search, order, descending, limit, offset))
+
+    def _queryParachute(self):
+        columns = [
+            (translate('Rocket', "Manufacturer"), "manufacturer", str),
+            (translate('Rocket', "Part Number"), "part_number", str),
+            (translate('Rocket', "Description"), "description", str),
+            (translate('Rocket', "Diameter"), "diameter_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Canopy Area"), "area_mm2", _areaFromSquareMillimeters),
+            (translate('Rocket', "Sides"), "sides", str),
+            (translate('Rocket', "Lines"), "lines", str),
+            (translate('Rocket', "Line Length"), "line_length_mm", _lengthFromMillimeters)
+        ]
+
+        search = self._search
+        self._model.setQuery(columns, lambda order, descending, limit, offset:
+            self._manager.query(listParachutes, search, order, descending, limit, offset))
+
+    def _queryStreamer(self):
+        columns = [
+            (translate('Rocket', "Manufacturer"), "manufacturer", str),
+            (translate('Rocket', "Part Number"), "part_number", str),
+            (translate('Rocket', "Description"), "description", str),
+            (translate('Rocket', "Length"), "length_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Width"), "width_mm", _lengthFromMillimeters),
+            (translate('Rocket', "Area"), "area_mm2", _areaFromSquareMillimeters),
+            (translate('Rocket', "Thickness"), "thickness_mm", _lengthFromMillimeters)
+        ]
+
+        search = self._search
+        self._model.setQuery(columns, lambda order, descending, limit, offset:
+            self._manager.query(listStreamers, search, order, descending, limit, offset))
 
     def _updateModel(self):
         queryType = str(self._lookupTypeCombo.currentText())
@@ -374,10 +440,10 @@ class DialogLookup(QtGui.QDialog):
             self._queryNoseCone()
         elif query == COMPONENT_TYPE_TRANSITION:
             self._queryTransition()
-        # elif query == COMPONENT_TYPE_PARACHUTE:
-        #     pass
-        # elif query == COMPONENT_TYPE_STREAMER:
-        #     pass
+        elif query == COMPONENT_TYPE_PARACHUTE:
+            self._queryParachute()
+        elif query == COMPONENT_TYPE_STREAMER:
+            self._queryStreamer()
 
     def update(self):
         # Update the SQL query
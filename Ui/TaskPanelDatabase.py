@@ -41,7 +41,7 @@ class _databaseLookupDialog(QDialog):
     def __init__(self, lookup, parent=None):
         super().__init__(parent)
 
-        self._database = PartDatabase(FreeCAD.getUserAppDataDir() + "Mod/Rocket/")
+        self._database = PartDatabase()
 
         # define our window
         self.setGeometry(250, 250, 400, 350)
@@ -0,0 +1,49 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Benchmark for the parts database import"""
+
+__title__ = "FreeCAD Parts Database Import Benchmark"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import sqlite3
+import time
+
+from App.Parts.PartDatabase import PartDatabase
+
+# Worker processes re-import this module, so the benchmark must only run from the main process
+if __name__ == "__main__":
+    db = PartDatabase(".") # Current directory is the root directory
+
+    results = []
+    for workers in [1, 2, 4, 8]:
+        # Build in memory so the shipped database is left untouched
+        connection = sqlite3.connect(":memory:")
+        connection.row_factory = sqlite3.Row
+
+        start = time.perf_counter()
+        db.rebuild(connection, workers)
+        results.append((workers, time.perf_counter() - start))
+
+        connection.close()
+
+    for workers, elapsed in results:
+        print("%d workers: %8.3fs (%.2fx)" % (workers, elapsed, results[0][1] / elapsed))
@@ -0,0 +1,117 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Micro-benchmark for the nose cone profile kernels"""
+
+__title__ = "FreeCAD Nose Profile Benchmark"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import argparse
+import math
+import sys
+import time
+from os import path
+
+# Run from anywhere as python util/BenchmarkNoseProfiles.py. The workbench root holds the App package
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from App.Constants import TYPE_CONE, TYPE_BLUNTED_CONE, TYPE_SPHERICAL, TYPE_ELLIPTICAL, TYPE_OGIVE, TYPE_BLUNTED_OGIVE, \
+    TYPE_SECANT_OGIVE, TYPE_PARABOLA, TYPE_VON_KARMAN, TYPE_PARABOLIC, TYPE_POWER, TYPE_HAACK
+from App.ProfileKernels import PROFILE_TOLERANCE, sampleX, adaptiveX, ogiveY, secantOgiveY, haackY, parabolicY, powerY
+
+LENGTH = 100.0
+RADIUS = 12.4
+RHO = (RADIUS * RADIUS + LENGTH * LENGTH) / (2.0 * RADIUS)
+SECANT_RHO = 100.0
+ALPHA = math.acos(math.sqrt(LENGTH * LENGTH + RADIUS * RADIUS) / (2.0 * SECANT_RHO)) - math.atan(RADIUS / LENGTH)
+
+# The per point functions the nose handlers evaluated in a loop
+def _ogive(x):
+    return math.sqrt(RHO * RHO - math.pow(LENGTH - x, 2)) + RADIUS - RHO
+
+def _secantOgive(x):
+    return math.sqrt(SECANT_RHO * SECANT_RHO - math.pow(SECANT_RHO * math.cos(ALPHA) - (LENGTH - x), 2)) - (SECANT_RHO * math.sin(ALPHA))
+
+def _haack(coefficient):
+    def haack(x):
+        theta = math.acos(1 - 2 * x / LENGTH)
+        return RADIUS * math.sqrt(theta - math.sin(2 * theta) / 2 + coefficient * math.pow(math.sin(theta), 3)) / math.sqrt(math.pi)
+    return haack
+
+def _parabolic(x):
+    ratio = x / LENGTH
+    return RADIUS * ((2 * ratio) - (0.75 * ratio * ratio)) / (2 - 0.75)
+
+def _power(k):
+    return lambda x: RADIUS * math.pow((x / LENGTH), k)
+
+# Scalar function and kernel for each sampled profile. The blunted ogive samples the ogive.
+_profiles = {
+    TYPE_OGIVE : (_ogive, lambda x: ogiveY(x, LENGTH, RADIUS, RHO)),
+    TYPE_BLUNTED_OGIVE : (_ogive, lambda x: ogiveY(x, LENGTH, RADIUS, RHO)),
+    TYPE_SECANT_OGIVE : (_secantOgive, lambda x: secantOgiveY(x, LENGTH, SECANT_RHO, ALPHA)),
+    TYPE_VON_KARMAN : (_haack(0.0), lambda x: haackY(x, LENGTH, RADIUS, 0.0)),
+    TYPE_HAACK : (_haack(1.0 / 3.0), lambda x: haackY(x, LENGTH, RADIUS, 1.0 / 3.0)),
+    TYPE_PARABOLIC : (_parabolic, lambda x: parabolicY(x, LENGTH, RADIUS, 0.75)),
+    TYPE_PARABOLA : (_power(0.5), lambda x: powerY(x, LENGTH, RADIUS, 0.5)),
+    TYPE_POWER : (_power(0.75), lambda x: powerY(x, LENGTH, RADIUS, 0.75))
+}
+
+# Drawn with analytic curves, so there are no points to sample
+_analytic = [TYPE_CONE, TYPE_BLUNTED_CONE, TYPE_SPHERICAL, TYPE_ELLIPTICAL]
+
+def _best(function, repeat):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+def _scalarProfile(function, resolution):
+    return [function(float(i) * (LENGTH / float(resolution))) for i in range(0, resolution)]
+
+def _kernelProfile(kernel, resolution):
+    return kernel(sampleX(LENGTH, resolution)).tolist()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the nose cone profile calculations, per point against the NumPy kernels")
+    parser.add_argument("--resolution", type=int, nargs="+", default=[100, 1000, 5000], help="number of points in the profile")
+    parser.add_argument("--repeat", type=int, default=50, help="number of times to calculate each profile")
+    args = parser.parse_args()
+
+    print("%-16s %10s %12s %12s %8s" % ("Type", "Resolution", "Loop (us)", "Kernel (us)", "Speedup"))
+    for noseType in _analytic:
+        print("%-16s %10s %12s %12s %8s" % (noseType, "-", "-", "-", "analytic"))
+    for noseType, (function, kernel) in _profiles.items():
+        for resolution in args.resolution:
+            loop = _best(lambda: _scalarProfile(function, resolution), args.repeat)
+            vectorized = _best(lambda: _kernelProfile(kernel, resolution), args.repeat)
+            print("%-16s %10d %12.1f %12.1f %7.1fx" % (noseType, resolution, loop * 1e6, vectorized * 1e6, loop / vectorized))
+
+    # Points placed by the adaptive sampling, before the spline fit adds any
+    print()
+    print("%-16s %10s %12s" % ("Type", "Resolution", "Adaptive"))
+    for noseType, (function, kernel) in _profiles.items():
+        for resolution in args.resolution:
+            print("%-16s %10d %12d" % (noseType, resolution, len(adaptiveX(kernel, LENGTH, PROFILE_TOLERANCE, resolution))))
@@ -0,0 +1,151 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Micro-benchmark for the Open Rocket part file parser"""
+
+__title__ = "FreeCAD Open Rocket Parser Benchmark"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import argparse
+import sqlite3
+import sys
+import time
+import xml.sax
+from os import listdir, path
+
+class _EventCounter(xml.sax.ContentHandler):
+
+    def __init__(self):
+        super().__init__()
+        self.events = 0
+
+    def startElement(self, tag, attributes):
+        self.events += 1
+
+    def endElement(self, tag):
+        self.events += 1
+
+    def characters(self, content):
+        self.events += 1
+
+def _largestOrc(root):
+    files = []
+    for folder in ["Resources/parts/workbench", "Resources/parts/openrocket-database/orc"]:
+        folder = path.join(root, folder)
+        if path.isdir(folder):
+            files += [path.join(folder, file) for file in listdir(folder) if file.endswith(".orc")]
+    return max(files, key=path.getsize)
+
+def _countEvents(filename):
+    counter = _EventCounter()
+    xml.sax.parse(filename, counter)
+    return counter.events
+
+def _memoryDatabase(tree):
+    from App.Parts.PartDatabase import PartDatabase
+
+    connection = sqlite3.connect(":memory:")
+    connection.row_factory = sqlite3.Row
+    PartDatabase(tree)._createTables(connection)
+    return connection
+
+def _baselineImporter(tree):
+    """
+    Trees from before the worker pool have no parseOrcFile, and their importer writes each part
+    as it's parsed. Drive that importer directly, writing to an in-memory database
+    """
+    from App.Parts.PartDatabaseOrcImporter import PartDatabaseOrcImporter
+    try:
+        from App.Parts.BulkLoader import BulkLoader
+    except ImportError:
+        # The original importer takes the connection itself
+        BulkLoader = None
+
+    def prepare():
+        connection = _memoryDatabase(tree)
+        if BulkLoader is None:
+            return connection
+        return BulkLoader(connection)
+
+    def parse(filename, target):
+        parser = xml.sax.make_parser()
+        parser.setFeature(xml.sax.handler.feature_namespaces, 0)
+        parser.setContentHandler(PartDatabaseOrcImporter(target, filename))
+        parser.parse(filename)
+        if BulkLoader is not None:
+            target.flush()
+
+    return prepare, parse
+
+def _importer(tree, insert):
+    """ Functions to set up a run and to parse the file, so the setup isn't timed """
+    try:
+        from App.Parts.PartDatabaseOrcImporter import parseOrcFile
+    except ImportError:
+        return _baselineImporter(tree), True
+
+    def prepare():
+        if insert:
+            from App.Parts.BulkLoader import BulkLoader
+            return BulkLoader(_memoryDatabase(tree))
+        return None
+
+    def parse(filename, loader):
+        filename, records = parseOrcFile(filename)
+        if loader is not None:
+            for obj, line in records:
+                obj.persist(loader)
+            loader.flush()
+
+    return (prepare, parse), insert
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the parsing of an Open Rocket part file")
+    parser.add_argument("filename", nargs="?", default=None, help="part file to parse (default: the largest .orc file)")
+    parser.add_argument("--repeat", type=int, default=20, help="number of times to parse the file")
+    parser.add_argument("--tree", default=None, help="source tree to import the parser from, to compare against another revision")
+    parser.add_argument("--insert", action="store_true",
+                        help="also write the parts to an in-memory database, as trees without parseOrcFile always do")
+    args = parser.parse_args()
+
+    tree = "." # Current directory is the root directory
+    if args.tree is not None:
+        tree = args.tree
+        sys.path.insert(0, tree)
+    (prepare, parse), insert = _importer(tree, args.insert)
+
+    filename = args.filename
+    if filename is None:
+        filename = _largestOrc(".") # Current directory is the root directory
+
+    events = _countEvents(filename)
+
+    best = None
+    for i in range(args.repeat):
+        target = prepare()
+        start = time.perf_counter()
+        parse(filename, target)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+
+    mode = "parse and insert" if insert else "parse"
+    print("%s (%s): %d events, best of %d %.3fms, %.0f events/sec" % (path.basename(filename), mode, events, args.repeat, best * 1000.0, events / best))
@@ -0,0 +1,37 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Export a columnar snapshot of the parts database"""
+
+__title__ = "FreeCAD Parts Database Snapshot"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import argparse
+
+from App.Parts.PartDatabase import PartDatabase
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the part dimensions as a memory mappable NumPy .npz snapshot")
+    parser.add_argument("snapshot", help="snapshot file to write, eg Parts.npz")
+    args = parser.parse_args()
+
+    db = PartDatabase(".") # Current directory is the root directory
+    db.exportSnapshot(args.snapshot)
@@ -24,7 +24,20 @@ __title__ = "FreeCAD Parts Database Generation"
 __author__ = "David Carter"
 __url__ = "https://www.davesrocketshop.com"
     
+import argparse
+
 from App.Parts.PartDatabase import PartDatabase
 
-db = PartDatabase(".") # Current directory is the root directory
-db.updateDatabase()
+# Worker processes re-import this module, so the import must only run from the main process
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the parts database")
+    parser.add_argument("--incremental", action="store_true", help="only import source files that have changed")
+    parser.add_argument("--upgrade", action="store_true", help="upgrade the schema of the existing database without importing")
+    parser.add_argument("--workers", type=int, default=None, help="number of parser processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    db = PartDatabase(".") # Current directory is the root directory
+    if args.upgrade:
+        db.upgrade()
+    else:
+        db.updateDatabase(incremental=args.incremental, workers=args.workers)
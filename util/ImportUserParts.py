@@ -0,0 +1,40 @@
+# ***************************************************************************
+# *   Copyright (c) 2021 David Carter <dcarter@davidcarter.ca>              *
+# *                                                                         *
+# *   This program is free software; you can redistribute it and/or modify  *
+# *   it under the terms of the GNU Lesser General Public License (LGPL)    *
+# *   as published by the Free Software Foundation; either version 2 of     *
+# *   the License, or (at your option) any later version.                   *
+# *   for detail see the LICENCE text file.                                 *
+# *                                                                         *
+# *   This program is distributed in the hope that it will be useful,       *
+# *   but WITHOUT ANY WARRANTY; without even the implied warranty of        *
+# *   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the         *
+# *   GNU Library General Public License for more details.                  *
+# *                                                                         *
+# *   You should have received a copy of the GNU Library General Public     *
+# *   License along with this program; if not, write to the Free Software   *
+# *   Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  *
+# *   USA                                                                   *
+# *                                                                         *
+# ***************************************************************************
+"""Build a user parts overlay database"""
+
+__title__ = "FreeCAD User Parts Database Generation"
+__author__ = "David Carter"
+__url__ = "https://www.davesrocketshop.com"
+
+import argparse
+
+from App.Parts.PartDatabase import PartDatabase
+
+# Worker processes re-import this module, so the import must only run from the main process
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a user parts database, shown alongside the parts catalog")
+    parser.add_argument("overlay", help="user parts database to create, eg RocketUserParts.db in the FreeCAD user data folder")
+    parser.add_argument("files", nargs="+", help="Open Rocket .orc files or RockSim catalog folders to import")
+    parser.add_argument("--workers", type=int, default=None, help="number of parser processes (default: one per CPU)")
+    args = parser.parse_args()
+
+    db = PartDatabase(".") # Current directory is the root directory
+    db.updateOverlay(args.overlay, args.files, workers=args.workers)